@@ -95,6 +95,8 @@ class TelegramNotifier:
             entry = result['current_price']
             stop = result['risk']['initial_stop']
             target = result['risk']['targets'].get('r3_target', 0)
+            lots = result['risk'].get('lots')
+            position = f"{lots:.2f} lots" if lots is not None else f"{result['risk']['position_size']:.2f} units"
             
             # Format based on level
             if level == 'big_bang':
@@ -121,7 +123,7 @@ Stop: {stop:.5f}
 Target: {target:.5f}
 
 <b>Risk:</b> ${result['risk']['risk_amount']:.2f}
-<b>Position:</b> {result['risk']['position_size']:.2f} lots
+<b>Position:</b> {position}
 
 <b>Momentum:</b> {result['combined_momentum']:.0f}%
 <b>HTF Aligned:</b> {'✅' if result['htf_aligned'] else '⚠️'}
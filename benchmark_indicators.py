@@ -0,0 +1,426 @@
+"""
+Indicator Benchmark & Equivalence Check
+Compares the NumPy kernels (indicators/kernels.py) with the pandas reference,
+the NumPy backend with the TA-Lib backend when TA-Lib is installed, and
+per-symbol momentum analysis with the cross-symbol panel mode and the
+streaming (live mode) states
+
+Usage:
+    python benchmark_indicators.py              # 1,000 and 100,000 bars
+    python benchmark_indicators.py --bars 5000  # custom sizes
+    python benchmark_indicators.py --symbols 15 500
+    python benchmark_indicators.py --tail-tolerance 1e-8
+    python benchmark_indicators.py --grid-size 20
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from indicators import kernels
+from indicators import pandas_reference as reference
+from indicators.indicator_backend import NumpyBackend, TalibBackend, TALIB_AVAILABLE
+from indicators.momentum_analysis import MomentumAnalyzer
+from indicators.technical_indicators import TechnicalIndicators
+
+# Relative tolerance for kernel vs pandas results
+TOLERANCE = 1e-9
+
+# pandas rolling().std() keeps running moments that drift on long series
+# (~4e-7 of the band width at 100k bars); the kernel sums each window exactly
+TOLERANCE_OVERRIDES = {'BBANDS(20,2)': 1e-7}
+
+# The Bollinger grid takes every period's std from shared sums of squares
+GRID_TOLERANCE = 1e-9
+
+
+def make_ohlcv(bars: int, seed: int = 42) -> pd.DataFrame:
+    """Build a random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, bars)))
+    open_price = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_price, close) * (1 + np.abs(rng.normal(0, 0.002, bars)))
+    low = np.minimum(open_price, close) * (1 - np.abs(rng.normal(0, 0.002, bars)))
+    volume = rng.integers(100, 10000, bars).astype(float)
+    return pd.DataFrame({
+        'time': pd.date_range('2015-01-01', periods=bars, freq='h'),
+        'open': open_price, 'high': high, 'low': low, 'close': close, 'volume': volume,
+    })
+
+
+def indicator_pairs(df: pd.DataFrame) -> dict:
+    """
+    Map indicator name -> (kernel callable, pandas callable)
+
+    Both callables return an array or a tuple of arrays/Series.
+    """
+    close, high, low, volume = (df[c].to_numpy() for c in ('close', 'high', 'low', 'volume'))
+
+    return {
+        'EMA(21)': (lambda: kernels.ema(close, 21),
+                    lambda: reference.calculate_ema(df['close'], 21)),
+        'MACD(12,26,9)': (lambda: kernels.macd(close),
+                          lambda: reference.calculate_macd(df['close'])),
+        'RSI(14)': (lambda: kernels.rsi(close),
+                    lambda: reference.calculate_rsi(df['close'])),
+        'ATR(14)': (lambda: kernels.atr(high, low, close),
+                    lambda: reference.calculate_atr(df)),
+        'ADX(14)': (lambda: kernels.adx(high, low, close),
+                    lambda: reference.calculate_adx(df['high'], df['low'], df['close'])),
+        'ROC(10)': (lambda: kernels.roc(close),
+                    lambda: reference.calculate_roc(df['close'])),
+        'OBV': (lambda: kernels.obv(close, volume),
+                lambda: reference.calculate_obv(df)),
+        'BBANDS(20,2)': (lambda: kernels.bollinger_bands(close),
+                         lambda: reference.calculate_bollinger_bands(df['close'])),
+        'STOCH(14,3)': (lambda: kernels.stochastic(high, low, close),
+                        lambda: reference.calculate_stochastic(df)),
+    }
+
+
+def backend_calls(backend, df: pd.DataFrame) -> dict:
+    """Map indicator name -> callable on one indicator backend"""
+    close, high, low = (df[c].to_numpy() for c in ('close', 'high', 'low'))
+
+    return {
+        'RSI(14)': lambda: backend.rsi(close),
+        'MACD(12,26,9)': lambda: backend.macd(close),
+        'ADX(14)': lambda: backend.adx(high, low, close),
+        'ATR(14)': lambda: backend.atr(high, low, close),
+        'BBANDS(20,2)': lambda: backend.bollinger(close),
+        'STOCH(14,3)': lambda: backend.stochastic(high, low, close),
+    }
+
+
+def max_settled_difference(result, expected, settle: int) -> float:
+    """Largest absolute difference where both are valid, ignoring the first `settle` bars"""
+    if isinstance(result, tuple):
+        return max(max_settled_difference(r, e, settle) for r, e in zip(result, expected))
+
+    result = np.asarray(result, dtype=np.float64)[settle:]
+    expected = np.asarray(expected, dtype=np.float64)[settle:]
+    valid = ~np.isnan(result) & ~np.isnan(expected)
+    if not valid.any():
+        return 0.0
+    return float(np.max(np.abs(result[valid] - expected[valid])))
+
+
+def max_relative_error(result, expected) -> float:
+    """Largest relative difference; raises if NaN positions differ"""
+    if isinstance(result, tuple):
+        return max(max_relative_error(r, e) for r, e in zip(result, expected))
+
+    result = np.asarray(result, dtype=np.float64)
+    expected = np.asarray(expected, dtype=np.float64)
+    if not np.array_equal(np.isnan(result), np.isnan(expected)):
+        raise AssertionError("NaN positions differ")
+
+    valid = ~np.isnan(expected)
+    if not valid.any():
+        return 0.0
+    diff = np.abs(result[valid] - expected[valid])
+    return float(np.max(diff / np.maximum(1.0, np.abs(expected[valid]))))
+
+
+def time_call(func, repeat: int) -> float:
+    """Best-of-N wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def check_equivalence(bars: int) -> bool:
+    """Verify kernels match pandas within TOLERANCE"""
+    df = make_ohlcv(bars)
+    all_ok = True
+
+    for name, (kernel, pandas_func) in indicator_pairs(df).items():
+        try:
+            error = max_relative_error(kernel(), pandas_func())
+            ok = error <= TOLERANCE_OVERRIDES.get(name, TOLERANCE)
+        except AssertionError as e:
+            error, ok = float('nan'), False
+            print(f"   {name}: {e}")
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} {name:<16} max rel error {error:.2e}")
+
+    # float32 input must stay float32 and agree to single precision
+    df32 = df.astype({c: np.float32 for c in ('open', 'high', 'low', 'close', 'volume')})
+    result32 = kernels.rsi(df32['close'].to_numpy())
+    error32 = max_relative_error(result32, reference.calculate_rsi(df['close']))
+    ok32 = result32.dtype == np.float32 and error32 < 1e-3
+    all_ok &= ok32
+    print(f"   {'✅' if ok32 else '❌'} {'RSI(14) float32':<16} max rel error {error32:.2e}")
+
+    return all_ok
+
+
+def run_benchmark(bars: int, repeat: int):
+    """Print timing table for one series length"""
+    df = make_ohlcv(bars)
+    print(f"\n{'Indicator':<16}{'pandas ms':>12}{'kernel ms':>12}{'speedup':>10}")
+    print("-" * 50)
+    for name, (kernel, pandas_func) in indicator_pairs(df).items():
+        pandas_ms = time_call(pandas_func, repeat)
+        kernel_ms = time_call(kernel, repeat)
+        print(f"{name:<16}{pandas_ms:>12.3f}{kernel_ms:>12.3f}{pandas_ms / kernel_ms:>9.1f}x")
+
+
+def run_backend_comparison(bars: int, repeat: int):
+    """Print NumPy vs TA-Lib timings and value differences for one series length"""
+    df = make_ohlcv(bars)
+    numpy_calls = backend_calls(NumpyBackend(), df)
+    talib_calls = backend_calls(TalibBackend(), df)
+
+    # Differences are reported after the Wilder smoothing has settled
+    settle = min(200, bars // 2)
+    print(f"\n{'Indicator':<16}{'numpy ms':>12}{'talib ms':>12}{'max |diff| (bar>=' + str(settle) + ')':>26}")
+    print("-" * 66)
+    for name, numpy_func in numpy_calls.items():
+        talib_func = talib_calls[name]
+        numpy_ms = time_call(numpy_func, repeat)
+        talib_ms = time_call(talib_func, repeat)
+        diff = max_settled_difference(numpy_func(), talib_func(), settle)
+        print(f"{name:<16}{numpy_ms:>12.3f}{talib_ms:>12.3f}{diff:>26.4f}")
+
+
+def make_universe(symbols: int, bars: int = 1000) -> dict:
+    """Build {symbol: {timeframe: DataFrame}} with uneven history lengths"""
+    universe = {}
+    for i in range(symbols):
+        # Some symbols have shorter histories, so panel columns need padding
+        length = bars - (i % 7) * 40
+        universe[f"SYM{i:03d}"] = {
+            tf: make_ohlcv(length, seed=i * 10 + k) for k, tf in enumerate(('W1', 'D1', 'H4', 'H1'))
+        }
+    return universe
+
+
+def check_panel_equivalence(universe: dict) -> bool:
+    """Panel results must match per-symbol analyze_multi_timeframe"""
+    analyzer = MomentumAnalyzer()
+    panel = analyzer.analyze_panel(universe)
+    worst = 0.0
+    for symbol, data_dict in universe.items():
+        single = analyzer.analyze_multi_timeframe(data_dict)
+        for tf, expected in single.items():
+            for key, value in expected.items():
+                diff = abs(float(panel[symbol][tf][key]) - float(value))
+                worst = max(worst, diff / max(1.0, abs(float(value))))
+    ok = worst <= TOLERANCE
+    print(f"   {'✅' if ok else '❌'} {'panel vs single':<16} max rel error {worst:.2e}")
+    return ok
+
+
+def check_streaming_equivalence(bars: int = 600, cycles: int = 5) -> bool:
+    """Live-mode (streaming) momentum must match the batch analysis every cycle"""
+    all_ok = True
+    for label, tz in (('naive times', None), ('UTC times', 'UTC')):
+        df = make_ohlcv(bars + cycles)
+        if tz is not None:
+            df['time'] = df['time'].dt.tz_localize(tz)
+        live = MomentumAnalyzer(live_mode=True)
+        batch = MomentumAnalyzer()
+        worst = 0.0
+        for cycle in range(cycles):
+            window = df.iloc[:bars + cycle].copy()
+            window.attrs.update(symbol='SYM', timeframe='H1')
+            result = live.analyze_timeframe(window)
+            expected = batch.analyze_timeframe(df.iloc[:bars + cycle])
+            for key, value in expected.items():
+                if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+                    worst = max(worst, abs(float(result[key]) - float(value)) / max(1.0, abs(float(value))))
+                elif result[key] != value:
+                    worst = float('inf')
+        ok = worst <= 1e-6
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} {label:<16} max rel error {worst:.2e}")
+    return all_ok
+
+
+def run_panel_benchmark(symbols: int, repeat: int, tolerance: float):
+    """Print per-symbol vs panel timings (full series and tail) for one universe size"""
+    universe = make_universe(symbols)
+    analyzer = MomentumAnalyzer()
+    tail_analyzer = MomentumAnalyzer(tail_tolerance=tolerance)
+
+    loop_ms = time_call(lambda: [analyzer.analyze_multi_timeframe(d) for d in universe.values()], repeat)
+    panel_ms = time_call(lambda: analyzer.analyze_panel(universe), repeat)
+    tail_ms = time_call(lambda: tail_analyzer.analyze_panel(universe), repeat)
+    print(f"{symbols:<10}{loop_ms:>14.1f}{panel_ms:>12.1f}{tail_ms:>12.1f}{loop_ms / tail_ms:>9.1f}x")
+
+
+def run_tail_benchmark(bars: int, repeat: int, tolerance: float, samples: int = 50) -> bool:
+    """
+    Compare tail evaluation with full-series analyze_timeframe
+
+    Prints timings and, per output, the largest observed error as a
+    fraction of the reported bound (must stay <= 1).
+    """
+    full = MomentumAnalyzer()
+    tail = MomentumAnalyzer(tail_tolerance=tolerance)
+    plan = tail.tail_plan()
+
+    worst = {}
+    for seed in range(samples):
+        df = make_ohlcv(bars, seed=seed)
+        expected = full.analyze_timeframe(df)
+        result = tail.analyze_timeframe(df)
+        for name, bound in result['error_bound'].items():
+            error = abs(float(result[name]) - float(expected[name]))
+            ratio = error / bound if bound > 0 else (0.0 if error == 0 else float('inf'))
+            worst[name] = max(worst.get(name, 0.0), ratio)
+
+    df = make_ohlcv(bars)
+    full_ms = time_call(lambda: full.analyze_timeframe(df), repeat)
+    tail_ms = time_call(lambda: tail.analyze_timeframe(df), repeat)
+    print(f"   tail {plan['bars']} of {bars:,} bars: full {full_ms:.3f} ms, "
+          f"tail {tail_ms:.3f} ms ({full_ms / tail_ms:.1f}x)")
+
+    all_ok = True
+    for name, ratio in worst.items():
+        ok = ratio <= 1.0
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} {name:<12} max error / bound {ratio:.3f}")
+    return all_ok
+
+
+def parameter_grid(size: int) -> dict:
+    """Parameter arrays for the grid benchmark (size values per axis)"""
+    return {
+        'periods': np.arange(5, 5 + 2 * size, 2),
+        'stds': np.linspace(1.0, 3.0, 5),
+        'k_periods': np.arange(5, 5 + size),
+        'd_periods': np.arange(1, 6),
+    }
+
+
+def run_grid_benchmark(bars: int, repeat: int, size: int) -> bool:
+    """
+    Compare the TechnicalIndicators grid methods with one call per parameter set
+
+    Prints timings and the largest relative difference per indicator.
+    """
+    df = make_ohlcv(bars)
+    grid = parameter_grid(size)
+    ti = TechnicalIndicators
+
+    def atr_loop():
+        return np.stack([ti.calculate_atr_series(df, int(p)).to_numpy() for p in grid['periods']])
+
+    def bollinger_loop():
+        upper, lower = [], []
+        middle = []
+        for p in grid['periods']:
+            rows = [ti.calculate_bollinger_bands(df['close'], int(p), float(s)) for s in grid['stds']]
+            upper.append(np.stack([u.to_numpy() for u, _, _ in rows]))
+            middle.append(rows[0][1].to_numpy())
+            lower.append(np.stack([lo.to_numpy() for _, _, lo in rows]))
+        return np.stack(upper), np.stack(middle), np.stack(lower)
+
+    def stochastic_loop():
+        k_rows, d_rows = [], []
+        for k in grid['k_periods']:
+            rows = [ti.calculate_stochastic(df, int(k), int(d)) for d in grid['d_periods']]
+            k_rows.append(rows[0][0].to_numpy())
+            d_rows.append(np.stack([d.to_numpy() for _, d in rows]))
+        return np.stack(k_rows), np.stack(d_rows)
+
+    cases = {
+        f"ATR x{len(grid['periods'])}": (
+            atr_loop, lambda: ti.calculate_atr_grid(df, grid['periods'])),
+        f"BBANDS x{len(grid['periods']) * len(grid['stds'])}": (
+            bollinger_loop, lambda: ti.calculate_bollinger_grid(df['close'], grid['periods'], grid['stds'])),
+        f"STOCH x{len(grid['k_periods']) * len(grid['d_periods'])}": (
+            stochastic_loop, lambda: ti.calculate_stochastic_grid(df, grid['k_periods'], grid['d_periods'])),
+    }
+
+    all_ok = True
+    print(f"{'Grid':<16}{'loop ms':>12}{'grid ms':>12}{'speedup':>10}{'max rel error':>16}")
+    print("-" * 66)
+    for name, (loop, batch) in cases.items():
+        try:
+            error = max_relative_error(batch(), loop())
+            ok = error <= GRID_TOLERANCE
+        except AssertionError as e:
+            error, ok = float('nan'), False
+            print(f"   {name}: {e}")
+        all_ok &= ok
+        loop_ms = time_call(loop, repeat)
+        grid_ms = time_call(batch, repeat)
+        print(f"{name:<16}{loop_ms:>12.2f}{grid_ms:>12.2f}{loop_ms / grid_ms:>9.1f}x"
+              f"{error:>14.2e} {'✅' if ok else '❌'}")
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark indicator kernels against pandas')
+    parser.add_argument('--bars', type=int, nargs='+', default=[1000, 100000], help='Series lengths')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions (best of N)')
+    parser.add_argument('--symbols', type=int, nargs='+', default=[15, 100, 500],
+                        help='Universe sizes for the panel benchmark (4 timeframes x 1000 bars)')
+    parser.add_argument('--tail-tolerance', type=float, default=1e-6,
+                        help='Tolerance for the momentum tail evaluation benchmark')
+    parser.add_argument('--grid-size', type=int, default=20,
+                        help='Values per period axis for the parameter grid benchmark')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("INDICATOR KERNEL BENCHMARK")
+    print("=" * 80)
+
+    all_ok = True
+    for bars in args.bars:
+        print(f"\n🔍 Equivalence check ({bars:,} bars)")
+        all_ok &= check_equivalence(bars)
+
+    print("\n🔍 Panel equivalence (15 symbols x 4 timeframes)")
+    all_ok &= check_panel_equivalence(make_universe(15))
+
+    print("\n🔍 Streaming equivalence (live mode vs batch, 5 cycles)")
+    all_ok &= check_streaming_equivalence()
+
+    for bars in args.bars:
+        print(f"\n⏱ Timing ({bars:,} bars, best of {args.repeat})")
+        run_benchmark(bars, args.repeat)
+
+    if TALIB_AVAILABLE:
+        for bars in args.bars:
+            print(f"\n⚖ Backends: NumPy vs TA-Lib ({bars:,} bars, best of {args.repeat})")
+            run_backend_comparison(bars, args.repeat)
+    else:
+        print("\n⚠️  TA-Lib not installed - backend comparison skipped")
+
+    for bars in args.bars:
+        print(f"\n⏱ Momentum tail evaluation vs full series ({bars:,} bars, tolerance {args.tail_tolerance:g})")
+        all_ok &= run_tail_benchmark(bars, args.repeat, args.tail_tolerance)
+
+    grid_repeat = max(1, min(args.repeat, 5))
+    for bars in args.bars:
+        print(f"\n⏱ Parameter grids vs one call per parameter set ({bars:,} bars, best of {grid_repeat})")
+        all_ok &= run_grid_benchmark(bars, grid_repeat, args.grid_size)
+
+    panel_repeat = max(1, min(args.repeat, 3))
+    print(f"\n⏱ Momentum: per-symbol loop vs panel (best of {panel_repeat})")
+    print(f"\n{'Symbols':<10}{'per-symbol ms':>14}{'panel ms':>12}{'tail ms':>12}{'speedup':>10}")
+    print("-" * 58)
+    for symbols in args.symbols:
+        run_panel_benchmark(symbols, panel_repeat, args.tail_tolerance)
+
+    print("\n" + "=" * 80)
+    print("✅ ALL CHECKS PASSED" if all_ok else "❌ MISMATCH - see above")
+    print("=" * 80)
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
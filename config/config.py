@@ -141,6 +141,12 @@ LOOKBACK_BARS = 1000
 
 ACCOUNT_SIZE = 10000
 RISK_PER_TRADE = 1.0
+CONTRACT_SPECS_PATH = "data/contract_specs.json"  # MT5 contract specs for lot sizing
+CONTRACT_SPECS_REFRESH_DAYS = 1   # Reload the contract specs from MT5 after this many days
+PORTFOLIO_CORRELATION_TIMEFRAME = "D1"  # Returns used for the rolling correlation matrix
+PORTFOLIO_CORRELATION_WINDOW = 60         # Bars in the rolling correlation window
+PORTFOLIO_CORRELATION_THRESHOLD = 0.7     # Direction-adjusted correlation that makes two setups one cluster
+PORTFOLIO_MAX_CLUSTER_RISK_R = 2.0        # Flag clusters whose combined risk exceeds this many single-trade risks
 
 ATR_MULTIPLIERS = {
     "TRENDING": {"stop": 3.0, "trail": 2.5, "target": 10.0},
@@ -213,6 +219,7 @@ AUTO_CLASSIFICATION_THRESHOLDS = {
     "TRENDING": {"min_weekly_adx": 30, "min_range_pct": 12.0},
     "RANGING": {"max_weekly_adx": 22, "max_range_pct": 6.0}
 }
+CLASSIFICATION_CACHE_PATH = "data/classification_cache.json"  # AUTO results, kept until the next week closes
 
 HISTORICAL_TRACKING_ENABLED = False
 DATABASE_PATH = "database/scanner_history.db"
@@ -225,12 +232,35 @@ LOG_FILE_PATH = "logs/scanner.log"
 MURREY_FRAME = 64
 MURREY_MULTIPLIER = 1.5
 MURREY_IGNORE_WICKS = True
+ZONE_WIDTH_MULTIPLIER = 1.5       # 0/8 and 8/8 zone width in Murrey increments
+PREFILTER_ENABLED = True          # Fetch M15/H4/W1 only for symbols in or near a 0/8 or 8/8 zone
+PREFILTER_ZONE_MARGIN = 0.5       # Distance outside a zone that still passes the prefilter, in zone widths
 VOLUME_SPIKE_THRESHOLD = 1.5
 SPRING_MAX_BARS = 3
 USE_MULTIPROCESSING = False
 MAX_WORKERS = 4
 CACHE_ENABLED = False
 CACHE_EXPIRY_MINUTES = 15
+FEATURE_CACHE_ENABLED = True      # Share indicator series between analyzers/cycles
+FEATURE_CACHE_MAX_ENTRIES = 2048  # LRU eviction beyond this many features
+FEATURE_CACHE_MAX_MB = 64         # ...or beyond this much memory
+STAGE_TIMING_ENABLED = True       # Time each probability stage (summary logged after every scan)
+STAGE_METRICS_PATH = "output/stage_metrics.json"  # Latest cycle's stage timings (served by the dashboard server)
+STREAMING_INDICATORS_ENABLED = True  # Live momentum advances O(1) per bar
+INDICATOR_BACKEND = "AUTO"        # "AUTO" (TA-Lib if installed), "TALIB", "NUMPY"
+MOMENTUM_TAIL_TOLERANCE = 1e-6    # Momentum over the last ~200 bars only (None = full series)
+COMPUTE_DTYPE = "float64"         # "float32" halves bar memory (check: python research.py validate-float32)
+BAR_STORE_PATH = "data/bars"      # Recorded bars for research.py
+BACKTEST_EXIT_TARGET = "elite"    # Take profit at "r3", "r5", "elite" (None = trail only)
+ETA_CALIBRATION_PATH = "data/eta_calibration.json"  # Calibrated ETAs (python research.py calibrate-eta)
+ETA_MIN_SAMPLES = 30              # Samples a probability band needs before its ETA is used
+TARGET_HIT_TABLES_PATH = "data/target_hit_tables.json"  # Calibrated target hit rates (python research.py calibrate-targets)
+TARGET_HIT_REFRESH_DAYS = 7       # Rebuild the target hit tables after this many days
+TARGET_HIT_MIN_SAMPLES = 20       # Entries a symbol/pair type needs before its hit rates are used
+TARGET_HIT_HORIZON_DAYS = 30      # Days an entry is followed when measuring target hits
+MONTE_CARLO_PATHS = 100000        # Equity paths per Monte Carlo run (python research.py monte-carlo)
+MONTE_CARLO_TRADES = 250          # Trades per simulated path
+MONTE_CARLO_RUIN_PCT = 50.0       # Account loss (%) counted as ruin
 TIMEZONE = "UTC"
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,147 @@
+"""
+Bar Store
+Recorded OHLCV bars on disk and the compute precision applied to all bars
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicators.feature_cache import FeatureCache
+
+logger = logging.getLogger(__name__)
+
+# Precisions accepted for COMPUTE_DTYPE
+COMPUTE_DTYPES = {'float64': np.float64, 'float32': np.float32}
+
+# Numeric columns cast to the compute dtype (time stays datetime)
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'tick_volume', 'real_volume', 'spread')
+
+
+def resolve_dtype(name) -> np.dtype:
+    """
+    Validate a COMPUTE_DTYPE setting
+
+    Args:
+        name: "float64" or "float32" (or the numpy type itself)
+
+    Returns:
+        numpy dtype
+    """
+    key = np.dtype(name).name if not isinstance(name, str) else name.lower()
+    if key not in COMPUTE_DTYPES:
+        raise ValueError(f"COMPUTE_DTYPE must be one of {list(COMPUTE_DTYPES)}, got {name!r}")
+    return np.dtype(COMPUTE_DTYPES[key])
+
+
+def cast_bars(df: pd.DataFrame, dtype) -> pd.DataFrame:
+    """
+    Cast the numeric bar columns to the compute dtype
+
+    Args:
+        df: OHLCV DataFrame
+        dtype: Target dtype (see resolve_dtype)
+
+    Returns:
+        The same DataFrame if nothing changes, otherwise a cast copy
+        (attrs are kept)
+    """
+    if df is None:
+        return df
+
+    dtype = resolve_dtype(dtype)
+    columns = {c: dtype for c in BAR_COLUMNS if c in df.columns and df[c].dtype != dtype}
+    if not columns:
+        return df
+
+    cast = df.astype(columns)
+    cast.attrs = dict(df.attrs)
+    return cast
+
+
+class BarStore:
+    """
+    Directory of recorded bars, one CSV per symbol and timeframe
+
+    Files are named ``{symbol}_{timeframe}.csv`` with a ``time`` column and
+    the OHLCV columns returned by DataFetcher. Bars are always written at
+    full precision; the store's dtype is applied when loading.
+    """
+
+    def __init__(self, root: str = "data/bars", dtype: str = "float64"):
+        """
+        Initialize bar store
+
+        Args:
+            root: Directory holding the CSV files
+            dtype: Compute dtype applied to loaded bars ("float64" or "float32")
+        """
+        self.root = Path(root)
+        self.dtype = resolve_dtype(dtype)
+
+    def path_for(self, symbol: str, timeframe: str) -> Path:
+        """File path for a symbol/timeframe"""
+        return self.root / f"{symbol}_{timeframe}.csv"
+
+    def save(self, df: pd.DataFrame, symbol: str, timeframe: str) -> Path:
+        """
+        Record bars (replaces any existing file)
+
+        Returns:
+            Path written
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(symbol, timeframe)
+        df.to_csv(path, index=False, float_format='%.17g')
+        logger.debug(f"Recorded {len(df)} {symbol} {timeframe} bars to {path}")
+        return path
+
+    def load(self, symbol: str, timeframe: str, bars: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Load recorded bars in the store's dtype
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Timeframe ("M15", "H1", "H4", "D1", "W1")
+            bars: Keep only the most recent bars (None = all)
+
+        Returns:
+            Stamped DataFrame, or None if nothing is recorded
+        """
+        path = self.path_for(symbol, timeframe)
+        if not path.exists():
+            return None
+
+        try:
+            df = pd.read_csv(path, parse_dates=['time'])
+        except Exception as e:
+            logger.error(f"Error reading {path}: {e}")
+            return None
+
+        if bars is not None:
+            df = df.tail(bars).reset_index(drop=True)
+        df = cast_bars(df, self.dtype)
+        return FeatureCache.stamp(df, symbol, timeframe)
+
+    def load_symbol(self, symbol: str, timeframes: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Load every recorded timeframe of a symbol
+
+        Returns:
+            Dictionary {timeframe: DataFrame} (missing timeframes are left out)
+        """
+        result = {}
+        for tf in timeframes:
+            df = self.load(symbol, tf)
+            if df is not None and len(df) > 0:
+                result[tf] = df
+        return result
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one recorded timeframe"""
+        if not self.root.exists():
+            return []
+        return sorted({p.stem.rsplit('_', 1)[0] for p in self.root.glob('*_*.csv')})
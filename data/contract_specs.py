@@ -0,0 +1,157 @@
+"""
+Contract Specifications
+Per-symbol contract size, tick value and volume limits, loaded from the
+terminal in one call, cached as JSON and refreshed daily
+"""
+
+import json
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fields kept per symbol (names as in MT5Connector.get_symbol_info())
+SPEC_FIELDS = (
+    'point', 'digits', 'trade_contract_size', 'trade_tick_size', 'trade_tick_value',
+    'min_volume', 'max_volume', 'volume_step', 'currency_profit',
+)
+
+
+class ContractSpecs:
+    """Cached contract specifications (reloaded when the file is refreshed)"""
+
+    # Seconds between checks of the file for a newer version
+    RELOAD_CHECK_SECONDS = 3600
+
+    def __init__(self, path: Optional[str], refresh_days: float = 1):
+        """
+        Initialize contract specifications
+
+        Args:
+            path: JSON file shared by the data fetcher (writer) and the risk calculator
+            refresh_days: Age after which the specifications are reloaded from the terminal
+        """
+        self.path = Path(path) if path else None
+        self.refresh_days = refresh_days
+        self.created = None
+        self.symbols = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self._reload()
+
+    def _reload(self):
+        """Read the file if it changed since the last read"""
+        self._last_check = time.monotonic()
+        if self.path is None or not self.path.exists():
+            return
+
+        mtime = self.path.stat().st_mtime
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path) as f:
+                specs = json.load(f)
+            self.created = datetime.fromisoformat(specs['created'])
+            self.symbols = specs.get('symbols', {})
+            self._mtime = mtime
+            logger.info(f"Loaded contract specs for {len(self.symbols)} symbols from {self.path}")
+        except Exception as e:
+            logger.error(f"Error loading contract specs {self.path}: {e}")
+
+    def is_due(self, now: Optional[datetime] = None) -> bool:
+        """True if the specifications are missing or older than refresh_days"""
+        if self.created is None:
+            return True
+        return (now or datetime.now()) - self.created >= timedelta(days=self.refresh_days)
+
+    def refresh(self, connector) -> int:
+        """
+        Reload all specifications from the terminal and save them
+
+        Args:
+            connector: Connected MT5Connector
+
+        Returns:
+            Number of symbols stored (0 if the terminal returned nothing)
+        """
+        specs = connector.get_contract_specs()
+        if not specs:
+            logger.warning("No contract specs from the terminal, keeping the cached ones")
+            return 0
+
+        self.symbols = {symbol: {field: spec.get(field) for field in SPEC_FIELDS}
+                        for symbol, spec in specs.items()}
+        self.created = datetime.now()
+        self._save()
+        return len(self.symbols)
+
+    def _save(self):
+        """Write the specifications as JSON"""
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump({'created': self.created.isoformat(timespec='seconds'), 'symbols': self.symbols}, f)
+            self._mtime = self.path.stat().st_mtime
+            logger.info(f"Contract specs for {len(self.symbols)} symbols written to {self.path}")
+        except Exception as e:
+            logger.error(f"Error saving contract specs {self.path}: {e}")
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Specification of a symbol, or None if unknown"""
+        if time.monotonic() - self._last_check >= self.RELOAD_CHECK_SECONDS:
+            self._reload()
+        return self.symbols.get(symbol)
+
+    def lot_size(self, symbol: str, risk_amount: float, stop_distance: float) -> Optional[Dict]:
+        """
+        Lots that risk at most risk_amount over stop_distance
+
+        One lot moves trade_tick_value (account currency) per
+        trade_tick_size of price. The raw size is rounded down to
+        volume_step and capped at max_volume; below min_volume the trade
+        cannot be sized within the risk and lots is 0.
+
+        Args:
+            symbol: Trading symbol
+            risk_amount: Money at risk (account currency)
+            stop_distance: Stop distance in price
+
+        Returns:
+            Dictionary with lots, risk_per_lot, lot_risk_amount (risk of the
+            rounded size) and volume_step, or None without a usable spec
+        """
+        spec = self.get(symbol)
+        if spec is None:
+            return None
+
+        tick_size = spec.get('trade_tick_size') or 0
+        tick_value = spec.get('trade_tick_value') or 0
+        step = spec.get('volume_step') or 0
+        if tick_size <= 0 or tick_value <= 0 or step <= 0 or stop_distance <= 0:
+            return None
+
+        risk_per_lot = abs(stop_distance) / tick_size * tick_value
+        steps = math.floor(risk_amount / risk_per_lot / step + 1e-9)
+        # Round to the step's decimals so 0.1 * 3 is stored as 0.3
+        decimals = max(0, -math.floor(math.log10(step))) if step < 1 else 0
+        lots = round(steps * step, decimals)
+
+        max_volume = spec.get('max_volume')
+        if max_volume:
+            lots = min(lots, max_volume)
+        min_volume = spec.get('min_volume') or step
+        if lots < min_volume:
+            lots = 0.0
+
+        return {
+            'lots': lots,
+            'risk_per_lot': risk_per_lot,
+            'lot_risk_amount': lots * risk_per_lot,
+            'volume_step': step,
+        }
@@ -5,9 +5,13 @@ Tries MT5 first, falls back to Yahoo Finance if unavailable
 
 import pandas as pd
 import logging
-from typing import Optional, Dict, List
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Union
 from data.mt5_connector import MT5Connector
 from data.yahoo_fetcher import YahooFinanceFetcher
+from data.bar_store import cast_bars, resolve_dtype
+from data.contract_specs import ContractSpecs
+from indicators.feature_cache import FeatureCache
+from indicators.lookback import lookback_registry
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,8 @@ class DataFetcher:
         self.yahoo_enabled = config.get('YAHOO_FINANCE_ENABLED', True)
         self.broker = config.get('MT5_BROKER', 'Exness')
         self.configured_broker = self.broker  # Remember original
+        self.dtype = resolve_dtype(config.get('COMPUTE_DTYPE', 'float64'))
+        self.prefilter_enabled = config.get('PREFILTER_ENABLED', True)
         
         # Initialize connectors
         self.mt5 = None
@@ -39,9 +45,16 @@ class DataFetcher:
         self.mt5_connected = False
         self.primary_source = None
         
+        # Contract specs for lot sizing (written here, read by RiskCalculator)
+        self.contract_specs = ContractSpecs(
+            config.get('CONTRACT_SPECS_PATH'),
+            refresh_days=config.get('CONTRACT_SPECS_REFRESH_DAYS', 1)
+        )
+        
         # Initialize MT5 if enabled
         if self.mt5_enabled:
             self._init_mt5()
+            self.refresh_contract_specs()
     
     def _init_mt5(self):
         """Initialize MT5 connection with auto-broker fallback"""
@@ -99,7 +112,7 @@ class DataFetcher:
             bars: Number of bars to fetch
             
         Returns:
-            DataFrame with OHLCV data or None
+            DataFrame with OHLCV data (in COMPUTE_DTYPE) or None
         """
         # Apply symbol mapping if needed
         broker_symbol = self._map_symbol(symbol)
@@ -110,7 +123,7 @@ class DataFetcher:
                 df = self.mt5.get_ohlcv(broker_symbol, timeframe, bars)
                 if df is not None and len(df) > 0:
                     logger.debug(f"✅ {symbol} data from MT5")
-                    return df
+                    return FeatureCache.stamp(cast_bars(df, self.dtype), symbol, timeframe)
                 else:
                     logger.debug(f"⚠️ No MT5 data for {symbol}, trying Yahoo Finance...")
             except Exception as e:
@@ -122,7 +135,7 @@ class DataFetcher:
                 df = self.yahoo.get_ohlcv(symbol, timeframe, bars)
                 if df is not None and len(df) > 0:
                     logger.debug(f"✅ {symbol} data from Yahoo Finance")
-                    return df
+                    return FeatureCache.stamp(cast_bars(df, self.dtype), symbol, timeframe)
                 else:
                     logger.warning(f"❌ No data for {symbol} from any source")
             except Exception as e:
@@ -130,22 +143,32 @@ class DataFetcher:
         
         return None
     
-    def get_multi_timeframe_data(self, symbol: str, timeframes: List[str], bars: int = 1000) -> Dict[str, pd.DataFrame]:
+    def get_multi_timeframe_data(self, symbol: str, timeframes: List[str],
+                                 bars: Optional[int] = None) -> Dict[str, pd.DataFrame]:
         """
         Fetch data for multiple timeframes at once
         
         Args:
             symbol: Trading symbol
             timeframes: List of timeframes ["W1", "D1", "H4", "H1", "M15"]
-            bars: Number of bars per timeframe
+            bars: Number of bars per timeframe (None = what the registered
+                  analyzers need per timeframe, capped at LOOKBACK_BARS)
             
         Returns:
             Dictionary {timeframe: DataFrame}
         """
         result = {}
         
+        # Daily contract spec reload (no terminal call until due)
+        self.refresh_contract_specs()
+        
+        if bars is None:
+            budget = lookback_registry.bar_budget(timeframes, self.config.get('LOOKBACK_BARS', 1000))
+        else:
+            budget = {tf: bars for tf in timeframes}
+        
         for tf in timeframes:
-            df = self.get_data(symbol, tf, bars)
+            df = self.get_data(symbol, tf, budget[tf])
             if df is not None:
                 result[tf] = df
             else:
@@ -153,6 +176,52 @@ class DataFetcher:
         
         return result
     
+    def get_universe_data(self, symbols: List[str], timeframes: List[str],
+                          prefilter: Optional[Callable[[Dict[str, Dict[str, pd.DataFrame]]],
+                                                       Union[Iterable[str], Mapping[str, Dict]]]] = None,
+                          prefilter_timeframes: Iterable[str] = ('H1', 'D1')) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        Fetch a universe in two phases
+        
+        Phase 1 fetches prefilter_timeframes for every symbol; phase 2
+        fetches the remaining timeframes only for the symbols that pass the
+        prefilter (e.g. those near a 0/8 or 8/8 zone, see
+        ProbabilityEngine.prefilter_universe()). With PREFILTER_ENABLED off
+        every symbol is fetched fully.
+        
+        Args:
+            symbols: Trading symbols
+            timeframes: All timeframes of a full analysis
+            prefilter: Callable taking {symbol: phase 1 data} and returning
+                       either the symbols to fetch fully or {symbol: result}
+                       with a 'passed' flag, as prefilter_universe() does
+                       (None = fetch all)
+            prefilter_timeframes: Timeframes of phase 1
+            
+        Returns:
+            Dictionary {symbol: {timeframe: DataFrame}}; symbols that did
+            not pass the prefilter only have the phase 1 timeframes
+        """
+        if prefilter is None or not self.prefilter_enabled:
+            return {symbol: self.get_multi_timeframe_data(symbol, timeframes) for symbol in symbols}
+        
+        first = [tf for tf in timeframes if tf in prefilter_timeframes]
+        rest = [tf for tf in timeframes if tf not in prefilter_timeframes]
+        
+        universe = {symbol: self.get_multi_timeframe_data(symbol, first) for symbol in symbols}
+        result = prefilter(universe)
+        if isinstance(result, Mapping):
+            passed = {symbol for symbol, r in result.items() if r['passed']}
+        else:
+            passed = set(result)
+        
+        for symbol in symbols:
+            if symbol in passed and rest:
+                universe[symbol].update(self.get_multi_timeframe_data(symbol, rest))
+        
+        logger.info(f"Full data fetched for {len(passed & set(symbols))}/{len(symbols)} symbols")
+        return universe
+    
     def validate_symbol(self, symbol: str) -> bool:
         """
         Check if symbol is available from any source
@@ -215,6 +284,25 @@ class DataFetcher:
         logger.warning(f"⚠️ Could not map {symbol} from {self.configured_broker} to {self.broker}")
         return symbol
     
+    def refresh_contract_specs(self, force: bool = False) -> int:
+        """
+        Reload contract specs from MT5 once they are a day old
+        
+        Cheap to call every scan: the terminal is only asked when the
+        cached specs are due (one symbols_get() call for all symbols).
+        
+        Args:
+            force: Reload even if the cached specs are current
+            
+        Returns:
+            Number of symbols loaded (0 if nothing was reloaded)
+        """
+        if not self.mt5_connected or self.mt5 is None:
+            return 0
+        if not force and not self.contract_specs.is_due():
+            return 0
+        return self.contract_specs.refresh(self.mt5)
+    
     def get_available_pairs(self) -> List[str]:
         """
         Get list of all configured pairs
@@ -177,6 +177,41 @@ class MT5Connector:
             logger.error(f"Error getting symbol info for {symbol}: {e}")
             return None
     
+    def get_contract_specs(self) -> Dict[str, Dict]:
+        """
+        Get contract specifications of all symbols in one terminal call
+        
+        Returns:
+            Dictionary {symbol: symbol info} (see get_symbol_info())
+        """
+        if not self.connected:
+            return {}
+        
+        try:
+            symbols = mt5.symbols_get()
+            if symbols is None:
+                return {}
+            
+            return {
+                info.name: {
+                    'symbol': info.name,
+                    'point': info.point,
+                    'digits': info.digits,
+                    'trade_contract_size': info.trade_contract_size,
+                    'trade_tick_size': info.trade_tick_size,
+                    'trade_tick_value': info.trade_tick_value,
+                    'min_volume': info.volume_min,
+                    'max_volume': info.volume_max,
+                    'volume_step': info.volume_step,
+                    'currency_profit': info.currency_profit,
+                }
+                for info in symbols
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting contract specs: {e}")
+            return {}
+    
     def get_available_symbols(self) -> List[str]:
         """
         Get list of all available symbols
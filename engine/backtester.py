@@ -0,0 +1,426 @@
+"""
+Backtester
+Replays recorded bars through the probability logic and simulates the
+Livermore trade management on every BIG BANG entry
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional
+from engine.probability_engine import ProbabilityEngine
+from engine.risk_calculator import RiskCalculator
+from indicators.technical_indicators import TechnicalIndicators
+from indicators.timeframes import completed_bar_index, align_values
+
+logger = logging.getLogger(__name__)
+
+
+class Backtester:
+    """Simulate BIG BANG entries with RiskCalculator stops, targets and trailing"""
+
+    # Exit reasons
+    EXIT_STOP = "STOP"            # Initial stop
+    EXIT_BREAKEVEN = "BREAKEVEN"  # Stop moved to entry at MOVE_TO_BE_AT_R
+    EXIT_TRAIL = "TRAIL"          # Trailing stop from START_TRAIL_AT_R
+    EXIT_TARGET = "TARGET"
+    EXIT_END = "END"              # Still open at the end of the data
+
+    TARGETS = ('r3', 'r5', 'elite')
+
+    # Bars simulated per step before looking further ahead
+    SIMULATION_WINDOW = 512
+
+    TRADE_COLUMNS = [
+        'symbol', 'pair_type', 'direction', 'setup_type',
+        'entry_time', 'entry_price', 'probability', 'combined_momentum',
+        'daily_atr', 'stop_distance', 'initial_stop', 'target_price',
+        'exit_time', 'exit_price', 'exit_reason', 'bars_held',
+        'r_multiple', 'mfe_r', 'mae_r',
+    ]
+
+    def __init__(self, config: Dict):
+        """
+        Initialize backtester
+
+        Args:
+            config: Configuration dictionary
+        """
+        self.config = config
+        self.probability_engine = ProbabilityEngine(config)
+        self.risk_calculator = RiskCalculator(config)
+        self.prob_big_bang = config.get('PROB_BIG_BANG', 80)
+        self.exit_target = config.get('BACKTEST_EXIT_TARGET', 'elite')
+
+        if self.exit_target is not None and self.exit_target not in self.TARGETS:
+            raise ValueError(f"BACKTEST_EXIT_TARGET must be one of {self.TARGETS} or None, got {self.exit_target!r}")
+
+    def run(self, symbol: str, data_dict: Dict[str, pd.DataFrame], pair_classification: str,
+            history: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Backtest one symbol
+
+        Entries are taken at the close of the H1 bar where the BIG BANG
+        condition (probability >= PROB_BIG_BANG with 15M confirmation) turns
+        on, one position at a time. Stops move on bar closes: breakeven once
+        the best price reached MOVE_TO_BE_AT_R, then trail ATR * trail
+        behind the best price from START_TRAIL_AT_R. A bar touching both
+        the stop and the target counts as a stop.
+
+        Args:
+            symbol: Trading symbol
+            data_dict: Dictionary of {timeframe: DataFrame} (H1 and D1 required)
+            pair_classification: TRENDING, RANGING, or MIXED
+            history: Precomputed probability_history() (optional)
+
+        Returns:
+            DataFrame with one row per trade (TRADE_COLUMNS)
+        """
+        market = self.prepare(data_dict)
+        if market is None:
+            logger.warning(f"{symbol}: H1 and D1 bars are required for a backtest")
+            return self._empty_trades()
+
+        try:
+            if history is None:
+                history = self.probability_engine.probability_history(data_dict)
+
+            setup_type = history['setup_type'].to_numpy()
+            entries = self.entry_signals(history)
+            trades = self.simulate_entries(
+                market, entries, setup_type[entries],
+                history['combined_momentum'].to_numpy()[entries], pair_classification
+            )
+            exit_bars = np.array([-1 if t is None else t['exit_bar'] for t in trades], dtype=np.int64)
+            taken = self.take_trades(entries, exit_bars)
+            if len(taken) == 0:
+                return self._empty_trades()
+
+            probability = history['probability'].to_numpy()
+            rows = []
+            for i in taken:
+                trade = dict(trades[i])
+                t, exit_bar = trade.pop('entry_bar'), trade.pop('exit_bar')
+                trade.update({
+                    'symbol': symbol,
+                    'pair_type': pair_classification,
+                    'direction': 'LONG' if setup_type[t] == 1 else 'SHORT',
+                    'setup_type': int(setup_type[t]),
+                    'entry_time': market['times'][t],
+                    'probability': float(probability[t]),
+                    'exit_time': market['times'][exit_bar],
+                })
+                rows.append(trade)
+            return pd.DataFrame(rows, columns=self.TRADE_COLUMNS)
+
+        except Exception as e:
+            logger.error(f"Error backtesting {symbol}: {e}")
+            return self._empty_trades()
+
+    def prepare(self, data_dict: Dict[str, pd.DataFrame]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        H1 arrays the trade simulation runs on
+
+        Returns:
+            Dictionary with 'times', 'open', 'high', 'low', 'close' and the
+            'daily_atr' of the last closed D1 bar per H1 bar, or None
+            without H1 and D1 bars
+        """
+        h1_df = data_dict.get('H1')
+        d1_df = data_dict.get('D1')
+        if h1_df is None or d1_df is None:
+            return None
+
+        market = {c: h1_df[c].to_numpy(dtype=float) for c in ('open', 'high', 'low', 'close')}
+        market['times'] = h1_df['time'].to_numpy()
+        atr = TechnicalIndicators.calculate_atr_series(d1_df, 14).to_numpy(dtype=float)
+        market['daily_atr'] = align_values(atr, completed_bar_index(market['times'], 'H1', d1_df['time'], 'D1'))
+        return market
+
+    def simulate_entries(self, market: Dict[str, np.ndarray], entries: np.ndarray, setup_type: np.ndarray,
+                         combined_momentum: np.ndarray, pair_classification: str) -> list:
+        """
+        Simulate a trade from each entry bar, ignoring overlaps
+
+        Use take_trades() to keep one position at a time.
+
+        Args:
+            market: Result of prepare()
+            entries: Entry bar indices (sorted)
+            setup_type: Setup type per entry
+            combined_momentum: Combined momentum per entry
+            pair_classification: TRENDING, RANGING, or MIXED
+
+        Returns:
+            List with one trade dictionary (with 'entry_bar' and 'exit_bar')
+            per entry, None where the daily ATR is missing
+        """
+        multipliers = self.risk_calculator.get_atr_multipliers(pair_classification)
+        trades = []
+        for t, side, momentum in zip(entries, setup_type, combined_momentum):
+            daily_atr = float(market['daily_atr'][t])
+            if not np.isfinite(daily_atr) or daily_atr <= 0:
+                trade = None
+            else:
+                trade = self._simulate(market, int(t), int(side), daily_atr, float(momentum), multipliers)
+                trade['entry_bar'] = int(t)
+                trade['combined_momentum'] = float(momentum)
+            trades.append(trade)
+        return trades
+
+    @staticmethod
+    def take_trades(entry_bars: np.ndarray, exit_bars: np.ndarray) -> np.ndarray:
+        """
+        Trades taken one position at a time
+
+        Args:
+            entry_bars: Entry bar per candidate trade (sorted)
+            exit_bars: Exit bar per candidate (-1 = not tradable)
+
+        Returns:
+            Positions of the candidates taken (an entry while a trade is
+            open is skipped)
+        """
+        taken = []
+        next_bar = 0
+        for i in np.flatnonzero(exit_bars >= 0):
+            if entry_bars[i] >= next_bar:
+                taken.append(i)
+                next_bar = exit_bars[i] + 1
+        return np.asarray(taken, dtype=np.int64)
+
+    def run_universe(self, universe: Dict[str, Dict[str, pd.DataFrame]],
+                     classifications: Dict[str, str]) -> pd.DataFrame:
+        """
+        Backtest several symbols
+
+        Args:
+            universe: Dictionary of {symbol: {timeframe: DataFrame}}
+            classifications: Dictionary of {symbol: pair type} (MIXED if missing)
+
+        Returns:
+            All trades, ordered by entry time
+        """
+        frames = [
+            self.run(symbol, data_dict, classifications.get(symbol, 'MIXED'))
+            for symbol, data_dict in universe.items()
+        ]
+        frames = [f for f in frames if len(f) > 0]
+        if not frames:
+            return self._empty_trades()
+        return pd.concat(frames, ignore_index=True).sort_values('entry_time', kind='stable').reset_index(drop=True)
+
+    def entry_signals(self, history: pd.DataFrame) -> np.ndarray:
+        """
+        H1 bars where the BIG BANG condition turns on
+
+        A bar counts when it meets the condition and the previous bar did
+        not (or had the opposite setup direction).
+
+        Args:
+            history: Result of ProbabilityEngine.probability_history()
+
+        Returns:
+            Sorted bar indices
+        """
+        setup_type = history['setup_type'].to_numpy()
+        signal = (setup_type != 0) & \
+            (history['probability'].to_numpy() >= self.prob_big_bang) & \
+            history['m15_confirmed'].to_numpy(dtype=bool)
+        return self.signal_onsets(signal, setup_type)
+
+    @staticmethod
+    def signal_onsets(signal: np.ndarray, setup_type: np.ndarray, bars: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Positions where a signal turns on
+
+        Args:
+            signal: Boolean signal per row
+            setup_type: Setup type per row
+            bars: Bar index per row when rows skip bars (default: consecutive)
+
+        Returns:
+            Positions whose previous bar had no signal in the same direction
+        """
+        previous = np.r_[False, signal[:-1]] & (np.r_[0, setup_type[:-1]] == setup_type)
+        if bars is not None:
+            previous &= np.r_[False, np.diff(bars) == 1]
+        return np.flatnonzero(signal & ~previous)
+
+    def _simulate(self, market: Dict[str, np.ndarray], entry_bar: int, setup_type: int,
+                  daily_atr: float, combined_momentum: float, multipliers: Dict[str, float]) -> Dict:
+        """
+        Manage one trade from the bar after entry until it exits
+
+        Shorts are simulated as longs on negated prices. Bars are processed
+        in windows of SIMULATION_WINDOW, each fully vectorized.
+
+        Returns:
+            Trade fields (prices in the original sign) plus 'exit_bar'
+        """
+        sign = 1.0 if setup_type == 1 else -1.0
+        entry_price = market['close'][entry_bar]
+        stop_distance = daily_atr * multipliers['stop']
+        trail_distance = daily_atr * multipliers['trail']
+
+        target_multiplier = self.risk_calculator.momentum_target_multiplier(multipliers['target'], combined_momentum)
+        target_distance = {
+            'r3': stop_distance * 3,
+            'r5': stop_distance * 5,
+            'elite': daily_atr * target_multiplier,
+        }.get(self.exit_target, np.inf)
+
+        # Everything below is in "long" space: entry at 0, prices relative to entry
+        be_level = self.risk_calculator.move_to_be_at * stop_distance
+        trail_level = self.risk_calculator.start_trail_at * stop_distance
+        n = len(market['close'])
+
+        start = entry_bar + 1
+        best = 0.0   # Best price so far (relative)
+        worst = 0.0
+        result = None
+        while start < n and result is None:
+            end = min(n, start + self.SIMULATION_WINDOW)
+            if sign > 0:
+                high = market['high'][start:end] - entry_price
+                low = market['low'][start:end] - entry_price
+                open_ = market['open'][start:end] - entry_price
+            else:
+                high = entry_price - market['low'][start:end]
+                low = entry_price - market['high'][start:end]
+                open_ = entry_price - market['open'][start:end]
+
+            # Stop in force during each bar comes from the bars before it
+            best_after = np.maximum.accumulate(np.maximum(high, best))
+            best_before = np.r_[best, best_after[:-1]]
+            stop = np.full(len(high), -stop_distance)
+            stop = np.where(best_before >= be_level, np.maximum(stop, 0.0), stop)
+            stop = np.where(best_before >= trail_level, np.maximum(stop, best_before - trail_distance), stop)
+
+            gap_stop = open_ <= stop
+            gap_target = open_ >= target_distance
+            stop_hit = low <= stop
+            target_hit = high >= target_distance
+            exits = np.flatnonzero(stop_hit | target_hit)
+
+            if len(exits) > 0:
+                k = exits[0]
+                if gap_stop[k]:
+                    exit_price, reason = open_[k], self._stop_reason(stop[k])
+                elif gap_target[k]:
+                    exit_price, reason = open_[k], self.EXIT_TARGET
+                elif stop_hit[k]:
+                    exit_price, reason = stop[k], self._stop_reason(stop[k])
+                else:
+                    exit_price, reason = target_distance, self.EXIT_TARGET
+                best = max(best, float(best_after[k]))
+                worst = min(worst, float(np.min(low[:k + 1])))
+                result = (start + k, float(exit_price), reason)
+            else:
+                best = float(best_after[-1])
+                worst = min(worst, float(np.min(low)))
+                start = end
+
+        if result is None:
+            exit_bar = n - 1
+            result = (exit_bar, (market['close'][exit_bar] - entry_price) * sign, self.EXIT_END)
+
+        exit_bar, exit_relative, reason = result
+        return {
+            'entry_price': entry_price,
+            'daily_atr': daily_atr,
+            'stop_distance': stop_distance,
+            'initial_stop': entry_price - sign * stop_distance,
+            'target_price': entry_price + sign * target_distance if np.isfinite(target_distance) else np.nan,
+            'exit_price': entry_price + sign * exit_relative,
+            'exit_reason': reason,
+            'exit_bar': exit_bar,
+            'bars_held': exit_bar - entry_bar,
+            'r_multiple': exit_relative / stop_distance,
+            'mfe_r': best / stop_distance,
+            'mae_r': -worst / stop_distance,
+        }
+
+    def _stop_reason(self, stop: float) -> str:
+        """Exit reason for a stop at a relative level"""
+        if stop < 0:
+            return self.EXIT_STOP
+        return self.EXIT_BREAKEVEN if stop == 0 else self.EXIT_TRAIL
+
+    @staticmethod
+    def statistics(trades: pd.DataFrame) -> pd.DataFrame:
+        """
+        R-multiple statistics per pair class
+
+        Args:
+            trades: Result of run() / run_universe()
+
+        Returns:
+            DataFrame indexed by pair type plus an 'ALL' row with trades,
+            the r_metrics() fields, avg_bars_held and the share of each exit
+            reason (%)
+        """
+        groups = {name: group for name, group in trades.groupby('pair_type', sort=True)}
+        if len(trades) > 0:
+            groups['ALL'] = trades
+
+        rows = {}
+        for name, group in groups.items():
+            r = group.sort_values('exit_time', kind='stable')['r_multiple'].to_numpy(dtype=float)
+            row = Backtester.r_metrics(r)
+            row['avg_bars_held'] = group['bars_held'].mean()
+            reasons = group['exit_reason'].value_counts()
+            for reason in (Backtester.EXIT_TARGET, Backtester.EXIT_TRAIL, Backtester.EXIT_BREAKEVEN,
+                           Backtester.EXIT_STOP, Backtester.EXIT_END):
+                row[f'{reason.lower()}_pct'] = reasons.get(reason, 0) / len(r) * 100
+            rows[name] = row
+
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+    @staticmethod
+    def r_metrics(r: np.ndarray) -> Dict[str, float]:
+        """
+        Summary of a sequence of R-multiples
+
+        Args:
+            r: R-multiple per trade, in exit order
+
+        Returns:
+            Dictionary with trades, win_rate (%), avg_r, median_r, avg_win_r,
+            avg_loss_r, total_r, profit_factor, max_drawdown_r and sqn
+            (System Quality Number: avg_r / std * sqrt(trades); with zero
+            variance it is +inf/-inf by the sign of avg_r, so all -1R losses
+            still rank below any other losing set)
+        """
+        r = np.asarray(r, dtype=float)
+        if len(r) == 0:
+            return {'trades': 0, 'win_rate': 0.0, 'avg_r': 0.0, 'median_r': 0.0, 'avg_win_r': 0.0,
+                    'avg_loss_r': 0.0, 'total_r': 0.0, 'profit_factor': 0.0, 'max_drawdown_r': 0.0, 'sqn': 0.0}
+
+        wins, losses = r[r > 0], r[r <= 0]
+        equity = np.cumsum(r)
+        drawdown = np.maximum.accumulate(np.r_[0.0, equity])[1:] - equity
+        gross_loss = -losses.sum()
+        std = r.std(ddof=1) if len(r) > 1 else 0.0
+        if std > 0:
+            sqn = r.mean() / std * np.sqrt(len(r))
+        elif len(r) > 1:
+            sqn = float(np.sign(r.mean()) * np.inf) if r.mean() != 0 else 0.0
+        else:
+            sqn = 0.0
+        return {
+            'trades': len(r),
+            'win_rate': len(wins) / len(r) * 100,
+            'avg_r': r.mean(),
+            'median_r': float(np.median(r)),
+            'avg_win_r': wins.mean() if len(wins) else 0.0,
+            'avg_loss_r': losses.mean() if len(losses) else 0.0,
+            'total_r': r.sum(),
+            'profit_factor': wins.sum() / gross_loss if gross_loss > 0 else np.inf,
+            'max_drawdown_r': drawdown.max(),
+            'sqn': sqn,
+        }
+
+    def _empty_trades(self) -> pd.DataFrame:
+        """Return an empty trade list"""
+        return pd.DataFrame(columns=self.TRADE_COLUMNS)
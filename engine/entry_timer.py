@@ -4,8 +4,11 @@ Estimates when a setup will reach entry threshold (80%+)
 """
 
 import logging
+import numpy as np
 from typing import Dict, Optional
 from datetime import datetime, timedelta
+from engine.eta_calibration import EtaTables
+from engine.results import StatusResult, TimingResult
 
 logger = logging.getLogger(__name__)
 
@@ -33,8 +36,19 @@ class EntryTimer:
         self.prob_get_ready = config.get('PROB_GET_READY', 60)
         self.prob_almost_ready = config.get('PROB_ALMOST_READY', 70)
         self.prob_big_bang = config.get('PROB_BIG_BANG', 80)
+        
+        # Calibrated bars-to-entry tables (python research.py calibrate-eta)
+        self.eta_tables = EtaTables.load(
+            config.get('ETA_CALIBRATION_PATH'), min_samples=config.get('ETA_MIN_SAMPLES', 30)
+        )
+        if self.eta_tables is not None and self.eta_tables.prob_big_bang != self.prob_big_bang:
+            logger.warning(
+                f"ETA calibration was built for PROB_BIG_BANG {self.eta_tables.prob_big_bang}, "
+                f"not {self.prob_big_bang} - using the default estimate"
+            )
+            self.eta_tables = None
     
-    def get_status(self, probability: float, m15_confirmed: bool = False) -> Dict:
+    def get_status(self, probability: float, m15_confirmed: bool = False) -> StatusResult:
         """
         Get current setup status
         
@@ -43,7 +57,7 @@ class EntryTimer:
             m15_confirmed: Whether 15M confirms entry
             
         Returns:
-            Dictionary with status info
+            StatusResult with status info
         """
         if probability >= self.prob_big_bang and m15_confirmed:
             status = self.STATUS_BIG_BANG
@@ -86,35 +100,47 @@ class EntryTimer:
             color = "gray"
             message = "No setup"
         
-        return {
-            'status': status,
-            'emoji': emoji,
-            'color': color,
-            'message': message,
-            'probability': probability
-        }
+        return StatusResult(
+            status=status,
+            emoji=emoji,
+            color=color,
+            message=message,
+            probability=float(probability)
+        )
     
     def estimate_time_to_entry(self, current_probability: float, time_at_level: int, 
-                               historical_avg_time: Optional[int] = None) -> Dict:
+                               historical_avg_time: Optional[int] = None,
+                               pair_classification: Optional[str] = None) -> TimingResult:
         """
         Estimate time until 80%+ entry signal
         
+        With calibration tables the ETA is the median number of bars that
+        setups in the same probability band took to reach the threshold
+        (per pair type); otherwise a fixed progression rate is assumed.
+        
         Args:
             current_probability: Current probability score
             time_at_level: Bars already spent at level
             historical_avg_time: Historical average time to entry (optional)
+            pair_classification: TRENDING, RANGING, or MIXED (for the calibrated ETA)
             
         Returns:
-            Dictionary with time estimates
+            TimingResult with time estimates ('eta_source' is "calibrated" or
+            "default")
         """
         try:
             if current_probability >= self.prob_big_bang:
-                return {
-                    'eta_bars': 0,
-                    'eta_hours': 0,
-                    'eta_message': "Ready NOW!",
-                    'estimated_entry_time': datetime.now()
-                }
+                return TimingResult(
+                    eta_bars=0,
+                    eta_hours=0,
+                    eta_message="Ready NOW!",
+                    estimated_entry_time=datetime.now()
+                )
+            
+            calibrated = self.eta_tables.lookup(current_probability, pair_classification) \
+                if self.eta_tables is not None else None
+            if calibrated is not None:
+                return self._calibrated_eta(calibrated, time_at_level)
             
             # Use historical average if available
             if historical_avg_time and historical_avg_time > 0:
@@ -152,34 +178,48 @@ class EntryTimer:
             # Estimate entry time
             estimated_time = datetime.now() + timedelta(hours=eta_hours)
             
-            # Format message
-            if eta_hours < 2:
-                eta_message = f"Very soon (~{eta_hours}h)"
-            elif eta_hours < 6:
-                eta_message = f"Within {eta_hours} hours"
-            elif eta_hours < 24:
-                eta_message = f"Within {eta_hours} hours ({eta_hours//24} day)"
-            else:
-                days = eta_hours // 24
-                eta_message = f"~{days} day{'s' if days > 1 else ''}"
-            
-            return {
-                'eta_bars': eta_bars,
-                'eta_hours': eta_hours,
-                'eta_message': eta_message,
-                'estimated_entry_time': estimated_time,
-                'time_already_spent': time_at_level
-            }
+            return TimingResult(
+                eta_bars=eta_bars,
+                eta_hours=eta_hours,
+                eta_message=self._eta_message(eta_hours),
+                estimated_entry_time=estimated_time,
+                time_already_spent=time_at_level,
+                eta_source='default'
+            )
             
         except Exception as e:
             logger.error(f"Error estimating entry time: {e}")
-            return {
-                'eta_bars': 0,
-                'eta_hours': 0,
-                'eta_message': "Unknown",
-                'estimated_entry_time': None,
-                'time_already_spent': 0
-            }
+            return TimingResult()
+    
+    def _calibrated_eta(self, calibrated: Dict, time_at_level: int) -> TimingResult:
+        """Format a calibration table lookup like the default estimate"""
+        eta_bars = max(1, int(round(calibrated['median_bars'])))
+        eta_hours = eta_bars  # Calibrated on 1H bars
+        
+        return TimingResult(
+            eta_bars=eta_bars,
+            eta_hours=eta_hours,
+            eta_message=f"{self._eta_message(eta_hours)} ({calibrated['hit_rate']:.0f}% reach entry)",
+            estimated_entry_time=datetime.now() + timedelta(hours=eta_hours),
+            time_already_spent=time_at_level,
+            eta_source='calibrated',
+            eta_range_bars=(int(calibrated['p25_bars']), int(np.ceil(calibrated['p75_bars']))),
+            eta_hit_rate=calibrated['hit_rate'],
+            eta_samples=calibrated['samples'],
+        )
+    
+    @staticmethod
+    def _eta_message(eta_hours: int) -> str:
+        """Human readable ETA"""
+        if eta_hours < 2:
+            return f"Very soon (~{eta_hours}h)"
+        elif eta_hours < 6:
+            return f"Within {eta_hours} hours"
+        elif eta_hours < 24:
+            return f"Within {eta_hours} hours ({eta_hours//24} day)"
+        else:
+            days = eta_hours // 24
+            return f"~{days} day{'s' if days > 1 else ''}"
     
     def get_progression_stage(self, probability: float) -> str:
         """
@@ -0,0 +1,202 @@
+"""
+ETA Calibration
+Measures how long setups take to reach the entry threshold from each
+probability band, and stores the result as lookup tables for EntryTimer
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Width of a probability band in points (band i covers [i * width, (i + 1) * width))
+BAND_WIDTH = 5
+
+
+def probability_band(probability, band_width: int = BAND_WIDTH):
+    """Band index of a probability (scalar or array)"""
+    return np.floor_divide(np.clip(probability, 0, 100 - 1e-9), band_width).astype(np.int64)
+
+
+class EtaCalibration:
+    """Collect bars-to-entry samples from probability histories and build the tables"""
+
+    def __init__(self, prob_big_bang: float = 80, band_width: int = BAND_WIDTH):
+        """
+        Initialize calibration
+
+        Args:
+            prob_big_bang: Entry threshold the ETA counts down to
+            band_width: Probability band width in points
+        """
+        self.prob_big_bang = prob_big_bang
+        self.band_width = band_width
+        self.n_bands = int(np.ceil(100 / band_width))
+        self.samples = {}  # {pair type: [(bands, bars_to_entry, reached), ...]}
+
+    def add_history(self, history: pd.DataFrame, pair_classification: str) -> int:
+        """
+        Add one symbol's ProbabilityEngine.probability_history()
+
+        Every bar of a setup below the threshold is a sample: the bars until
+        the same setup (consecutive bars with the same setup type) first
+        reaches PROB_BIG_BANG, or "not reached" if the setup ended first.
+        Setups still running at the end of the history are left out.
+
+        Args:
+            history: Probability history on H1 bars
+            pair_classification: TRENDING, RANGING, or MIXED
+
+        Returns:
+            Number of samples added
+        """
+        setup_type = history['setup_type'].to_numpy()
+        probability = history['probability'].to_numpy(dtype=float)
+        n = len(setup_type)
+        if n == 0:
+            return 0
+
+        # Last bar of the setup each bar belongs to
+        boundary = np.r_[setup_type[1:] != setup_type[:-1], True]
+        ends = np.flatnonzero(boundary)
+        setup_end = ends[np.searchsorted(ends, np.arange(n))]
+
+        # Next bar at or above the threshold
+        hit = (setup_type != 0) & (probability >= self.prob_big_bang)
+        next_hit = np.minimum.accumulate(np.where(hit, np.arange(n), n)[::-1])[::-1]
+        reached = next_hit <= setup_end
+
+        # Samples: setup bars below the threshold whose outcome is known
+        sample = (setup_type != 0) & ~hit & (reached | (setup_end < n - 1))
+        bands = probability_band(probability[sample], self.band_width)
+        bars = (next_hit - np.arange(n))[sample]
+        self.samples.setdefault(pair_classification, []).append((bands, bars, reached[sample]))
+        return int(sample.sum())
+
+    def build(self) -> Dict:
+        """
+        Summarize the samples
+
+        Returns:
+            Tables dictionary (see save()) with one entry per pair type
+            plus 'ALL'
+        """
+        groups = {name: parts for name, parts in self.samples.items()}
+        groups['ALL'] = [part for parts in self.samples.values() for part in parts]
+
+        classes = {}
+        for name, parts in groups.items():
+            if not parts:
+                continue
+            bands = np.concatenate([p[0] for p in parts])
+            bars = np.concatenate([p[1] for p in parts])
+            reached = np.concatenate([p[2] for p in parts])
+
+            table = {key: [] for key in ('samples', 'reached', 'median_bars', 'p25_bars', 'p75_bars')}
+            for band in range(self.n_bands):
+                in_band = bands == band
+                hits = bars[in_band & reached]
+                table['samples'].append(int(in_band.sum()))
+                table['reached'].append(int(len(hits)))
+                for key, q in (('median_bars', 50), ('p25_bars', 25), ('p75_bars', 75)):
+                    table[key].append(float(np.percentile(hits, q)) if len(hits) else None)
+            classes[name] = table
+
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'timeframe': 'H1',
+            'prob_big_bang': self.prob_big_bang,
+            'band_width': self.band_width,
+            'classes': classes,
+        }
+
+    def save(self, path: str) -> Path:
+        """
+        Build and write the tables as JSON
+
+        Format: {'created', 'timeframe', 'prob_big_bang', 'band_width',
+        'classes': {pair type: {'samples', 'reached', 'median_bars',
+        'p25_bars', 'p75_bars'}}}, each a list with one value per band
+        (null where no sample reached the threshold).
+
+        Returns:
+            Path written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.build(), f, indent=1)
+        logger.info(f"ETA calibration written to {path}")
+        return path
+
+
+class EtaTables:
+    """Calibrated ETA lookups (O(1) per query)"""
+
+    def __init__(self, tables: Dict, min_samples: int = 30):
+        """
+        Initialize from a build() / save() dictionary
+
+        Args:
+            tables: Calibration tables
+            min_samples: Bands with fewer reached samples fall back to 'ALL'
+        """
+        self.prob_big_bang = tables['prob_big_bang']
+        self.band_width = tables['band_width']
+        self.created = tables.get('created')
+        self.min_samples = min_samples
+        self.classes = {
+            name: {key: np.array([np.nan if v is None else v for v in values], dtype=float)
+                   for key, values in table.items()}
+            for name, table in tables['classes'].items()
+        }
+
+    @classmethod
+    def load(cls, path: Optional[str], min_samples: int = 30) -> Optional['EtaTables']:
+        """
+        Read tables written by EtaCalibration.save()
+
+        Returns:
+            EtaTables, or None if the file is missing or unreadable
+        """
+        if not path or not Path(path).exists():
+            return None
+        try:
+            with open(path) as f:
+                return cls(json.load(f), min_samples)
+        except Exception as e:
+            logger.error(f"Error loading ETA calibration {path}: {e}")
+            return None
+
+    def lookup(self, probability: float, pair_classification: Optional[str] = None) -> Optional[Dict]:
+        """
+        Calibrated bars to entry from a probability
+
+        Args:
+            probability: Current probability score
+            pair_classification: TRENDING, RANGING, or MIXED (None = 'ALL')
+
+        Returns:
+            Dictionary with median_bars, p25_bars, p75_bars, hit_rate (%),
+            samples and pair_type, or None without enough samples
+        """
+        band = int(probability_band(probability, self.band_width))
+        for name in (pair_classification, 'ALL'):
+            table = self.classes.get(name)
+            if table is None or table['reached'][band] < self.min_samples:
+                continue
+            return {
+                'median_bars': float(table['median_bars'][band]),
+                'p25_bars': float(table['p25_bars'][band]),
+                'p75_bars': float(table['p75_bars'][band]),
+                'hit_rate': float(table['reached'][band] / table['samples'][band] * 100),
+                'samples': int(table['samples'][band]),
+                'pair_type': name,
+            }
+        return None
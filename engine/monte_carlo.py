@@ -0,0 +1,203 @@
+"""
+Monte Carlo
+Equity paths resampled from an R-multiple distribution: drawdown
+quantiles, risk of ruin and time to recovery at a given risk per trade
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# (R values, probabilities or None for an empirical sample)
+Distribution = Tuple[np.ndarray, Optional[np.ndarray]]
+
+
+class MonteCarlo:
+    """Simulate fixed-fractional equity paths"""
+
+    # Paths simulated per [paths x trades] block (bounds memory at ~100 MB)
+    CHUNK_PATHS = 10000
+
+    # Drawdown quantiles reported (%)
+    QUANTILES = (50, 90, 95, 99)
+
+    # R of each take-profit target (None = ATR target / stop of the pair type)
+    TARGET_R = {'r3': 3.0, 'r5': 5.0, 'elite': None}
+
+    def __init__(self, config: Dict, paths: Optional[int] = None,
+                 trades_per_path: Optional[int] = None, seed: int = 0):
+        """
+        Initialize simulator
+
+        Args:
+            config: Configuration dictionary
+            paths: Equity paths per simulation (default MONTE_CARLO_PATHS)
+            trades_per_path: Trades per path (default MONTE_CARLO_TRADES)
+            seed: Random seed
+        """
+        self.config = config
+        self.account_size = config.get('ACCOUNT_SIZE', 10000)
+        self.risk_percent = config.get('RISK_PER_TRADE', 1.0)
+        self.ruin_pct = config.get('MONTE_CARLO_RUIN_PCT', 50.0)
+        self.paths = paths or config.get('MONTE_CARLO_PATHS', 100000)
+        self.trades_per_path = trades_per_path or config.get('MONTE_CARLO_TRADES', 250)
+        self.seed = seed
+
+    @staticmethod
+    def distributions_from_trades(trades: pd.DataFrame) -> Dict[str, Distribution]:
+        """
+        Empirical R distributions from Backtester trades
+
+        Args:
+            trades: Backtester.run() / run_universe() trades (or the CSV of
+                    research.py backtest --trades)
+
+        Returns:
+            Dictionary {pair type: (r values, None)} plus 'ALL'
+        """
+        trades = trades[np.isfinite(trades['r_multiple'].to_numpy(dtype=float))]
+        result = {name: (group['r_multiple'].to_numpy(dtype=float), None)
+                  for name, group in trades.groupby('pair_type')}
+        result['ALL'] = (trades['r_multiple'].to_numpy(dtype=float), None)
+        return {name: dist for name, dist in result.items() if len(dist[0])}
+
+    def distributions_from_hit_rates(self, tables: Dict, target: Optional[str] = None) -> Dict[str, Distribution]:
+        """
+        Two-outcome R distributions from the target hit tables
+
+        Each trade exits at one take-profit target: it wins the target's R
+        with the table's hit rate and loses -1R otherwise. Breakeven and
+        trailing exits are ignored. The elite target in R is the pair
+        type's ATR target / stop multiplier (without the momentum
+        adjustment).
+
+        Args:
+            tables: TargetCalibration.build() / the TARGET_HIT_TABLES_PATH file
+            target: "r3", "r5" or "elite" (default BACKTEST_EXIT_TARGET, or
+                    "elite" when that is None)
+
+        Returns:
+            Dictionary {pair type: (r values, probabilities)}
+        """
+        target = target or self.config.get('BACKTEST_EXIT_TARGET') or 'elite'
+        if target not in self.TARGET_R:
+            raise ValueError(f"target must be one of {tuple(self.TARGET_R)}, got {target!r}")
+
+        multipliers = self.config.get('ATR_MULTIPLIERS', {})
+        result = {}
+        for name, row in tables.get('classes', {}).items():
+            if not row.get('samples') or row.get(target) is None:
+                continue
+            target_r = self.TARGET_R[target]
+            if target_r is None:
+                m = multipliers.get(name, multipliers.get('MIXED', {'stop': 2.25, 'target': 7.0}))
+                target_r = m['target'] / m['stop']
+
+            hit_rate = min(max(row[target] / 100, 0.0), 1.0)
+            result[name] = (np.array([-1.0, target_r]), np.array([1 - hit_rate, hit_rate]))
+        return result
+
+    def simulate(self, distribution: Distribution, risk_percent: Optional[float] = None) -> Dict:
+        """
+        Simulate the equity paths of one distribution
+
+        Each path compounds `trades_per_path` independent draws at a fixed
+        fraction of current equity: equity *= 1 + risk% x R. A block of
+        paths is one [paths x trades] array; cumulative log equity gives
+        the running peak, drawdown and underwater stretches of every path
+        at once.
+
+        Args:
+            distribution: (r values, probabilities or None)
+            risk_percent: Risk per trade in % (default RISK_PER_TRADE)
+
+        Returns:
+            Dictionary with expectancy, final equity quantiles, max drawdown
+            quantiles (%), risk_of_ruin (% of paths losing MONTE_CARLO_RUIN_PCT
+            of the account), longest time underwater (trades) quantiles and
+            unrecovered (% of paths below their peak at the end)
+        """
+        values, probabilities = distribution
+        values = np.asarray(values, dtype=float)
+        fraction = (self.risk_percent if risk_percent is None else risk_percent) / 100.0
+        rng = np.random.default_rng(self.seed)
+        ruin_level = np.log(1 - self.ruin_pct / 100.0)
+
+        # Growth factor per R value; a loss of the whole account is ruin
+        log_growth = np.log(np.maximum(1 + fraction * values, 1e-12))
+
+        final, max_dd, underwater, ruined, unrecovered = [], [], [], [], []
+        for start in range(0, self.paths, self.CHUNK_PATHS):
+            n = min(self.CHUNK_PATHS, self.paths - start)
+            if probabilities is None:
+                draws = rng.integers(0, len(values), size=(n, self.trades_per_path))
+            else:
+                draws = rng.choice(len(values), size=(n, self.trades_per_path), p=probabilities)
+
+            # Log equity relative to the start, with the starting point as column 0
+            log_equity = np.zeros((n, self.trades_per_path + 1))
+            np.cumsum(log_growth[draws], axis=1, out=log_equity[:, 1:])
+            peak = np.maximum.accumulate(log_equity, axis=1)
+            drawdown = log_equity - peak
+
+            # Longest run below the previous peak (trades since the last peak)
+            steps = np.arange(self.trades_per_path + 1)
+            last_peak = np.maximum.accumulate(np.where(drawdown < 0, 0, steps), axis=1)
+            run = steps - last_peak
+
+            final.append(log_equity[:, -1])
+            max_dd.append(drawdown.min(axis=1))
+            underwater.append(run.max(axis=1))
+            ruined.append(log_equity.min(axis=1) <= ruin_level)
+            unrecovered.append(drawdown[:, -1] < 0)
+
+        final = self.account_size * np.exp(np.concatenate(final))
+        max_dd = (1 - np.exp(np.concatenate(max_dd))) * 100
+        underwater = np.concatenate(underwater)
+
+        if probabilities is None:
+            expectancy = float(values.mean())
+        else:
+            expectancy = float(values @ probabilities)
+
+        result = {
+            'risk_percent': fraction * 100,
+            'paths': self.paths,
+            'trades': self.trades_per_path,
+            'expectancy_r': expectancy,
+            'final_p5': float(np.percentile(final, 5)),
+            'final_p50': float(np.percentile(final, 50)),
+            'final_p95': float(np.percentile(final, 95)),
+        }
+        for q in self.QUANTILES:
+            result[f'max_dd_p{q}'] = float(np.percentile(max_dd, q))
+        result['risk_of_ruin'] = float(np.concatenate(ruined).mean() * 100)
+        for q in (50, 90, 99):
+            result[f'underwater_p{q}'] = float(np.percentile(underwater, q))
+        result['unrecovered'] = float(np.concatenate(unrecovered).mean() * 100)
+        return result
+
+    def run(self, distributions: Dict[str, Distribution], risk_percents=None) -> pd.DataFrame:
+        """
+        Simulate every distribution (pair type) at every risk level
+
+        Args:
+            distributions: Dictionary {name: distribution}
+            risk_percents: Risk levels in % (default [RISK_PER_TRADE])
+
+        Returns:
+            DataFrame with one row per (pair type, risk) and the simulate() fields
+        """
+        rows = []
+        for risk in (risk_percents or [self.risk_percent]):
+            for name, distribution in distributions.items():
+                if len(distribution[0]) == 0:
+                    continue
+                # Trades behind an empirical distribution (None for hit-rate tables)
+                samples = len(distribution[0]) if distribution[1] is None else None
+                rows.append(dict(pair_type=name, samples=samples, **self.simulate(distribution, risk)))
+        return pd.DataFrame(rows)
@@ -0,0 +1,299 @@
+"""
+Optimizer
+Sweeps the probability weights, bonuses, zone width and BIG BANG threshold
+and ranks them by backtest R-multiples
+"""
+
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from engine.probability_engine import ProbabilityEngine
+from engine.backtester import Backtester
+
+logger = logging.getLogger(__name__)
+
+# Precomputed features of the sweep, set once per worker process
+_worker_state = None
+
+
+def _init_worker(features: Dict, defaults: Dict):
+    """Process pool initializer: keep the shared features in the worker"""
+    global _worker_state
+    _worker_state = (features, defaults)
+
+
+def _evaluate_chunk(chunk: List[Dict]) -> List[Dict]:
+    """Evaluate a chunk of combinations in a worker"""
+    features, defaults = _worker_state
+    return [Optimizer.evaluate(features, parameters, defaults) for parameters in chunk]
+
+
+class Optimizer:
+    """Rank probability scoring parameters by backtest results"""
+
+    # Candidate values per parameter (3^7 = 2187 combinations)
+    DEFAULT_SPACE = {
+        'weight_time': [0.10, 0.20, 0.30],
+        'weight_volume': [0.10, 0.20, 0.30],
+        'weight_obv': [0.10, 0.15, 0.20],
+        'weight_spring': [0.05, 0.10, 0.15],
+        'weight_momentum': [0.15, 0.25, 0.35],
+        'zone_width_multiplier': [1.25, 1.5, 2.0],
+        'prob_big_bang': [75, 80, 85],
+    }
+
+    METRICS = ('sqn', 'avg_r', 'total_r', 'profit_factor')
+
+    # Evaluations handed to a worker at a time
+    CHUNK_SIZE = 32
+
+    def __init__(self, config: Dict, space: Optional[Dict[str, list]] = None):
+        """
+        Initialize optimizer
+
+        Args:
+            config: Configuration dictionary
+            space: Candidate values per parameter (default DEFAULT_SPACE).
+                   Parameters are the ProbabilityEngine.scoring_parameters()
+                   names plus zone_width_multiplier and prob_big_bang.
+        """
+        self.config = config
+        self.space = {name: list(values) for name, values in (space or self.DEFAULT_SPACE).items()}
+
+        known = set(ProbabilityEngine.scoring_parameters()) | {'zone_width_multiplier', 'prob_big_bang'}
+        unknown = set(self.space) - known
+        if unknown:
+            raise ValueError(f"Unknown optimizer parameters: {sorted(unknown)} (known: {sorted(known)})")
+
+        # Current settings, used for parameters outside the space
+        self.defaults = dict(ProbabilityEngine.scoring_parameters())
+        self.defaults['zone_width_multiplier'] = config.get('ZONE_WIDTH_MULTIPLIER', ProbabilityEngine.ZONE_WIDTH_MULTIPLIER)
+        self.defaults['prob_big_bang'] = config.get('PROB_BIG_BANG', 80)
+
+        self.backtester = Backtester(config)
+
+        # One probability history per zone width; the other parameters only rescore it
+        zones = self.space.get('zone_width_multiplier', [self.defaults['zone_width_multiplier']])
+        self.engines = {
+            float(zone): ProbabilityEngine(dict(config, ZONE_WIDTH_MULTIPLIER=float(zone))) for zone in zones
+        }
+
+        self.features = {}
+
+    def baseline(self) -> Dict[str, float]:
+        """Current settings of the parameters in the space"""
+        return {name: self.defaults[name] for name in self.space}
+
+    def combinations(self, samples: Optional[int] = None, seed: int = 0) -> List[Dict[str, float]]:
+        """
+        Parameter combinations to evaluate
+
+        Args:
+            samples: Random search with this many combinations (None = full grid)
+            seed: Random seed for the random search
+
+        Returns:
+            List of {parameter: value}; the baseline comes first and
+            combinations with proportional weights appear once
+        """
+        names = list(self.space)
+        grid_size = int(np.prod([len(self.space[name]) for name in names]))
+
+        if samples is None or samples >= grid_size:
+            combos = [dict(zip(names, values)) for values in itertools.product(*self.space.values())]
+        else:
+            rng = np.random.default_rng(seed)
+            # Distinct grid points without building the grid
+            flat = rng.choice(grid_size, size=samples, replace=False)
+            sizes = [len(self.space[name]) for name in names]
+            positions = np.unravel_index(flat, sizes)
+            combos = [
+                {name: self.space[name][positions[j][i]] for j, name in enumerate(names)}
+                for i in range(samples)
+            ]
+
+        # Combinations whose weights only differ by a common factor score
+        # the same after normalization; keep the first of each
+        baseline = self.baseline()
+        unique, seen = [], set()
+        for combo in [baseline] + combos:
+            values = dict(self.defaults, **combo)
+            weights = self.normalized_weights(values, self.defaults)
+            key = tuple(round(w, 9) for w in weights.values()) + \
+                tuple(values[name] for name in self.space if not name.startswith('weight_'))
+            if key not in seen:
+                seen.add(key)
+                unique.append(combo)
+        return unique
+
+    def precompute(self, symbol: str, data_dict: Dict[str, pd.DataFrame], pair_classification: str) -> int:
+        """
+        Compute everything a combination does not change, once per symbol
+
+        For each zone width this keeps the scoring components of the bars
+        with a setup, their 15M confirmation and the outcome of a trade
+        entered on each confirmed bar. Combinations then only rescore and
+        select entries.
+
+        Args:
+            symbol: Trading symbol
+            data_dict: Dictionary of {timeframe: DataFrame}
+            pair_classification: TRENDING, RANGING, or MIXED
+
+        Returns:
+            Number of candidate entry bars (over all zone widths)
+        """
+        market = self.backtester.prepare(data_dict)
+        m15_df = data_dict.get('M15')
+        if market is None or m15_df is None:
+            logger.warning(f"{symbol}: H1, D1 and M15 bars are required, skipped")
+            return 0
+
+        candidates = 0
+        for zone, engine in self.engines.items():
+            history = engine.probability_history(data_dict)
+            if len(history) == 0:
+                continue
+
+            setup_type = history['setup_type'].to_numpy()
+            bars = np.flatnonzero(setup_type != 0)
+            rows = np.zeros(len(bars), dtype=ProbabilityEngine.HISTORY_DTYPE)
+            for field in rows.dtype.names:
+                rows[field] = history[field].to_numpy()[bars]
+
+            m15_ok = engine.m15_confirmation_history(market['times'], m15_df, setup_type)[bars]
+            exit_bar = np.full(len(bars), -1, dtype=np.int64)
+            exit_time = np.zeros(len(bars), dtype='datetime64[ns]')
+            r_multiple = np.full(len(bars), np.nan)
+
+            confirmed = np.flatnonzero(m15_ok)
+            trades = self.backtester.simulate_entries(
+                market, bars[confirmed], rows['setup_type'][confirmed],
+                rows['combined_momentum'][confirmed], pair_classification
+            )
+            for i, trade in zip(confirmed, trades):
+                if trade is not None:
+                    exit_bar[i] = trade['exit_bar']
+                    exit_time[i] = market['times'][trade['exit_bar']]
+                    r_multiple[i] = trade['r_multiple']
+
+            self.features[(symbol, zone)] = {
+                'rows': rows,
+                'bars': bars,
+                'm15_ok': m15_ok,
+                'exit_bar': exit_bar,
+                'exit_time': exit_time,
+                'r_multiple': r_multiple,
+            }
+            candidates += len(confirmed)
+
+        return candidates
+
+    @staticmethod
+    def normalized_weights(values: Dict[str, float], defaults: Dict[str, float]) -> Dict[str, float]:
+        """
+        Component weights rescaled to the sum of the current weights
+
+        Keeps every combination's score on the scale the PROB_* thresholds
+        and status bands assume, so the sweep compares how the weight is
+        split rather than a larger total against a lower threshold.
+
+        Args:
+            values: Parameter values of a combination (all weights present)
+            defaults: Current settings (their weights give the target sum)
+
+        Returns:
+            Dictionary {weight_<component>: rescaled weight}
+        """
+        names = [f'weight_{name}' for name in ProbabilityEngine.WEIGHTS]
+        total = sum(values[name] for name in names)
+        scale = sum(defaults[name] for name in names) / total if total > 0 else 1.0
+        return {name: values[name] * scale for name in names}
+
+    @staticmethod
+    def evaluate(features: Dict, parameters: Dict[str, float], defaults: Dict[str, float]) -> Dict:
+        """
+        Backtest one combination on precomputed features
+
+        The weights are rescaled with normalized_weights() before scoring.
+
+        Args:
+            features: Optimizer.features
+            parameters: {parameter: value} of the combination
+            defaults: Values of parameters not in the combination
+
+        Returns:
+            The parameters, the normalized weights (norm_weight_<component>)
+            and Backtester.r_metrics() over all symbols
+        """
+        values = dict(defaults, **parameters)
+        zone = float(values['zone_width_multiplier'])
+        weights = Optimizer.normalized_weights(values, defaults)
+        scoring = {name: values[name] for name in ProbabilityEngine.scoring_parameters()}
+        scoring.update(weights)
+
+        r, exit_time = [], []
+        for (symbol, feature_zone), f in features.items():
+            if feature_zone != zone:
+                continue
+            rows = f['rows'].copy()
+            ProbabilityEngine.score_rows(rows, scoring)
+            probability = rows['probability']
+            signal = f['m15_ok'] & (probability >= ProbabilityEngine.M15_CHECK_PROBABILITY) & \
+                (probability >= values['prob_big_bang'])
+
+            entries = Backtester.signal_onsets(signal, rows['setup_type'], f['bars'])
+            taken = entries[Backtester.take_trades(f['bars'][entries], f['exit_bar'][entries])]
+            r.append(f['r_multiple'][taken])
+            exit_time.append(f['exit_time'][taken])
+
+        if r:
+            r, exit_time = np.concatenate(r), np.concatenate(exit_time)
+            r = r[np.argsort(exit_time, kind='stable')]
+        normalized = {f'norm_{name}': weight for name, weight in weights.items()}
+        return dict(parameters, **normalized, **Backtester.r_metrics(r))
+
+    def run(self, combinations: List[Dict[str, float]], workers: int = 1,
+            metric: str = 'sqn', min_trades: int = 30) -> pd.DataFrame:
+        """
+        Evaluate combinations and rank them
+
+        Args:
+            combinations: Result of combinations()
+            workers: Worker processes (1 = run in this process)
+            metric: Ranking metric (one of METRICS, higher is better)
+            min_trades: Combinations with fewer trades rank below all others
+
+        Returns:
+            Report DataFrame sorted best first, with 'rank' and 'baseline' columns
+        """
+        if metric not in self.METRICS:
+            raise ValueError(f"metric must be one of {self.METRICS}, got {metric!r}")
+
+        chunks = [combinations[i:i + self.CHUNK_SIZE] for i in range(0, len(combinations), self.CHUNK_SIZE)]
+        results = []
+        if workers <= 1:
+            for chunk in chunks:
+                results.extend(self.evaluate(self.features, parameters, self.defaults) for parameters in chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.features, self.defaults)) as pool:
+                for i, chunk_results in enumerate(pool.map(_evaluate_chunk, chunks), 1):
+                    results.extend(chunk_results)
+                    if i % 50 == 0:
+                        logger.info(f"Evaluated {len(results)}/{len(combinations)} combinations")
+
+        report = pd.DataFrame(results)
+        baseline = self.baseline()
+        report['baseline'] = [all(row[name] == value for name, value in baseline.items())
+                              for row in results]
+        report['eligible'] = report['trades'] >= min_trades
+        # avg_r breaks ties of the metric (e.g. two zero-variance sets)
+        report = report.sort_values(['eligible', metric, 'avg_r', 'trades'], ascending=False, kind='stable')
+        report.insert(0, 'rank', np.arange(1, len(report) + 1))
+        return report.drop(columns='eligible').reset_index(drop=True)
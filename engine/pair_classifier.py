@@ -3,11 +3,16 @@ Pair Classifier
 Determines if a pair is Trending, Ranging, or Mixed
 """
 
+import json
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, Tuple
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 from indicators.momentum_analysis import MomentumAnalyzer
+from indicators.lookback import lookback_registry
+from indicators.feature_cache import FeatureCache
+from indicators.timeframes import closed_bar_count
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +40,15 @@ class PairClassifier:
         self.auto_thresholds = config.get('AUTO_CLASSIFICATION_THRESHOLDS', {})
         
         self.momentum_analyzer = MomentumAnalyzer()
+        
+        # AUTO results per symbol, valid until the next weekly bar closes
+        self.cache_path = config.get('CLASSIFICATION_CACHE_PATH')
+        self._cache = {}
+        
+        if self.method != "MANUAL":
+            # Weekly ADX (50-bar momentum minimum) and the 12-week range
+            lookback_registry.declare('pair_classifier', {'W1': 50})
+            self._cache = self._load_cache()
     
     def classify(self, symbol: str, weekly_df: pd.DataFrame = None) -> Tuple[str, int, Dict]:
         """
@@ -53,7 +67,70 @@ class PairClassifier:
             if weekly_df is None:
                 logger.warning(f"No weekly data for auto-classification of {symbol}, using manual")
                 return self._classify_manual(symbol)
-            return self._classify_auto(symbol, weekly_df)
+            
+            # Closed weekly bars only: the result holds until the next week closes
+            closed = self._closed_weekly(symbol, weekly_df)
+            cached = self._cached(symbol, closed)
+            if cached is not None:
+                return cached
+            
+            result = self._classify_auto(symbol, closed)
+            self._store(symbol, closed, result)
+            self._save_cache()
+            return result
+    
+    def classify_universe(self, weekly: Dict[str, pd.DataFrame]) -> Dict[str, Tuple[str, int, Dict]]:
+        """
+        Classify many pairs, recomputing only those with a newly closed week
+        
+        Symbols whose cached result is still current are looked up; the rest
+        get their weekly momentum from one MomentumAnalyzer.analyze_panel()
+        pass and their 12-week ranges from one stacked array.
+        
+        Args:
+            weekly: Dictionary {symbol: weekly DataFrame}
+            
+        Returns:
+            Dictionary {symbol: (classification, confidence, details)}
+        """
+        if self.method == "MANUAL":
+            return {symbol: self._classify_manual(symbol) for symbol in weekly}
+        
+        results = {}
+        stale = {}
+        for symbol, weekly_df in weekly.items():
+            if weekly_df is None:
+                logger.warning(f"No weekly data for auto-classification of {symbol}, using manual")
+                results[symbol] = self._classify_manual(symbol)
+                continue
+            closed = self._closed_weekly(symbol, weekly_df)
+            cached = self._cached(symbol, closed)
+            if cached is not None:
+                results[symbol] = cached
+            elif len(closed) < 20:
+                results[symbol] = self._classify_auto(symbol, closed)
+                self._store(symbol, closed, results[symbol])
+            else:
+                stale[symbol] = closed
+        
+        if stale:
+            try:
+                momentum = self.momentum_analyzer.analyze_panel({symbol: {'W1': df} for symbol, df in stale.items()})
+                highs = np.stack([df['high'].to_numpy(dtype=float)[-12:] for df in stale.values()])
+                lows = np.stack([df['low'].to_numpy(dtype=float)[-12:] for df in stale.values()])
+                range_pct = (highs.max(axis=1) - lows.min(axis=1)) / lows.min(axis=1) * 100
+                
+                for j, (symbol, closed) in enumerate(stale.items()):
+                    weekly_adx = momentum.get(symbol, {}).get('W1', {}).get('adx', 0)
+                    results[symbol] = self._classify_values(weekly_adx, float(range_pct[j]))
+                    self._store(symbol, closed, results[symbol])
+            except Exception as e:
+                logger.error(f"Error in universe auto-classification: {e}")
+                for symbol, closed in stale.items():
+                    results[symbol] = self._classify_auto(symbol, closed)
+        
+        self._save_cache()
+        return {symbol: results[symbol] for symbol in weekly}
     
     def _classify_manual(self, symbol: str) -> Tuple[str, int, Dict]:
         """
@@ -118,61 +195,137 @@ class PairClassifier:
             low_12w = recent_weekly['low'].min()
             range_pct = ((high_12w - low_12w) / low_12w) * 100
             
-            # Get thresholds
-            trending_thresholds = self.auto_thresholds.get('TRENDING', {})
-            ranging_thresholds = self.auto_thresholds.get('RANGING', {})
-            
-            min_adx_trending = trending_thresholds.get('min_weekly_adx', 30)
-            min_range_trending = trending_thresholds.get('min_range_pct', 12.0)
-            
-            max_adx_ranging = ranging_thresholds.get('max_weekly_adx', 22)
-            max_range_ranging = ranging_thresholds.get('max_range_pct', 6.0)
-            
-            # Classify based on criteria
-            is_strong_trending = (weekly_adx > min_adx_trending and range_pct > min_range_trending)
-            is_moderate_trending = (weekly_adx > 25 and range_pct > 8.0) and not is_strong_trending
-            is_ranging = (weekly_adx < max_adx_ranging or range_pct < max_range_ranging)
-            
-            if is_strong_trending or is_moderate_trending:
-                confidence = 95 if is_strong_trending else 80
-                return (
-                    self.TRENDING,
-                    confidence,
-                    {
-                        'method': 'auto',
-                        'reason': f'ADX {weekly_adx:.1f}, Range {range_pct:.1f}%',
-                        'weekly_adx': weekly_adx,
-                        'range_pct': range_pct,
-                        'strength': 'strong' if is_strong_trending else 'moderate'
-                    }
-                )
-            elif is_ranging:
-                return (
-                    self.RANGING,
-                    85,
-                    {
-                        'method': 'auto',
-                        'reason': f'ADX {weekly_adx:.1f}, Range {range_pct:.1f}%',
-                        'weekly_adx': weekly_adx,
-                        'range_pct': range_pct
-                    }
-                )
-            else:
-                return (
-                    self.MIXED,
-                    60,
-                    {
-                        'method': 'auto',
-                        'reason': f'ADX {weekly_adx:.1f}, Range {range_pct:.1f}%',
-                        'weekly_adx': weekly_adx,
-                        'range_pct': range_pct
-                    }
-                )
+            return self._classify_values(weekly_adx, range_pct)
                 
         except Exception as e:
             logger.error(f"Error in auto-classification for {symbol}: {e}")
             return self._classify_manual(symbol)
     
+    def _classify_values(self, weekly_adx: float, range_pct: float) -> Tuple[str, int, Dict]:
+        """
+        Apply the AUTO thresholds to a weekly ADX and 12-week range
+        
+        Returns:
+            Tuple of (classification, confidence, details)
+        """
+        weekly_adx = float(weekly_adx)
+        range_pct = float(range_pct)
+        
+        # Get thresholds
+        trending_thresholds = self.auto_thresholds.get('TRENDING', {})
+        ranging_thresholds = self.auto_thresholds.get('RANGING', {})
+        
+        min_adx_trending = trending_thresholds.get('min_weekly_adx', 30)
+        min_range_trending = trending_thresholds.get('min_range_pct', 12.0)
+        
+        max_adx_ranging = ranging_thresholds.get('max_weekly_adx', 22)
+        max_range_ranging = ranging_thresholds.get('max_range_pct', 6.0)
+        
+        # Classify based on criteria
+        is_strong_trending = (weekly_adx > min_adx_trending and range_pct > min_range_trending)
+        is_moderate_trending = (weekly_adx > 25 and range_pct > 8.0) and not is_strong_trending
+        is_ranging = (weekly_adx < max_adx_ranging or range_pct < max_range_ranging)
+        
+        if is_strong_trending or is_moderate_trending:
+            confidence = 95 if is_strong_trending else 80
+            return (
+                self.TRENDING,
+                confidence,
+                {
+                    'method': 'auto',
+                    'reason': f'ADX {weekly_adx:.1f}, Range {range_pct:.1f}%',
+                    'weekly_adx': weekly_adx,
+                    'range_pct': range_pct,
+                    'strength': 'strong' if is_strong_trending else 'moderate'
+                }
+            )
+        elif is_ranging:
+            return (
+                self.RANGING,
+                85,
+                {
+                    'method': 'auto',
+                    'reason': f'ADX {weekly_adx:.1f}, Range {range_pct:.1f}%',
+                    'weekly_adx': weekly_adx,
+                    'range_pct': range_pct
+                }
+            )
+        else:
+            return (
+                self.MIXED,
+                60,
+                {
+                    'method': 'auto',
+                    'reason': f'ADX {weekly_adx:.1f}, Range {range_pct:.1f}%',
+                    'weekly_adx': weekly_adx,
+                    'range_pct': range_pct
+                }
+            )
+    
+    def _closed_weekly(self, symbol: str, weekly_df: pd.DataFrame) -> pd.DataFrame:
+        """Weekly bars without the still-forming week"""
+        if 'time' not in weekly_df.columns or len(weekly_df) == 0:
+            return weekly_df
+        closed = closed_bar_count(weekly_df['time'], 'W1')
+        if closed == len(weekly_df):
+            return weekly_df
+        return FeatureCache.stamp(weekly_df.iloc[:closed].copy(), symbol, 'W1')
+    
+    @staticmethod
+    def _week_key(closed: pd.DataFrame) -> Optional[str]:
+        """Cache key: open time of the last closed week"""
+        if len(closed) == 0 or 'time' not in closed.columns:
+            return None
+        return str(pd.Timestamp(closed['time'].iloc[-1]))
+    
+    def _cached(self, symbol: str, closed: pd.DataFrame) -> Optional[Tuple[str, int, Dict]]:
+        """Cached result if no week has closed since it was computed"""
+        entry = self._cache.get(symbol)
+        week = self._week_key(closed)
+        if entry is None or week is None or entry['week'] != week:
+            return None
+        return entry['classification'], entry['confidence'], dict(entry['details'], cached=True)
+    
+    def _store(self, symbol: str, closed: pd.DataFrame, result: Tuple[str, int, Dict]):
+        """Remember an AUTO result until the next week closes"""
+        week = self._week_key(closed)
+        classification, confidence, details = result
+        if week is None or details.get('method') != 'auto':
+            return  # manual fallbacks are retried on the next call
+        self._cache[symbol] = {
+            'week': week,
+            'classification': classification,
+            'confidence': int(confidence),
+            'details': details,
+        }
+    
+    def _load_cache(self) -> Dict:
+        """Read persisted AUTO results (discarded if the thresholds changed)"""
+        if not self.cache_path or not Path(self.cache_path).exists():
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+            if cache.get('thresholds') != self.auto_thresholds:
+                logger.info("Classification thresholds changed, cache discarded")
+                return {}
+            return cache.get('symbols', {})
+        except Exception as e:
+            logger.error(f"Error loading classification cache {self.cache_path}: {e}")
+            return {}
+    
+    def _save_cache(self):
+        """Persist AUTO results"""
+        if not self.cache_path:
+            return
+        try:
+            path = Path(self.cache_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump({'thresholds': self.auto_thresholds, 'symbols': self._cache}, f, indent=1)
+        except Exception as e:
+            logger.error(f"Error saving classification cache {self.cache_path}: {e}")
+    
     def get_atr_multipliers(self, classification: str) -> Dict[str, float]:
         """
         Get ATR multipliers for a classification
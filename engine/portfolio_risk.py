@@ -0,0 +1,324 @@
+"""
+Portfolio Risk
+Rolling return correlation across the universe, used to spot setups that
+are the same bet (e.g. five USD pairs at once) and the combined risk they carry
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicators.timeframes import closed_bar_count
+
+logger = logging.getLogger(__name__)
+
+
+class RollingCovariance:
+    """Covariance of the last `window` return vectors, updated in O(N²) per bar"""
+
+    def __init__(self, n_assets: int, window: int):
+        """
+        Initialize an empty window
+
+        Args:
+            n_assets: Number of assets (columns of each return vector)
+            window: Number of bars kept
+        """
+        self.n_assets = n_assets
+        self.window = window
+        self.buffer = np.zeros((window, n_assets))
+        self.sums = np.zeros(n_assets)
+        self.products = np.zeros((n_assets, n_assets))
+        self.count = 0      # Bars in the window
+        self.position = 0   # Next slot of the ring buffer
+        self._updates = 0   # Since the last exact recompute
+
+    def seed(self, returns: np.ndarray):
+        """
+        Fill the window from a block of returns [bars, n_assets]
+
+        Only the last `window` rows are kept; the sums are computed exactly.
+        """
+        returns = np.asarray(returns, dtype=float)[-self.window:]
+        self.buffer[:] = 0.0
+        self.count = len(returns)
+        self.buffer[:self.count] = returns
+        self.position = self.count % self.window
+        self._recompute()
+
+    def update(self, returns: np.ndarray):
+        """
+        Add one return vector, dropping the oldest once the window is full
+
+        Args:
+            returns: Returns of all assets on the new bar
+        """
+        returns = np.asarray(returns, dtype=float)
+        if self.count == self.window:
+            oldest = self.buffer[self.position]
+            self.sums -= oldest
+            self.products -= np.outer(oldest, oldest)
+        else:
+            self.count += 1
+
+        self.buffer[self.position] = returns
+        self.sums += returns
+        self.products += np.outer(returns, returns)
+        self.position = (self.position + 1) % self.window
+
+        # Add/subtract accumulates rounding error; an exact pass every
+        # `window` updates keeps the amortized cost at O(N²) per bar
+        self._updates += 1
+        if self._updates >= self.window:
+            self._recompute()
+
+    def _recompute(self):
+        """Exact sums from the buffer"""
+        rows = self.buffer[:self.count]
+        self.sums = rows.sum(axis=0)
+        self.products = rows.T @ rows
+        self._updates = 0
+
+    def covariance(self) -> np.ndarray:
+        """Sample covariance matrix (zeros with fewer than 2 bars)"""
+        if self.count < 2:
+            return np.zeros((self.n_assets, self.n_assets))
+        mean = self.sums / self.count
+        return (self.products - self.count * np.outer(mean, mean)) / (self.count - 1)
+
+    def correlation(self) -> np.ndarray:
+        """Correlation matrix (0 for assets without variance, 1 on the diagonal)"""
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+        scale = np.outer(std, std)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.where(scale > 0, cov / scale, 0.0)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+
+class PortfolioRisk:
+    """Correlated exposure of concurrent setups"""
+
+    def __init__(self, config: Dict):
+        """
+        Initialize portfolio risk
+
+        Args:
+            config: Configuration dictionary
+        """
+        self.config = config
+        self.timeframe = config.get('PORTFOLIO_CORRELATION_TIMEFRAME', 'D1')
+        self.window = config.get('PORTFOLIO_CORRELATION_WINDOW', 60)
+        self.threshold = config.get('PORTFOLIO_CORRELATION_THRESHOLD', 0.7)
+        self.max_cluster_risk_r = config.get('PORTFOLIO_MAX_CLUSTER_RISK_R', 2.0)
+
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.rolling: Optional[RollingCovariance] = None
+        self.last_time = None
+
+    def update(self, bars: Dict[str, pd.DataFrame]) -> int:
+        """
+        Add the bars closed since the last update
+
+        The first call (or a change in the universe) seeds the window from
+        the history; later calls only add the new bars. Returns are log
+        returns of closed bars; a symbol without a bar at a time counts as 0.
+
+        Args:
+            bars: Dictionary {symbol: DataFrame with time and close} on PORTFOLIO_CORRELATION_TIMEFRAME
+
+        Returns:
+            Number of bars added
+        """
+        try:
+            series = {}
+            for symbol, df in bars.items():
+                if df is None or len(df) < 2:
+                    continue
+                times = np.asarray(pd.to_datetime(df['time']), dtype='datetime64[ns]')
+                closed = closed_bar_count(times, self.timeframe)
+                series[symbol] = (times[:closed], df['close'].to_numpy(dtype=float)[:closed])
+
+            if not series:
+                return 0
+
+            symbols = sorted(series)
+            reseed = self.rolling is None or symbols != self.symbols
+
+            # Log returns per symbol (only the bars after last_time on updates)
+            returns = {}
+            for symbol in symbols:
+                times, close = series[symbol]
+                first = 0 if reseed else max(int(np.searchsorted(times, self.last_time, side='right')) - 1, 0)
+                times, close = times[first:], close[first:]
+                if len(close) >= 2:
+                    returns[symbol] = (times[1:], np.diff(np.log(close)))
+
+            if not returns:
+                return 0
+            bar_times = np.unique(np.concatenate([r[0] for r in returns.values()]))
+            if not reseed:
+                bar_times = bar_times[bar_times > self.last_time]
+            if len(bar_times) == 0:
+                return 0
+
+            # [bars x symbols], 0 where a symbol has no bar at a time
+            values = np.zeros((len(bar_times), len(symbols)))
+            for j, symbol in enumerate(symbols):
+                if symbol not in returns:
+                    continue
+                times, r = returns[symbol]
+                rows = np.searchsorted(bar_times, times)
+                inside = rows < len(bar_times)
+                inside[inside] = bar_times[rows[inside]] == times[inside]
+                values[rows[inside], j] = r[inside]
+            values = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+
+            if reseed:
+                self.symbols = symbols
+                self.index = {symbol: i for i, symbol in enumerate(symbols)}
+                self.rolling = RollingCovariance(len(symbols), self.window)
+                self.rolling.seed(values)
+                logger.info(f"Correlation window seeded: {len(symbols)} symbols, {self.rolling.count} bars")
+            else:
+                for row in values:
+                    self.rolling.update(row)
+
+            self.last_time = bar_times[-1]
+            return len(values)
+
+        except Exception as e:
+            logger.error(f"Error updating correlation window: {e}")
+            return 0
+
+    def correlation(self) -> pd.DataFrame:
+        """Current correlation matrix labelled by symbol"""
+        if self.rolling is None:
+            return pd.DataFrame()
+        return pd.DataFrame(self.rolling.correlation(), index=self.symbols, columns=self.symbols)
+
+    def assess(self, setups: Dict[str, Dict]) -> Dict:
+        """
+        Group concurrent setups into correlated clusters
+
+        Two setups are in the same cluster when their direction-adjusted
+        correlation (correlation x direction_a x direction_b) is at least
+        PORTFOLIO_CORRELATION_THRESHOLD, directly or through other setups.
+        A cluster's risk is sqrt(x' C x) over the signed risk amounts x.
+
+        Args:
+            setups: Dictionary {symbol: RiskCalculator.calculate_risk_parameters() result}
+
+        Returns:
+            Dictionary with 'symbols' {symbol: per-setup exposure}, 'clusters'
+            (list of {members, risk_amount, risk_r, flagged}) and portfolio
+            totals (sum_risk, correlated_risk, effective_bets)
+        """
+        try:
+            active = [s for s, risk in setups.items() if risk.get('setup_type', 0) != 0 and risk.get('risk_amount', 0) > 0]
+            if not active:
+                return self._empty_assessment()
+
+            corr = self._correlation_of(active)
+            direction = np.array([setups[s]['setup_type'] for s in active], dtype=float)
+            risk = np.array([setups[s]['risk_amount'] for s in active], dtype=float)
+            exposure = direction * risk
+            aligned = corr * np.outer(direction, direction)
+
+            # Connected components of the "same bet" graph
+            linked = aligned >= self.threshold
+            labels = np.full(len(active), -1)
+            for start in range(len(active)):
+                if labels[start] >= 0:
+                    continue
+                stack = [start]
+                labels[start] = start
+                while stack:
+                    i = stack.pop()
+                    for j in np.flatnonzero(linked[i] & (labels < 0)):
+                        labels[j] = start
+                        stack.append(j)
+
+            unit_risk = float(np.median(risk))
+            clusters, per_symbol = [], {}
+            for label in np.unique(labels):
+                members = np.flatnonzero(labels == label)
+                x = exposure[members]
+                cluster_risk = float(np.sqrt(max(x @ corr[np.ix_(members, members)] @ x, 0.0)))
+                cluster_r = cluster_risk / unit_risk
+                names = [active[i] for i in members]
+                flagged = len(members) > 1 and cluster_r > self.max_cluster_risk_r
+                clusters.append({
+                    'members': names,
+                    'risk_amount': cluster_risk,
+                    'risk_r': cluster_r,
+                    'flagged': flagged,
+                })
+                for i in members:
+                    per_symbol[active[i]] = {
+                        'cluster': names,
+                        'cluster_risk_amount': cluster_risk,
+                        'cluster_risk_r': cluster_r,
+                        'clustered': len(members) > 1,
+                        'flagged': flagged,
+                        # Scale that brings the cluster back to PORTFOLIO_MAX_CLUSTER_RISK_R
+                        'risk_scale': min(1.0, self.max_cluster_risk_r / cluster_r) if cluster_r > 0 else 1.0,
+                    }
+
+            correlated = float(np.sqrt(max(exposure @ corr @ exposure, 0.0)))
+            clusters.sort(key=lambda c: c['risk_amount'], reverse=True)
+            return {
+                'symbols': per_symbol,
+                'clusters': clusters,
+                'sum_risk': float(risk.sum()),
+                'correlated_risk': correlated,
+                'independent_risk': float(np.sqrt((risk ** 2).sum())),
+                # Number of independent bets with the same combined risk
+                'effective_bets': float((risk.sum() / correlated) ** 2) if correlated > 0 else 0.0,
+            }
+
+        except Exception as e:
+            logger.error(f"Error assessing portfolio risk: {e}")
+            return self._empty_assessment()
+
+    def annotate(self, setups: Dict[str, Dict]) -> Dict:
+        """
+        Add each setup's exposure to its risk dictionary under 'portfolio'
+
+        Args:
+            setups: Dictionary {symbol: RiskCalculator result} (modified in place)
+
+        Returns:
+            The assess() result
+        """
+        assessment = self.assess(setups)
+        for symbol, risk in setups.items():
+            risk['portfolio'] = assessment['symbols'].get(symbol)
+        return assessment
+
+    def _correlation_of(self, symbols: List[str]) -> np.ndarray:
+        """Correlation sub-matrix (symbols outside the window are uncorrelated)"""
+        full = self.rolling.correlation() if self.rolling is not None else np.eye(0)
+        positions = np.array([self.index.get(s, -1) for s in symbols])
+        known = positions >= 0
+        corr = np.eye(len(symbols))
+        inner = np.ix_(np.flatnonzero(known), np.flatnonzero(known))
+        corr[inner] = full[np.ix_(positions[known], positions[known])]
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    def _empty_assessment(self) -> Dict:
+        """Return an assessment without setups"""
+        return {
+            'symbols': {},
+            'clusters': [],
+            'sum_risk': 0.0,
+            'correlated_risk': 0.0,
+            'independent_risk': 0.0,
+            'effective_bets': 0.0,
+        }
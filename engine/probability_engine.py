@@ -12,6 +12,14 @@ from indicators.momentum_analysis import MomentumAnalyzer
 from indicators.volume_analysis import VolumeAnalyzer
 from indicators.spring_detector import SpringDetector
 from indicators.technical_indicators import TechnicalIndicators
+from indicators import kernels
+from indicators.feature_cache import feature_cache, configure_feature_cache
+from indicators.indicator_backend import select_backend, get_backend
+from indicators.lookback import lookback_registry
+from indicators.tail_evaluation import ema_warmup_bars
+from indicators.timeframes import completed_bar_index, align_values, utc_times
+from engine.stage_timer import configure_stage_timer, stage_timer, NULL_CLOCK
+from engine.results import ProbabilityResult
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +27,50 @@ logger = logging.getLogger(__name__)
 class ProbabilityEngine:
     """Calculate setup probability score"""
     
+    # Component weights of the base probability
+    WEIGHTS = {'time': 0.20, 'volume': 0.20, 'obv': 0.15, 'spring': 0.10, 'momentum': 0.25}
+    ALIGNMENT_BONUS = 10  # HTF alignment
+    
+    # Quality bonuses
+    SPRING_COMPLETE_BONUS = 10
+    OBV_DIVERGENCE_BONUS = 8   # Divergence in the setup direction
+    LONG_TIME_BONUS = 7
+    LONG_TIME_BARS = 12        # Time at level that earns LONG_TIME_BONUS
+    VOLUME_SPIKE_BONUS = 5
+    
+    DEFAULT_HTF_FACTOR = 0.5
+    ZONE_WIDTH_MULTIPLIER = 1.5  # Zone width in Murrey increments (before the ATR floor)
+    M15_CHECK_PROBABILITY = 70  # Check 15M confirmation from this probability
+    
+    # One row of calculate_probability_batch()
+    BATCH_DTYPE = np.dtype([
+        ('symbol', 'U32'),
+        ('setup_type', 'i1'),            # 1=long, -1=short, 0=none
+        ('reference_level', 'f8'),
+        ('current_price', 'f8'),
+        ('zone_width', 'f8'),
+        ('time_at_level', 'i8'),
+        ('time_score', 'f8'),
+        ('volume_score', 'f8'),
+        ('obv_score', 'f8'),
+        ('spring_score', 'f8'),
+        ('combined_momentum', 'f8'),
+        ('htf_aligned', '?'),
+        ('volume_spike', '?'),
+        ('obv_divergence', 'i1'),
+        ('spring_complete', '?'),
+        ('alignment_bonus', 'f8'),
+        ('quality_bonus', 'f8'),
+        ('base_probability', 'f8'),
+        ('adjusted_probability', 'f8'),
+        ('htf_factor', 'f8'),
+        ('probability', 'f8'),
+        ('m15_confirmed', '?'),
+    ])
+    
+    # One row per H1 bar of probability_history()
+    HISTORY_DTYPE = np.dtype([field for field in BATCH_DTYPE.descr if field[0] != 'symbol'])
+    
     def __init__(self, config: Dict):
         """
         Initialize probability engine
@@ -28,6 +80,13 @@ class ProbabilityEngine:
         """
         self.config = config
         self.min_time_bars = config.get('MIN_TIME_AT_LEVEL', 10)
+        self.zone_width_multiplier = config.get('ZONE_WIDTH_MULTIPLIER', self.ZONE_WIDTH_MULTIPLIER)
+        self.prefilter_margin = config.get('PREFILTER_ZONE_MARGIN', 0.5)
+        
+        # Shared per-bar feature cache and indicator backend
+        configure_feature_cache(config)
+        configure_stage_timer(config)
+        select_backend(config.get('INDICATOR_BACKEND', 'AUTO'))
         
         # Initialize analyzers
         self.murrey = MurreyMath(
@@ -35,7 +94,10 @@ class ProbabilityEngine:
             multiplier=config.get('MURREY_MULTIPLIER', 1.5),
             ignore_wicks=config.get('MURREY_IGNORE_WICKS', True)
         )
-        self.momentum_analyzer = MomentumAnalyzer()
+        self.momentum_analyzer = MomentumAnalyzer(
+            live_mode=config.get('STREAMING_INDICATORS_ENABLED', False),
+            tail_tolerance=config.get('MOMENTUM_TAIL_TOLERANCE')
+        )
         self.volume_analyzer = VolumeAnalyzer(
             volume_spike_threshold=config.get('VOLUME_SPIKE_THRESHOLD', 1.5)
         )
@@ -43,9 +105,34 @@ class ProbabilityEngine:
             volume_spike_threshold=config.get('VOLUME_SPIKE_THRESHOLD', 1.5),
             max_snapback_bars=config.get('SPRING_MAX_BARS', 3)
         )
+        
+        self._declare_lookback()
+    
+    def _declare_lookback(self):
+        """Register the bars each analyzer needs on the timeframe it runs on"""
+        lookback_registry.declare('momentum', {
+            tf: self.momentum_analyzer.required_bars() for tf in ('W1', 'D1', 'H4', 'H1')
+        })
+        lookback_registry.declare('probability_engine', {
+            'H1': max(
+                100,  # calculate_probability minimum
+                self.murrey.required_bars(),
+                self.volume_analyzer.required_bars(lookback=10),
+                self.spring_detector.required_bars()
+            ),
+            'D1': TechnicalIndicators.atr_required_bars(14),
+            'M15': self._m15_required_bars(),
+        })
+    
+    def _m15_required_bars(self) -> Optional[int]:
+        """Bars for the 15M confirmation (RSI 14 and EMA 8)"""
+        tolerance = self.momentum_analyzer.tail_tolerance
+        if not tolerance or get_backend().smoothing != 'sma':
+            return None
+        return max(20, ema_warmup_bars(8, tolerance) + 1)
     
     def calculate_probability(self, symbol: str, data_dict: Dict[str, pd.DataFrame], 
-                             pair_classification: str, htf_momentum: Dict) -> Dict:
+                             pair_classification: str, htf_momentum: Dict) -> ProbabilityResult:
         """
         Calculate complete probability score for a setup
         
@@ -56,77 +143,34 @@ class ProbabilityEngine:
             htf_momentum: HTF momentum analysis results
             
         Returns:
-            Dictionary with probability score and all components
+            ProbabilityResult with probability score and all components
         """
         try:
-            # Get primary timeframe data (1H)
-            h1_df = data_dict.get('H1')
-            if h1_df is None or len(h1_df) < 100:
-                logger.warning(f"Insufficient H1 data for {symbol}")
-                return self._empty_probability()
-            
-            # Calculate Murrey Math levels
-            levels = self.murrey.calculate_levels(h1_df)
-            if not levels:
-                logger.warning(f"Could not calculate Murrey levels for {symbol}")
+            clock = stage_timer.clock(symbol)
+            components = self._setup_components(symbol, data_dict, htf_momentum, clock)
+            if components is None:
                 return self._empty_probability()
             
-            current_price = h1_df['close'].iloc[-1]
-            increment = levels.get('increment', 0)
-            zone_width = increment * 1.5
-            
-            # Calculate Daily ATR for zone width adjustment
-            d1_df = data_dict.get('D1')
-            daily_atr = TechnicalIndicators.calculate_atr(d1_df) if d1_df is not None else 0
-            zone_width_adaptive = max(zone_width, daily_atr * 2)
-            
-            # Determine setup type
-            setup_type, reference_level = self._determine_setup_type(
-                current_price, levels, zone_width_adaptive, htf_momentum
-            )
-            
-            if setup_type == 0:
-                # Not at 0/8 or 8/8
-                return self._empty_probability()
-            
-            # Calculate time at level
-            time_at_level = self._calculate_time_at_level(
-                h1_df, reference_level, zone_width_adaptive, setup_type
-            )
-            
-            # Component 1: Time at level score (20% weight)
-            time_score = self._calculate_time_score(time_at_level)
-            
-            # Component 2: Volume analysis (20% weight)
-            volume_analysis = self.volume_analyzer.analyze_volume_pattern(h1_df, lookback=10)
+            setup_type = components['setup_type']
+            time_at_level = components['time_at_level']
+            time_score = components['time_score']
+            volume_analysis = components['volume_analysis']
             volume_score = volume_analysis['score']
-            
-            # Component 3: OBV divergence (15% weight)
-            obv_analysis = self.volume_analyzer.detect_obv_divergence(
-                h1_df, setup_type, reference_level
-            )
+            obv_analysis = components['obv_analysis']
             obv_score = obv_analysis['score']
-            
-            # Component 4: Spring/shakeout pattern (10% weight)
-            spring_analysis = self.spring_detector.detect_spring(
-                h1_df, reference_level, increment, setup_type, time_at_level
-            )
+            spring_analysis = components['spring_analysis']
             spring_score = spring_analysis['score']
-            
-            # Component 5: HTF momentum (25% weight)
-            combined_momentum = htf_momentum.get('combined', {}).get('momentum', 0)
-            
-            # Component 6: HTF alignment bonus (10% weight)
-            htf_aligned = htf_momentum.get('combined', {}).get('htf_aligned', False)
-            alignment_bonus = 10 if htf_aligned else 0
+            combined_momentum = components['combined_momentum']
+            htf_aligned = components['htf_aligned']
+            alignment_bonus = self.ALIGNMENT_BONUS if htf_aligned else 0
             
             # Calculate base probability (weighted sum)
             base_probability = (
-                (time_score * 0.20) +
-                (volume_score * 0.20) +
-                (obv_score * 0.15) +
-                (spring_score * 0.10) +
-                (combined_momentum * 0.25) +
+                (time_score * self.WEIGHTS['time']) +
+                (volume_score * self.WEIGHTS['volume']) +
+                (obv_score * self.WEIGHTS['obv']) +
+                (spring_score * self.WEIGHTS['spring']) +
+                (combined_momentum * self.WEIGHTS['momentum']) +
                 alignment_bonus
             )
             
@@ -134,59 +178,535 @@ class ProbabilityEngine:
             quality_bonus = 0.0
             
             if spring_analysis['state'] == SpringDetector.STATE_COMPLETE:
-                quality_bonus += 10
+                quality_bonus += self.SPRING_COMPLETE_BONUS
             
             if obv_analysis['divergence'] == 1 and setup_type == 1:
-                quality_bonus += 8
+                quality_bonus += self.OBV_DIVERGENCE_BONUS
             elif obv_analysis['divergence'] == -1 and setup_type == -1:
-                quality_bonus += 8
+                quality_bonus += self.OBV_DIVERGENCE_BONUS
             
-            if time_at_level >= 12:
-                quality_bonus += 7
+            if time_at_level >= self.LONG_TIME_BARS:
+                quality_bonus += self.LONG_TIME_BONUS
             
             if volume_analysis['volume_spike_detected']:
-                quality_bonus += 5
+                quality_bonus += self.VOLUME_SPIKE_BONUS
             
             # Adjusted probability
             adjusted_probability = min(100, base_probability + quality_bonus)
             
             # Apply HTF factor
-            htf_factor = htf_momentum.get('combined', {}).get('htf_factor', 0.5)
+            htf_factor = components['htf_factor']
             final_probability = adjusted_probability * htf_factor
             
             # Check 15M confirmation (if near entry)
             m15_confirmed = False
-            if final_probability >= 70:
+            if final_probability >= self.M15_CHECK_PROBABILITY:
                 m15_df = data_dict.get('M15')
                 if m15_df is not None:
                     m15_confirmed = self._check_15m_confirmation(m15_df, setup_type)
+                    clock.lap('m15_confirmation')
+            
+            return ProbabilityResult(
+                probability=float(final_probability),
+                adjusted_probability=float(adjusted_probability),
+                setup_type=int(setup_type),  # 1=long, -1=short
+                setup_direction='LONG' if setup_type == 1 else 'SHORT',
+                reference_level=float(components['reference_level']),
+                current_price=float(components['current_price']),
+                murrey_levels=components['levels'],
+                zone_width=float(components['zone_width']),
+                time_at_level=int(time_at_level),
+                time_score=float(time_score),
+                volume_score=float(volume_score),
+                obv_score=float(obv_score),
+                obv_analysis=obv_analysis,
+                spring_score=float(spring_score),
+                spring_analysis=spring_analysis,
+                combined_momentum=float(combined_momentum),
+                htf_aligned=bool(htf_aligned),
+                htf_factor=float(htf_factor),
+                m15_confirmed=bool(m15_confirmed),
+                quality_bonus=float(quality_bonus),
+            )
             
+        except Exception as e:
+            logger.error(f"Error calculating probability for {symbol}: {e}")
+            return self._empty_probability()
+    
+    def _setup_components(self, symbol: str, data_dict: Dict[str, pd.DataFrame],
+                          htf_momentum: Dict, clock=NULL_CLOCK) -> Optional[Dict]:
+        """
+        Run the analyzers behind the probability score
+        
+        Args:
+            symbol: Trading symbol
+            data_dict: Dictionary of {timeframe: DataFrame}
+            htf_momentum: HTF momentum analysis results
+            clock: StageTimer clock that times each analyzer
+        
+        Returns:
+            Dictionary with setup, levels, component analyses and HTF values,
+            or None when there is no 0/8 or 8/8 setup
+        """
+        # Get primary timeframe data (1H)
+        h1_df = data_dict.get('H1')
+        if h1_df is None or len(h1_df) < 100:
+            logger.warning(f"Insufficient H1 data for {symbol}")
+            return None
+        
+        # Calculate Murrey Math levels and the zone width
+        geometry = self._zone_geometry(h1_df, data_dict.get('D1'), clock)
+        if geometry is None:
+            logger.warning(f"Could not calculate Murrey levels for {symbol}")
+            return None
+        
+        levels = geometry['levels']
+        current_price = geometry['current_price']
+        increment = geometry['increment']
+        zone_width_adaptive = geometry['zone_width']
+        
+        # Determine setup type
+        setup_type, reference_level = self._determine_setup_type(
+            current_price, levels, zone_width_adaptive, htf_momentum
+        )
+        clock.lap('setup_type')
+        
+        if setup_type == 0:
+            # Not at 0/8 or 8/8
+            return None
+        
+        # Calculate time at level
+        time_at_level = self._calculate_time_at_level(
+            h1_df, reference_level, zone_width_adaptive, setup_type
+        )
+        clock.lap('time_at_level')
+        
+        # Component 2: Volume analysis (20% weight)
+        volume_analysis = self.volume_analyzer.analyze_volume_pattern(h1_df, lookback=10)
+        clock.lap('volume')
+        
+        # Component 3: OBV divergence (15% weight)
+        obv_analysis = self.volume_analyzer.detect_obv_divergence(h1_df, setup_type, reference_level)
+        clock.lap('obv')
+        
+        # Component 4: Spring/shakeout pattern (10% weight)
+        spring_analysis = self.spring_detector.detect_spring(
+            h1_df, reference_level, increment, setup_type, time_at_level
+        )
+        clock.lap('spring')
+        
+        combined = htf_momentum.get('combined', {})
+        return {
+            'setup_type': setup_type,
+            'reference_level': reference_level,
+            'current_price': current_price,
+            'levels': levels,
+            'zone_width': zone_width_adaptive,
+            'time_at_level': time_at_level,
+            # Component 1: Time at level score (20% weight)
+            'time_score': self._calculate_time_score(time_at_level),
+            'volume_analysis': volume_analysis,
+            'obv_analysis': obv_analysis,
+            'spring_analysis': spring_analysis,
+            # Component 5: HTF momentum (25% weight)
+            'combined_momentum': combined.get('momentum', 0),
+            # Component 6: HTF alignment bonus (10 points)
+            'htf_aligned': combined.get('htf_aligned', False),
+            'htf_factor': combined.get('htf_factor', self.DEFAULT_HTF_FACTOR),
+        }
+    
+    def _zone_geometry(self, h1_df: pd.DataFrame, d1_df: Optional[pd.DataFrame],
+                       clock=NULL_CLOCK) -> Optional[Dict]:
+        """
+        Murrey levels, current price and adaptive zone width
+        
+        Returns:
+            Dictionary with levels, current_price, increment and zone_width
+            (max of the Murrey width and 2x daily ATR), or None without levels
+        """
+        levels = self.murrey.calculate_levels(h1_df)
+        clock.lap('murrey')
+        if not levels:
+            return None
+        
+        increment = levels.get('increment', 0)
+        zone_width = increment * self.zone_width_multiplier
+        
+        # Calculate Daily ATR for zone width adjustment
+        daily_atr = TechnicalIndicators.calculate_atr(d1_df) if d1_df is not None else 0
+        clock.lap('atr')
+        
+        return {
+            'levels': levels,
+            'current_price': h1_df['close'].iloc[-1],
+            'increment': increment,
+            'zone_width': max(zone_width, daily_atr * 2),
+        }
+    
+    def zone_prefilter(self, symbol: str, data_dict: Dict[str, pd.DataFrame],
+                       margin: Optional[float] = None) -> Dict:
+        """
+        Cheap check whether a symbol can have a setup, from H1 and D1 only
+        
+        A setup needs price inside the 0/8 or 8/8 zone (see
+        _determine_setup_type()), so a symbol further than `margin` zone
+        widths from both zones would get _empty_probability() anyway. HTF
+        direction is not checked, so every symbol that could have a setup
+        passes.
+        
+        Args:
+            symbol: Trading symbol
+            data_dict: Dictionary with at least H1 (and D1 for the ATR width)
+            margin: Distance outside a zone that still passes, in zone
+                    widths (default PREFILTER_ZONE_MARGIN)
+            
+        Returns:
+            Dictionary with passed, in_zone, side (1 = 0/8, -1 = 8/8, 0 =
+            neither), distance (zone widths outside the nearest zone, 0
+            inside), zone_width and current_price
+        """
+        margin = self.prefilter_margin if margin is None else margin
+        try:
+            h1_df = data_dict.get('H1')
+            if h1_df is None or len(h1_df) < 100:
+                return self._prefilter_result(False)
+            
+            geometry = self._zone_geometry(h1_df, data_dict.get('D1'))
+            if geometry is None or geometry['zone_width'] <= 0:
+                return self._prefilter_result(False)
+            
+            price = geometry['current_price']
+            width = geometry['zone_width']
+            levels = geometry['levels']
+            
+            # Same zone bounds as MurreyMath.is_at_zero_eight / is_at_eight_eight
+            distances = {}
+            if '0_8' in levels:
+                low, high = levels['0_8'] - width * 0.5, levels['0_8'] + width
+                distances[1] = max(low - price, price - high, 0.0) / width
+            if '8_8' in levels:
+                low, high = levels['8_8'] - width, levels['8_8'] + width * 0.5
+                distances[-1] = max(low - price, price - high, 0.0) / width
+            if not distances:
+                return self._prefilter_result(False)
+            
+            side = min(distances, key=distances.get)
+            distance = float(distances[side])
             return {
-                'probability': final_probability,
-                'adjusted_probability': adjusted_probability,
-                'setup_type': setup_type,  # 1=long, -1=short
-                'setup_direction': 'LONG' if setup_type == 1 else 'SHORT',
-                'reference_level': reference_level,
-                'current_price': current_price,
-                'murrey_levels': levels,
-                'zone_width': zone_width_adaptive,
-                'time_at_level': time_at_level,
-                'time_score': time_score,
-                'volume_score': volume_score,
-                'obv_score': obv_score,
-                'obv_analysis': obv_analysis,
-                'spring_score': spring_score,
-                'spring_analysis': spring_analysis,
-                'combined_momentum': combined_momentum,
-                'htf_aligned': htf_aligned,
-                'htf_factor': htf_factor,
-                'm15_confirmed': m15_confirmed,
-                'quality_bonus': quality_bonus,
+                'passed': distance <= margin,
+                'in_zone': distance == 0.0,
+                'side': side if distance <= margin else 0,
+                'distance': distance,
+                'zone_width': float(width),
+                'current_price': float(price),
             }
             
         except Exception as e:
-            logger.error(f"Error calculating probability for {symbol}: {e}")
-            return self._empty_probability()
+            logger.error(f"Error in zone prefilter for {symbol}: {e}")
+            # Undecided symbols go through the full analysis
+            return self._prefilter_result(True)
+    
+    def prefilter_universe(self, universe: Dict[str, Dict[str, pd.DataFrame]],
+                           margin: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Run zone_prefilter() over a universe of H1/D1 data
+        
+        Can be passed as-is to DataFetcher.get_universe_data(prefilter=...),
+        which fetches fully only the symbols whose result has 'passed'.
+        
+        Returns:
+            Dictionary {symbol: zone_prefilter() result}
+        """
+        results = {symbol: self.zone_prefilter(symbol, data_dict, margin) for symbol, data_dict in universe.items()}
+        passed = sum(1 for r in results.values() if r['passed'])
+        logger.info(f"Zone prefilter: {passed}/{len(results)} symbols in or near a 0/8 or 8/8 zone")
+        return results
+    
+    @staticmethod
+    def _prefilter_result(passed: bool) -> Dict:
+        """Prefilter result without zone information"""
+        return {
+            'passed': passed,
+            'in_zone': False,
+            'side': 0,
+            'distance': float('inf'),
+            'zone_width': 0.0,
+            'current_price': 0.0,
+        }
+    
+    def calculate_probability_batch(self, universe: Dict[str, Dict[str, pd.DataFrame]],
+                                    htf_momentum: Optional[Dict[str, Dict]] = None) -> np.ndarray:
+        """
+        Calculate probability scores for a whole universe
+        
+        The zone, volume and spring analyzers still run per symbol; the
+        weighted sum, bonuses and HTF factor are applied to all symbols at
+        once. Given the same htf_momentum, scores match calculate_probability().
+        
+        Args:
+            universe: Dictionary {symbol: {timeframe: DataFrame}}
+            htf_momentum: Dictionary {symbol: analyze_multi_timeframe() result}
+                          (default: see _universe_momentum())
+            
+        Returns:
+            Record array (BATCH_DTYPE), one row per symbol in universe order;
+            symbols without a setup have setup_type 0 and probability 0
+        """
+        rows = np.zeros(len(universe), dtype=self.BATCH_DTYPE)
+        
+        try:
+            if htf_momentum is None:
+                htf_momentum = self._universe_momentum(universe)
+            
+            for i, (symbol, data_dict) in enumerate(universe.items()):
+                rows['symbol'][i] = symbol
+                try:
+                    components = self._setup_components(symbol, data_dict, htf_momentum.get(symbol, {}),
+                                                        stage_timer.clock(symbol))
+                except Exception as e:
+                    logger.error(f"Error calculating probability for {symbol}: {e}")
+                    continue
+                if components is not None:
+                    self._fill_row(rows[i], components)
+            
+            self.score_rows(rows)
+            
+            # Check 15M confirmation (if near entry)
+            for i in np.flatnonzero(rows['probability'] >= self.M15_CHECK_PROBABILITY):
+                m15_df = universe[rows['symbol'][i]].get('M15')
+                if m15_df is not None:
+                    clock = stage_timer.clock(rows['symbol'][i])
+                    rows['m15_confirmed'][i] = self._check_15m_confirmation(m15_df, int(rows['setup_type'][i]))
+                    clock.lap('m15_confirmation')
+            
+        except Exception as e:
+            logger.error(f"Error in batch probability calculation: {e}")
+        
+        return rows
+    
+    def _universe_momentum(self, universe: Dict[str, Dict[str, pd.DataFrame]]) -> Dict[str, Dict]:
+        """
+        HTF momentum of every symbol (timeframes other than M15)
+        
+        One analyze_panel() pass normally; in live mode the per-symbol
+        analyze_multi_timeframe() is used, since only it advances the
+        streaming states that calculate_probability()'s callers rely on.
+        """
+        frames = {
+            symbol: {tf: df for tf, df in data_dict.items() if tf != 'M15'}
+            for symbol, data_dict in universe.items()
+        }
+        analyzer = self.momentum_analyzer
+        if analyzer.live_mode:
+            return {symbol: analyzer.analyze_multi_timeframe(data_dict) for symbol, data_dict in frames.items()}
+        return analyzer.analyze_panel(frames)
+    
+    def probability_history(self, data_dict: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Probability score as of every H1 bar
+        
+        Row t is what calculate_probability() reports when the scan runs at
+        the close of H1 bar t, except that higher timeframes (D1 ATR, HTF
+        momentum, 15M confirmation) only use bars that had closed by then -
+        the live scan also sees the forming HTF bar. Every component runs
+        once over the whole history.
+        
+        Args:
+            data_dict: Dictionary of {timeframe: DataFrame} with 'time' columns
+            
+        Returns:
+            DataFrame on the H1 index with a 'time' column and the
+            HISTORY_DTYPE fields (setup_type 0 / probability 0 where there
+            is no setup)
+        """
+        h1_df = data_dict.get('H1')
+        if h1_df is None:
+            return pd.DataFrame(np.zeros(0, dtype=self.HISTORY_DTYPE))
+        
+        try:
+            n = len(h1_df)
+            times = h1_df['time']
+            close = h1_df['close'].to_numpy(dtype=float)
+            rows = np.zeros(n, dtype=self.HISTORY_DTYPE)
+            
+            # Murrey levels and ATR-adaptive zone width per bar
+            levels = self.murrey.rolling_levels(h1_df)
+            zero_level = levels['0_8'].to_numpy()
+            eight_level = levels['8_8'].to_numpy()
+            increment = levels['increment'].to_numpy()
+            zone_width = increment * self.zone_width_multiplier
+            
+            d1_df = data_dict.get('D1')
+            if d1_df is not None:
+                atr = TechnicalIndicators.calculate_atr_series(d1_df).to_numpy()
+                daily_atr = align_values(atr, completed_bar_index(times, 'H1', d1_df['time'], 'D1'))
+            else:
+                daily_atr = np.zeros(n)
+            with np.errstate(invalid='ignore'):
+                # max() keeps the Murrey width when the ATR is NaN
+                zone_width = np.where(daily_atr * 2 > zone_width, daily_atr * 2, zone_width)
+            
+            # HTF momentum aligned to completed bars
+            momentum = {}
+            for tf in self.momentum_analyzer.TIMEFRAME_WEIGHTS:
+                df = data_dict.get(tf)
+                if df is None:
+                    continue
+                series = self.momentum_analyzer.momentum_series(df)
+                if tf != 'H1':
+                    index = completed_bar_index(times, 'H1', df['time'], tf)
+                    series = pd.DataFrame({
+                        'direction': align_values(series['direction'].to_numpy(), index, 0),
+                        'strength': align_values(series['strength'].to_numpy(), index, 0.0),
+                    }, index=h1_df.index)
+                momentum[tf] = series
+            combined = self.momentum_analyzer.combine_series(momentum) if momentum else None
+            
+            # Setup type (needs 100 H1 bars, like calculate_probability)
+            weekly_dir = momentum['W1']['direction'].to_numpy() if 'W1' in momentum else np.zeros(n)
+            daily_dir = momentum['D1']['direction'].to_numpy() if 'D1' in momentum else np.zeros(n)
+            with np.errstate(invalid='ignore'):
+                at_zero = (close >= zero_level - zone_width * 0.5) & (close <= zero_level + zone_width)
+                at_eight = (close >= eight_level - zone_width) & (close <= eight_level + zone_width * 0.5)
+            long_setup = at_zero & ((weekly_dir == 1) | (daily_dir == 1))
+            short_setup = ~long_setup & at_eight & ((weekly_dir == -1) | (daily_dir == -1))
+            setup_type = np.where(long_setup, 1, np.where(short_setup, -1, 0))
+            setup_type[:min(99, n)] = 0
+            active = setup_type != 0
+            reference_level = np.where(setup_type == 1, zero_level, np.where(setup_type == -1, eight_level, 0.0))
+            
+            # Time at level against each bar's own zone
+            zone_low = np.where(setup_type == 1, reference_level - zone_width * 0.5, reference_level - zone_width)
+            zone_high = np.where(setup_type == 1, reference_level + zone_width, reference_level + zone_width * 0.5)
+            time_at_level = kernels.run_length_within(
+                close, np.where(active, zone_low, np.nan), np.where(active, zone_high, np.nan)
+            )
+            time_score = np.where(time_at_level >= 16, 100.0,
+                                  np.where(time_at_level >= self.min_time_bars, 80.0,
+                                           np.where(time_at_level >= 6, 50.0, time_at_level * 8.0)))
+            
+            volume = self.volume_analyzer.volume_pattern_series(h1_df, lookback=10)
+            obv = self.volume_analyzer.obv_divergence_series(h1_df, setup_type, reference_level)
+            spring = self.spring_detector.spring_series(
+                h1_df, reference_level, increment, setup_type, time_at_level
+            )
+            
+            rows['setup_type'] = setup_type
+            rows['reference_level'] = reference_level
+            rows['current_price'] = np.where(active, close, 0.0)
+            rows['zone_width'] = np.where(active, zone_width, 0.0)
+            rows['time_at_level'] = time_at_level
+            rows['time_score'] = np.where(active, time_score, 0.0)
+            rows['volume_score'] = np.where(active, volume['score'].to_numpy(), 0.0)
+            rows['volume_spike'] = active & volume['volume_spike_detected'].to_numpy()
+            rows['obv_score'] = np.where(active, obv['score'].to_numpy(), 0.0)
+            rows['obv_divergence'] = np.where(active, obv['divergence'].to_numpy(), 0)
+            rows['spring_score'] = np.where(active, spring['score'].to_numpy(), 0.0)
+            rows['spring_complete'] = active & (spring['state'].to_numpy() == SpringDetector.STATE_COMPLETE)
+            if combined is not None:
+                rows['combined_momentum'] = np.where(active, combined['momentum'].to_numpy(), 0.0)
+                rows['htf_aligned'] = active & combined['htf_aligned'].to_numpy()
+                rows['htf_factor'] = combined['htf_factor'].to_numpy()
+            else:
+                rows['htf_factor'] = self.DEFAULT_HTF_FACTOR
+            
+            self.score_rows(rows)
+            
+            # 15M confirmation from completed M15 bars
+            m15_df = data_dict.get('M15')
+            if m15_df is not None:
+                rows['m15_confirmed'] = (rows['probability'] >= self.M15_CHECK_PROBABILITY) & \
+                    self.m15_confirmation_history(times, m15_df, setup_type)
+            
+            history = pd.DataFrame(rows, index=h1_df.index)
+            history.insert(0, 'time', times.to_numpy())
+            return history
+            
+        except Exception as e:
+            logger.error(f"Error calculating probability history: {e}")
+            return pd.DataFrame(np.zeros(0, dtype=self.HISTORY_DTYPE))
+    
+    @staticmethod
+    def _fill_row(row, components: Dict):
+        """Copy one symbol's analyzer results into its record"""
+        volume_analysis = components['volume_analysis']
+        obv_analysis = components['obv_analysis']
+        spring_analysis = components['spring_analysis']
+        
+        row['setup_type'] = components['setup_type']
+        row['reference_level'] = components['reference_level']
+        row['current_price'] = components['current_price']
+        row['zone_width'] = components['zone_width']
+        row['time_at_level'] = components['time_at_level']
+        row['time_score'] = components['time_score']
+        row['volume_score'] = volume_analysis['score']
+        row['volume_spike'] = volume_analysis['volume_spike_detected']
+        row['obv_score'] = obv_analysis['score']
+        row['obv_divergence'] = obv_analysis['divergence']
+        row['spring_score'] = spring_analysis['score']
+        row['spring_complete'] = spring_analysis['state'] == SpringDetector.STATE_COMPLETE
+        row['combined_momentum'] = components['combined_momentum']
+        row['htf_aligned'] = components['htf_aligned']
+        row['htf_factor'] = components['htf_factor']
+    
+    @classmethod
+    def scoring_parameters(cls) -> Dict[str, float]:
+        """
+        Weights and bonuses of the probability score
+        
+        Returns:
+            Flat dictionary (weight_time, ..., volume_spike_bonus) as accepted
+            by score_rows()
+        """
+        parameters = {f'weight_{name}': weight for name, weight in cls.WEIGHTS.items()}
+        parameters.update({
+            'alignment_bonus': cls.ALIGNMENT_BONUS,
+            'spring_complete_bonus': cls.SPRING_COMPLETE_BONUS,
+            'obv_divergence_bonus': cls.OBV_DIVERGENCE_BONUS,
+            'long_time_bonus': cls.LONG_TIME_BONUS,
+            'volume_spike_bonus': cls.VOLUME_SPIKE_BONUS,
+        })
+        return parameters
+    
+    @classmethod
+    def score_rows(cls, rows: np.ndarray, parameters: Optional[Dict[str, float]] = None):
+        """
+        Weighted sum, bonuses and HTF factor for every row with a setup (in place)
+        
+        Args:
+            rows: Record array with the BATCH_DTYPE/HISTORY_DTYPE fields
+            parameters: Overrides of scoring_parameters() (default: none)
+        """
+        p = cls.scoring_parameters()
+        if parameters:
+            p.update(parameters)
+        active = rows['setup_type'] != 0
+        setup_type = rows['setup_type']
+        
+        rows['alignment_bonus'] = np.where(rows['htf_aligned'], p['alignment_bonus'], 0)
+        rows['base_probability'] = (
+            (rows['time_score'] * p['weight_time']) +
+            (rows['volume_score'] * p['weight_volume']) +
+            (rows['obv_score'] * p['weight_obv']) +
+            (rows['spring_score'] * p['weight_spring']) +
+            (rows['combined_momentum'] * p['weight_momentum']) +
+            rows['alignment_bonus']
+        )
+        
+        rows['quality_bonus'] = (
+            np.where(rows['spring_complete'], p['spring_complete_bonus'], 0) +
+            np.where((rows['obv_divergence'] == setup_type) & (setup_type != 0), p['obv_divergence_bonus'], 0) +
+            np.where(rows['time_at_level'] >= cls.LONG_TIME_BARS, p['long_time_bonus'], 0) +
+            np.where(rows['volume_spike'], p['volume_spike_bonus'], 0)
+        )
+        
+        rows['adjusted_probability'] = np.minimum(100, rows['base_probability'] + rows['quality_bonus'])
+        rows['probability'] = rows['adjusted_probability'] * rows['htf_factor']
+        
+        # Rows without a setup score zero, like _empty_probability()
+        for field in ('alignment_bonus', 'base_probability', 'quality_bonus',
+                      'adjusted_probability', 'htf_factor', 'probability'):
+            rows[field][~active] = 0
     
     def _determine_setup_type(self, current_price: float, levels: Dict, 
                               zone_width: float, htf_momentum: Dict) -> tuple:
@@ -226,29 +746,68 @@ class ProbabilityEngine:
                                   zone_width: float, setup_type: int) -> int:
         """Calculate how many bars price has been at the level"""
         try:
-            close = df['close']
-            
-            if setup_type == 1:  # Long at 0/8
-                zone_low = reference_level - zone_width * 0.5
-                zone_high = reference_level + zone_width
-            else:  # Short at 8/8
-                zone_low = reference_level - zone_width
-                zone_high = reference_level + zone_width * 0.5
-            
-            # Count consecutive bars in zone
-            time_at_level = 0
-            for i in range(len(close) - 1, -1, -1):
-                if zone_low <= close.iloc[i] <= zone_high:
-                    time_at_level += 1
-                else:
-                    break
-            
-            return time_at_level
+            run = self._zone_run_length(df['close'].to_numpy(), reference_level, zone_width, setup_type)
+            return int(run[-1]) if len(run) > 0 else 0
             
         except Exception as e:
             logger.error(f"Error calculating time at level: {e}")
             return 0
     
+    @staticmethod
+    def _zone_run_length(close: np.ndarray, reference_level, zone_width, setup_type: int) -> np.ndarray:
+        """
+        Consecutive bars in the setup zone, for every bar
+        
+        Args:
+            close: Close prices
+            reference_level: 0/8 or 8/8 level (scalar or one per bar)
+            zone_width: Zone width (scalar or one per bar)
+            setup_type: 1 for long (0/8 zone), -1 for short (8/8 zone)
+        
+        With per-bar levels, the count at bar t measures earlier closes
+        against bar t's zone, as the live check at bar t would.
+        """
+        reference_level = np.asarray(reference_level, dtype=float)
+        zone_width = np.asarray(zone_width, dtype=float)
+        
+        if setup_type == 1:  # Long at 0/8
+            zone_low = reference_level - zone_width * 0.5
+            zone_high = reference_level + zone_width
+        else:  # Short at 8/8
+            zone_low = reference_level - zone_width
+            zone_high = reference_level + zone_width * 0.5
+        
+        if reference_level.ndim == 0 and zone_width.ndim == 0:
+            in_zone = (close >= zone_low) & (close <= zone_high)
+            return kernels.run_length(in_zone)
+        
+        # Per-bar zones: bar t counts back against its own zone
+        return kernels.run_length_within(close, zone_low, zone_high)
+    
+    @staticmethod
+    def time_at_level_series(close: pd.Series, zero_level, eight_level, zone_width) -> pd.DataFrame:
+        """
+        Time at level for every bar, for both setup zones
+        
+        The live scan reads the last row; history and backtests use the
+        whole series. Levels and widths may be scalars or per-bar arrays
+        (e.g. rolling Murrey levels and ATR-adaptive widths).
+        
+        Args:
+            close: Close prices
+            zero_level: 0/8 level(s)
+            eight_level: 8/8 level(s)
+            zone_width: Zone width(s)
+            
+        Returns:
+            DataFrame with 'long' (0/8 zone) and 'short' (8/8 zone) bar counts
+        """
+        values = close.to_numpy(dtype=float)
+        return pd.DataFrame({
+            'long': ProbabilityEngine._zone_run_length(values, zero_level, zone_width, 1),
+            'short': ProbabilityEngine._zone_run_length(values, eight_level, zone_width, -1),
+        }, index=close.index)
+    
     def _calculate_time_score(self, time_at_level: int) -> float:
         """Calculate score based on time at level"""
         if time_at_level >= 16:
@@ -261,59 +820,115 @@ class ProbabilityEngine:
             return time_at_level * 8.0
     
     def _check_15m_confirmation(self, m15_df: pd.DataFrame, setup_type: int) -> bool:
-        """Check if 15M timeframe confirms entry"""
+        """Check if 15M timeframe confirms entry (last bar of the confirmation series)"""
         try:
             if len(m15_df) < 20:
                 return False
             
-            close = m15_df['close']
-            open_price = m15_df['open']
-            
-            # Calculate 15M indicators
-            rsi = self.momentum_analyzer.calculate_rsi(close, 14)
-            ema_8 = self.momentum_analyzer.calculate_ema(close, 8)
-            
-            current_rsi = rsi.iloc[-1]
-            current_close = close.iloc[-1]
-            current_open = open_price.iloc[-1]
-            current_ema = ema_8.iloc[-1]
-            
-            if setup_type == 1:  # Long
-                # RSI > 45, bullish candle, above EMA
-                return (current_rsi > 45 and 
-                       current_close > current_open and 
-                       current_close > current_ema)
-            else:  # Short
-                # RSI < 55, bearish candle, below EMA
-                return (current_rsi < 55 and 
-                       current_close < current_open and 
-                       current_close < current_ema)
+            confirmation = self.m15_confirmation_series(m15_df)
+            column = 'long' if setup_type == 1 else 'short'
+            return bool(confirmation[column].iloc[-1])
                 
         except Exception as e:
             logger.error(f"Error checking 15M confirmation: {e}")
             return False
     
-    def _empty_probability(self) -> Dict:
+    def m15_confirmation_series(self, m15_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        15M entry confirmation for every bar
+        
+        Computed once per M15 update (shared through the feature cache), so
+        the live check is a lookup of the last row.
+        
+        Long: RSI > 45, bullish candle, close above EMA 8
+        Short: RSI < 55, bearish candle, close below EMA 8
+        
+        Args:
+            m15_df: 15M OHLCV data
+            
+        Returns:
+            DataFrame with boolean 'long' and 'short' columns (False for the
+            first 19 bars, matching the 20-bar minimum)
+        """
+        backend = get_backend().name
+        return feature_cache.get_or_compute(
+            m15_df, 'm15_confirmation', (backend,), lambda: self._calculate_m15_confirmation(m15_df, backend)
+        )
+    
+    def _calculate_m15_confirmation(self, m15_df: pd.DataFrame, backend: str) -> pd.DataFrame:
+        """Compute the confirmation series without the cache"""
+        close = m15_df['close']
+        
+        # Calculate 15M indicators
+        rsi = feature_cache.get_or_compute(
+            m15_df, 'rsi', ('close', 14, backend), lambda: self.momentum_analyzer.calculate_rsi(close, 14)
+        ).to_numpy()
+        ema_8 = feature_cache.get_or_compute(
+            m15_df, 'ema', ('close', 8), lambda: self.momentum_analyzer.calculate_ema(close, 8)
+        ).to_numpy()
+        close_values = close.to_numpy()
+        open_values = m15_df['open'].to_numpy()
+        
+        with np.errstate(invalid='ignore'):
+            # RSI > 45, bullish candle, above EMA
+            long_ok = (rsi > 45) & (close_values > open_values) & (close_values > ema_8)
+            # RSI < 55, bearish candle, below EMA
+            short_ok = (rsi < 55) & (close_values < open_values) & (close_values < ema_8)
+        
+        warmup = min(19, len(m15_df))
+        long_ok[:warmup] = False
+        short_ok[:warmup] = False
+        
+        return pd.DataFrame({'long': long_ok, 'short': short_ok}, index=m15_df.index)
+    
+    def m15_confirmation_history(self, h1_times, m15_df: pd.DataFrame, setup_type: np.ndarray) -> np.ndarray:
+        """
+        15M confirmation in each H1 bar's setup direction, from completed M15 bars
+        
+        Unlike the m15_confirmed field this ignores M15_CHECK_PROBABILITY.
+        
+        Args:
+            h1_times: Open times of the H1 bars
+            m15_df: 15M DataFrame with a 'time' column
+            setup_type: Setup type per H1 bar (1, -1 or 0)
+            
+        Returns:
+            Boolean array per H1 bar (False where there is no setup)
+        """
+        confirmation = self.m15_confirmation_series(m15_df)
+        index = completed_bar_index(h1_times, 'H1', m15_df['time'], 'M15')
+        long_ok = align_values(confirmation['long'].to_numpy(), index, False).astype(bool)
+        short_ok = align_values(confirmation['short'].to_numpy(), index, False).astype(bool)
+        return np.where(setup_type == 1, long_ok, short_ok) & (setup_type != 0)
+    
+    def first_m15_confirmation(self, m15_df: pd.DataFrame, setup_type: int, since) -> Optional[pd.Timestamp]:
+        """
+        First 15M bar at or after `since` that confirmed the setup
+        
+        Args:
+            m15_df: 15M OHLCV data with a 'time' column
+            setup_type: 1 for long, -1 for short
+            since: Time the setup reached the trigger probability (e.g. 80%)
+            
+        Returns:
+            Bar time of the first confirmation, or None
+        """
+        try:
+            confirmation = self.m15_confirmation_series(m15_df)
+            column = 'long' if setup_type == 1 else 'short'
+            
+            # Compare as UTC-naive so tz-aware bars or `since` work too
+            times = utc_times(m15_df['time'])
+            start = int(np.searchsorted(times, utc_times([since])[0], side='left'))
+            hits = np.flatnonzero(confirmation[column].to_numpy()[start:])
+            if len(hits) == 0:
+                return None
+            return pd.Timestamp(m15_df['time'].iloc[start + hits[0]])
+            
+        except Exception as e:
+            logger.error(f"Error finding first 15M confirmation: {e}")
+            return None
+    
+    def _empty_probability(self) -> ProbabilityResult:
         """Return empty probability result"""
-        return {
-            'probability': 0.0,
-            'adjusted_probability': 0.0,
-            'setup_type': 0,
-            'setup_direction': 'NONE',
-            'reference_level': 0,
-            'current_price': 0,
-            'murrey_levels': {},
-            'zone_width': 0,
-            'time_at_level': 0,
-            'time_score': 0,
-            'volume_score': 0,
-            'obv_score': 0,
-            'obv_analysis': {},
-            'spring_score': 0,
-            'spring_analysis': {},
-            'combined_momentum': 0,
-            'htf_aligned': False,
-            'htf_factor': 0,
-            'm15_confirmed': False,
-            'quality_bonus': 0,
-        }
+        return ProbabilityResult()
@@ -0,0 +1,197 @@
+"""
+Result Types
+Slotted dataclasses for the per-symbol results of the scan pipeline
+
+The results still support result['key'] and result.get('key') so code
+written against the former dictionaries keeps working.
+"""
+
+import json
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+def _plain(value: Any) -> Any:
+    """Convert a field value to plain Python (dicts, lists, scalars)"""
+    if isinstance(value, Result):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    """json.dumps fallback for datetimes and numpy values"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _slotted(cls):
+    """
+    Rebuild a dataclass with __slots__ for its fields
+
+    Same as @dataclass(slots=True), which needs Python 3.10; the class is
+    recreated because slots cannot be added to an existing class and a
+    hand-written __slots__ clashes with the field defaults.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+class Result:
+    """Mapping-style access and serialization shared by the result types"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__dataclass_fields__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Field value, or default for an unknown key"""
+        return getattr(self, key) if key in self.__dataclass_fields__ else default
+
+    def keys(self):
+        """Field names in declaration order"""
+        return self.__dataclass_fields__.keys()
+
+    def items(self):
+        """(field name, value) pairs in declaration order"""
+        return ((name, getattr(self, name)) for name in self.__dataclass_fields__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Nested plain dictionaries (numpy scalars become Python scalars)"""
+        return {name: _plain(getattr(self, name)) for name in self.__dataclass_fields__}
+
+    def to_json(self, **kwargs) -> str:
+        """JSON text of to_dict() (datetimes as ISO strings)"""
+        return json.dumps(self.to_dict(), default=_json_default, **kwargs)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Build from a dictionary, ignoring unknown keys"""
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
+
+
+@_slotted
+@dataclass
+class ProbabilityResult(Result):
+    """ProbabilityEngine.calculate_probability() result (defaults = no setup)"""
+
+    probability: float = 0.0
+    adjusted_probability: float = 0.0
+    setup_type: int = 0  # 1=long, -1=short
+    setup_direction: str = 'NONE'
+    reference_level: float = 0.0
+    current_price: float = 0.0
+    murrey_levels: Dict[str, float] = field(default_factory=dict)
+    zone_width: float = 0.0
+    time_at_level: int = 0
+    time_score: float = 0.0
+    volume_score: float = 0.0
+    obv_score: float = 0.0
+    obv_analysis: Dict[str, Any] = field(default_factory=dict)
+    spring_score: float = 0.0
+    spring_analysis: Dict[str, Any] = field(default_factory=dict)
+    combined_momentum: float = 0.0
+    htf_aligned: bool = False
+    htf_factor: float = 0.0
+    m15_confirmed: bool = False
+    quality_bonus: float = 0.0
+
+
+@_slotted
+@dataclass
+class RiskResult(Result):
+    """RiskCalculator.calculate_risk_parameters() result (defaults = no setup)"""
+
+    pair_type: str = 'UNKNOWN'
+    daily_atr: float = 0.0
+    entry_price: float = 0.0
+    setup_type: int = 0
+    setup_direction: str = 'NONE'
+
+    # Stop loss
+    stop_multiplier: float = 0.0
+    stop_distance: float = 0.0
+    initial_stop: float = 0.0
+
+    # Position sizing
+    account_size: float = 0.0
+    risk_percent: float = 0.0
+    risk_amount: float = 0.0
+    position_size: float = 0.0
+    lots: Optional[float] = None
+    lot_risk_amount: Optional[float] = None
+    volume_step: Optional[float] = None
+
+    # Targets
+    target_multiplier: float = 0.0
+    targets: Dict[str, float] = field(default_factory=dict)
+    r_ratios: Dict[str, float] = field(default_factory=dict)
+    hit_probability_source: Optional[str] = None
+
+    # Trailing
+    trail_multiplier: float = 0.0
+    trail_distance: float = 0.0
+    trail_start_at_r: float = 0.0
+    trail_start_price: float = 0.0
+    move_to_be_at_r: float = 0.0
+
+    # Expectations
+    expected_duration_days: int = 0
+
+    # PortfolioRisk.annotate() exposure (None until annotated)
+    portfolio: Optional[Dict[str, Any]] = None
+
+
+@_slotted
+@dataclass
+class TimingResult(Result):
+    """EntryTimer.estimate_time_to_entry() result"""
+
+    eta_bars: int = 0
+    eta_hours: int = 0
+    eta_message: str = "Unknown"
+    estimated_entry_time: Optional[datetime] = None
+    time_already_spent: int = 0
+    eta_source: Optional[str] = None  # 'calibrated' or 'default'
+    eta_range_bars: Optional[Tuple[int, int]] = None
+    eta_hit_rate: Optional[float] = None
+    eta_samples: Optional[int] = None
+
+
+@_slotted
+@dataclass
+class StatusResult(Result):
+    """EntryTimer.get_status() result"""
+
+    status: str = "NONE"
+    emoji: str = "⚪"
+    color: str = "gray"
+    message: str = "No setup"
+    probability: float = 0.0
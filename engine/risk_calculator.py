@@ -8,6 +8,10 @@ import numpy as np
 import logging
 from typing import Dict
 from indicators.technical_indicators import TechnicalIndicators
+from indicators.lookback import lookback_registry
+from engine.target_calibration import TargetHitTables
+from data.contract_specs import ContractSpecs
+from engine.results import RiskResult
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +19,13 @@ logger = logging.getLogger(__name__)
 class RiskCalculator:
     """Calculate trade risk parameters"""
     
+    # Target hit probabilities (%) until calibrated tables are available
+    DEFAULT_HIT_PROBABILITIES = {
+        'TRENDING': {'r3': 85, 'r5': 65, 'elite': 40},
+        'RANGING': {'r3': 80, 'r5': 50, 'elite': 25},
+        'MIXED': {'r3': 82, 'r5': 58, 'elite': 32},
+    }
+    
     def __init__(self, config: Dict):
         """
         Initialize risk calculator
@@ -27,10 +38,26 @@ class RiskCalculator:
         self.risk_percent = config.get('RISK_PER_TRADE', 1.0)
         self.move_to_be_at = config.get('MOVE_TO_BE_AT_R', 2.0)
         self.start_trail_at = config.get('START_TRAIL_AT_R', 3.0)
+        
+        # Historical hit rates (python research.py calibrate-targets)
+        self.target_tables = TargetHitTables(
+            config.get('TARGET_HIT_TABLES_PATH'),
+            min_samples=config.get('TARGET_HIT_MIN_SAMPLES', 20),
+            refresh_days=config.get('TARGET_HIT_REFRESH_DAYS', 7)
+        )
+        
+        # Contract size / tick value per symbol, refreshed daily by the DataFetcher
+        self.contract_specs = ContractSpecs(
+            config.get('CONTRACT_SPECS_PATH'),
+            refresh_days=config.get('CONTRACT_SPECS_REFRESH_DAYS', 1)
+        )
+        
+        # Daily ATR(14) for stops and targets
+        lookback_registry.declare('risk_calculator', {'D1': TechnicalIndicators.atr_required_bars(14)})
     
     def calculate_risk_parameters(self, symbol: str, probability_result: Dict, 
                                   pair_classification: str, daily_df: pd.DataFrame,
-                                  combined_momentum: float) -> Dict:
+                                  combined_momentum: float) -> RiskResult:
         """
         Calculate complete risk parameters for a setup
         
@@ -42,17 +69,14 @@ class RiskCalculator:
             combined_momentum: Combined momentum score (0-100)
             
         Returns:
-            Dictionary with all risk parameters
+            RiskResult with all risk parameters
         """
         try:
             if probability_result['setup_type'] == 0:
                 return self._empty_risk()
             
             # Get ATR multipliers based on pair type
-            atr_multipliers = self.config.get('ATR_MULTIPLIERS', {}).get(
-                pair_classification,
-                {'stop': 2.25, 'trail': 1.75, 'target': 7.0}
-            )
+            atr_multipliers = self.get_atr_multipliers(pair_classification)
             
             stop_multiplier = atr_multipliers['stop']
             trail_multiplier = atr_multipliers['trail']
@@ -82,20 +106,19 @@ class RiskCalculator:
             risk_amount = self.account_size * (self.risk_percent / 100.0)
             position_size = risk_amount / abs(stop_distance)
             
+            # Broker lots (rounded down to volume_step) when the contract spec is known
+            lot_sizing = self.contract_specs.lot_size(symbol, risk_amount, abs(stop_distance))
+            if lot_sizing is None:
+                logger.debug(f"No contract spec for {symbol}, lot size not available")
+            
             # Adjust target multiplier based on momentum
-            if combined_momentum >= 85:
-                momentum_target_mult = base_target_multiplier * 1.2
-            elif combined_momentum >= 75:
-                momentum_target_mult = base_target_multiplier
-            elif combined_momentum >= 65:
-                momentum_target_mult = base_target_multiplier * 0.8
-            else:
-                momentum_target_mult = base_target_multiplier * 0.6
+            momentum_target_mult = self.momentum_target_multiplier(base_target_multiplier, combined_momentum)
             
             # Calculate targets
+            hit_probabilities = self.get_hit_probabilities(symbol, pair_classification)
             targets = self._calculate_targets(
                 entry_price, stop_distance, momentum_target_mult, 
-                daily_atr, setup_type, pair_classification
+                daily_atr, setup_type, hit_probabilities
             )
             
             # Calculate trailing parameters
@@ -117,47 +140,103 @@ class RiskCalculator:
                 pair_classification, combined_momentum
             )
             
-            return {
-                'pair_type': pair_classification,
-                'daily_atr': daily_atr,
-                'entry_price': entry_price,
-                'setup_type': setup_type,
-                'setup_direction': 'LONG' if setup_type == 1 else 'SHORT',
+            return RiskResult(
+                pair_type=pair_classification,
+                daily_atr=float(daily_atr),
+                entry_price=float(entry_price),
+                setup_type=int(setup_type),
+                setup_direction='LONG' if setup_type == 1 else 'SHORT',
                 
                 # Stop loss
-                'stop_multiplier': stop_multiplier,
-                'stop_distance': stop_distance,
-                'initial_stop': initial_stop,
+                stop_multiplier=stop_multiplier,
+                stop_distance=float(stop_distance),
+                initial_stop=float(initial_stop),
                 
                 # Position sizing
-                'account_size': self.account_size,
-                'risk_percent': self.risk_percent,
-                'risk_amount': risk_amount,
-                'position_size': position_size,
+                account_size=self.account_size,
+                risk_percent=self.risk_percent,
+                risk_amount=risk_amount,
+                position_size=float(position_size),
+                lots=lot_sizing['lots'] if lot_sizing else None,
+                lot_risk_amount=lot_sizing['lot_risk_amount'] if lot_sizing else None,
+                volume_step=lot_sizing['volume_step'] if lot_sizing else None,
                 
                 # Targets
-                'target_multiplier': momentum_target_mult,
-                'targets': targets,
-                'r_ratios': r_ratios,
+                target_multiplier=momentum_target_mult,
+                targets=targets,
+                r_ratios=r_ratios,
+                hit_probability_source=hit_probabilities['source'],
                 
                 # Trailing
-                'trail_multiplier': trail_multiplier,
-                'trail_distance': trail_distance,
-                'trail_start_at_r': self.start_trail_at,
-                'trail_start_price': trail_start_price,
-                'move_to_be_at_r': self.move_to_be_at,
+                trail_multiplier=trail_multiplier,
+                trail_distance=float(trail_distance),
+                trail_start_at_r=self.start_trail_at,
+                trail_start_price=float(trail_start_price),
+                move_to_be_at_r=self.move_to_be_at,
                 
                 # Expectations
-                'expected_duration_days': expected_duration,
-            }
+                expected_duration_days=expected_duration,
+            )
             
         except Exception as e:
             logger.error(f"Error calculating risk parameters for {symbol}: {e}")
             return self._empty_risk()
     
+    def get_atr_multipliers(self, pair_classification: str) -> Dict[str, float]:
+        """
+        Get ATR multipliers for a pair type
+        
+        Returns:
+            Dictionary with stop, trail, target multipliers
+        """
+        return self.config.get('ATR_MULTIPLIERS', {}).get(
+            pair_classification,
+            {'stop': 2.25, 'trail': 1.75, 'target': 7.0}
+        )
+    
+    @staticmethod
+    def momentum_target_multiplier(base_target_multiplier: float, combined_momentum: float) -> float:
+        """
+        Scale the elite target multiplier with momentum
+        
+        Args:
+            base_target_multiplier: ATR target multiplier of the pair type
+            combined_momentum: Combined momentum score (0-100)
+            
+        Returns:
+            Target multiplier for the elite target
+        """
+        if combined_momentum >= 85:
+            return base_target_multiplier * 1.2
+        elif combined_momentum >= 75:
+            return base_target_multiplier
+        elif combined_momentum >= 65:
+            return base_target_multiplier * 0.8
+        else:
+            return base_target_multiplier * 0.6
+    
+    def get_hit_probabilities(self, symbol: str, pair_classification: str) -> Dict:
+        """
+        Probability (%) of reaching each target before the initial stop
+        
+        Args:
+            symbol: Trading symbol
+            pair_classification: TRENDING, RANGING, or MIXED
+            
+        Returns:
+            Dictionary with r3, r5, elite and source ("symbol", "pair_type"
+            from the calibrated tables, or "default")
+        """
+        calibrated = self.target_tables.lookup(symbol, pair_classification)
+        if calibrated is not None:
+            return calibrated
+        
+        defaults = self.DEFAULT_HIT_PROBABILITIES.get(pair_classification, self.DEFAULT_HIT_PROBABILITIES['MIXED'])
+        return dict(defaults, source='default')
+    
     def _calculate_targets(self, entry_price: float, stop_distance: float, 
                           target_multiplier: float, daily_atr: float, 
-                          setup_type: int, pair_type: str) -> Dict:
+                          setup_type: int, hit_probabilities: Dict) -> Dict:
         """Calculate multiple target levels"""
         
         if setup_type == 1:  # Long
@@ -173,27 +252,13 @@ class RiskCalculator:
             r5_target = entry_price - (stop_distance * 5)
             elite_target = entry_price - (daily_atr * target_multiplier)
         
-        # Expected hit probabilities (based on historical data)
-        if pair_type == "TRENDING":
-            r3_prob = 85  # 85% probability of hitting +3R
-            r5_prob = 65
-            elite_prob = 40
-        elif pair_type == "RANGING":
-            r3_prob = 80
-            r5_prob = 50
-            elite_prob = 25
-        else:  # MIXED
-            r3_prob = 82
-            r5_prob = 58
-            elite_prob = 32
-        
         return {
             'r3_target': r3_target,
-            'r3_probability': r3_prob,
+            'r3_probability': hit_probabilities['r3'],
             'r5_target': r5_target,
-            'r5_probability': r5_prob,
+            'r5_probability': hit_probabilities['r5'],
             'elite_target': elite_target,
-            'elite_probability': elite_prob,
+            'elite_probability': hit_probabilities['elite'],
         }
     
     def _estimate_hold_duration(self, pair_type: str, momentum: float) -> int:
@@ -223,28 +288,11 @@ class RiskCalculator:
         
         return duration
     
-    def _empty_risk(self) -> Dict:
+    def _empty_risk(self) -> RiskResult:
         """Return empty risk parameters"""
-        return {
-            'pair_type': 'UNKNOWN',
-            'daily_atr': 0,
-            'entry_price': 0,
-            'setup_type': 0,
-            'setup_direction': 'NONE',
-            'stop_multiplier': 0,
-            'stop_distance': 0,
-            'initial_stop': 0,
-            'account_size': self.account_size,
-            'risk_percent': self.risk_percent,
-            'risk_amount': 0,
-            'position_size': 0,
-            'target_multiplier': 0,
-            'targets': {},
-            'r_ratios': {},
-            'trail_multiplier': 0,
-            'trail_distance': 0,
-            'trail_start_at_r': self.start_trail_at,
-            'trail_start_price': 0,
-            'move_to_be_at_r': self.move_to_be_at,
-            'expected_duration_days': 0,
-        }
+        return RiskResult(
+            account_size=self.account_size,
+            risk_percent=self.risk_percent,
+            trail_start_at_r=self.start_trail_at,
+            move_to_be_at_r=self.move_to_be_at,
+        )
@@ -0,0 +1,200 @@
+"""
+Stage Timer
+Wall time per stage of the probability calculation, aggregated into
+per-cycle histograms for the log and a metrics JSON file
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Stages of ProbabilityEngine.calculate_probability(), in execution order
+STAGES = ('murrey', 'atr', 'setup_type', 'time_at_level', 'volume', 'obv', 'spring', 'm15_confirmation')
+
+# Histogram bucket upper edges in milliseconds (last bucket is open-ended)
+BUCKET_EDGES_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+
+class _NullClock:
+    """Clock handed out while timing is disabled (every call is a no-op)"""
+
+    __slots__ = ()
+
+    def lap(self, stage: str):
+        pass
+
+
+NULL_CLOCK = _NullClock()
+
+
+class _Clock:
+    """Times consecutive stages of one symbol"""
+
+    __slots__ = ('timer', 'symbol', 'last')
+
+    def __init__(self, timer: 'StageTimer', symbol: str):
+        self.timer = timer
+        self.symbol = symbol
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str):
+        """Record the time since the previous lap (or start) under stage"""
+        now = time.perf_counter()
+        self.timer.record(self.symbol, stage, now - self.last)
+        self.last = now
+
+
+class StageTimer:
+    """Collect stage timings for the current cycle"""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize stage timer
+
+        Args:
+            enabled: Record timings (when False, clock() returns a no-op clock)
+        """
+        self.enabled = enabled
+        self.metrics_path: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._symbols: Dict[str, float] = {}
+        self._cycle_start = datetime.now()
+        self.last_cycle: Optional[Dict] = None
+
+    def configure(self, enabled: bool, metrics_path: Optional[str] = None):
+        """Apply settings (samples of the current cycle are kept)"""
+        self.enabled = enabled
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+
+    def clock(self, symbol: str):
+        """
+        Start timing a symbol
+
+        Returns:
+            Clock whose lap(stage) records the time since the previous lap
+        """
+        if not self.enabled:
+            return NULL_CLOCK
+        return _Clock(self, symbol)
+
+    def record(self, symbol: str, stage: str, seconds: float):
+        """Add one stage duration"""
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+            self._symbols[symbol] = self._symbols.get(symbol, 0.0) + seconds
+
+    def end_cycle(self, log: bool = True, top_symbols: int = 5) -> Optional[Dict]:
+        """
+        Summarize the cycle, reset the samples and write the metrics file
+
+        Args:
+            log: Log one line per stage
+            top_symbols: Slowest symbols kept in the summary
+
+        Returns:
+            Cycle summary (see summarize()), or None if nothing was recorded
+        """
+        with self._lock:
+            samples, symbols = self._samples, self._symbols
+            started = self._cycle_start
+            self._samples, self._symbols = {}, {}
+            self._cycle_start = datetime.now()
+
+        if not samples:
+            return None
+
+        summary = self.summarize(samples, symbols, top_symbols)
+        summary['started'] = started.isoformat(timespec='seconds')
+        summary['ended'] = datetime.now().isoformat(timespec='seconds')
+        self.last_cycle = summary
+
+        if log:
+            self._log(summary)
+        if self.metrics_path is not None:
+            self._write(summary)
+        return summary
+
+    @staticmethod
+    def summarize(samples: Dict[str, List[float]], symbols: Dict[str, float], top_symbols: int = 5) -> Dict:
+        """
+        Histogram and percentiles per stage
+
+        Returns:
+            Dictionary with 'bucket_edges_ms', 'stages' {stage: {count,
+            total_ms, mean_ms, p50_ms, p95_ms, max_ms, share_pct,
+            histogram}}, 'total_ms' and 'slowest_symbols'
+        """
+        edges = np.array(BUCKET_EDGES_MS)
+        order = [s for s in STAGES if s in samples] + sorted(s for s in samples if s not in STAGES)
+        total = sum(float(np.sum(v)) for v in samples.values()) * 1000
+
+        stages = {}
+        for stage in order:
+            ms = np.asarray(samples[stage]) * 1000
+            counts = np.bincount(np.searchsorted(edges, ms, side='left'), minlength=len(edges) + 1)
+            stages[stage] = {
+                'count': int(len(ms)),
+                'total_ms': round(float(ms.sum()), 3),
+                'mean_ms': round(float(ms.mean()), 4),
+                'p50_ms': round(float(np.percentile(ms, 50)), 4),
+                'p95_ms': round(float(np.percentile(ms, 95)), 4),
+                'max_ms': round(float(ms.max()), 4),
+                'share_pct': round(float(ms.sum()) / total * 100, 1) if total > 0 else 0.0,
+                'histogram': counts.tolist(),
+            }
+
+        slowest = sorted(symbols.items(), key=lambda item: item[1], reverse=True)[:top_symbols]
+        return {
+            'bucket_edges_ms': list(BUCKET_EDGES_MS),
+            'stages': stages,
+            'total_ms': round(total, 3),
+            'symbols': len(symbols),
+            'slowest_symbols': [{'symbol': s, 'total_ms': round(t * 1000, 3)} for s, t in slowest],
+        }
+
+    @staticmethod
+    def _log(summary: Dict):
+        """One log line per stage, slowest share first"""
+        logger.info(f"⏱️ Probability stages: {summary['total_ms']:.1f} ms over {summary['symbols']} symbols")
+        for stage, s in sorted(summary['stages'].items(), key=lambda item: item[1]['total_ms'], reverse=True):
+            logger.info(f"   {stage:<16} {s['share_pct']:5.1f}%  total {s['total_ms']:8.2f} ms  "
+                        f"p50 {s['p50_ms']:.3f} ms  p95 {s['p95_ms']:.3f} ms  n={s['count']}")
+
+    def _write(self, summary: Dict):
+        """Write the latest cycle to the metrics file"""
+        try:
+            self.metrics_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.metrics_path, 'w') as f:
+                json.dump(summary, f, indent=1)
+        except Exception as e:
+            logger.error(f"Error writing stage metrics {self.metrics_path}: {e}")
+
+
+# Shared instance used by the probability engine
+stage_timer = StageTimer(enabled=False)
+
+
+def configure_stage_timer(config: Dict) -> StageTimer:
+    """
+    Apply timing settings from the configuration dictionary
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        The shared StageTimer
+    """
+    stage_timer.configure(
+        enabled=config.get('STAGE_TIMING_ENABLED', True),
+        metrics_path=config.get('STAGE_METRICS_PATH'),
+    )
+    return stage_timer
@@ -0,0 +1,222 @@
+"""
+Target Calibration
+Historical hit rates of the +3R, +5R and elite targets, per symbol and pair
+type, cached as a JSON table for RiskCalculator
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TARGETS = ('r3', 'r5', 'elite')
+
+
+class TargetCalibration:
+    """Measure how often each target is reached before the initial stop"""
+
+    def __init__(self, config: Dict, horizon_days: Optional[int] = None):
+        """
+        Initialize target calibration
+
+        Args:
+            config: Configuration dictionary
+            horizon_days: Days a trade is followed (default TARGET_HIT_HORIZON_DAYS)
+        """
+        # Imported here: RiskCalculator (imported by the backtester) uses TargetHitTables
+        from engine.backtester import Backtester
+
+        self.config = config
+        self.backtester = Backtester(config)
+        self.horizon_days = horizon_days or config.get('TARGET_HIT_HORIZON_DAYS', 30)
+        self.horizon_bars = int(self.horizon_days * 24)  # H1 bars
+        self.results = {}  # {symbol: (pair type, hits [entries, 3])}
+
+    def add_symbol(self, symbol: str, data_dict: Dict[str, pd.DataFrame], pair_classification: str,
+                   history: Optional[pd.DataFrame] = None) -> int:
+        """
+        Follow every BIG BANG entry of a symbol over the horizon
+
+        A target counts as hit when a bar's high (low for shorts) reaches it
+        before any bar reaches the initial stop; a bar touching both counts
+        as a stop. Breakeven and trailing are ignored. Entries whose window
+        runs past the data without reaching either are left out.
+
+        Args:
+            symbol: Trading symbol
+            data_dict: Dictionary of {timeframe: DataFrame} (H1, D1, M15)
+            pair_classification: TRENDING, RANGING, or MIXED
+            history: Precomputed probability_history() (optional)
+
+        Returns:
+            Number of entries measured
+        """
+        market = self.backtester.prepare(data_dict)
+        if market is None:
+            logger.warning(f"{symbol}: H1 and D1 bars are required, skipped")
+            return 0
+
+        if history is None:
+            history = self.backtester.probability_engine.probability_history(data_dict)
+        entries = self.backtester.entry_signals(history)
+        daily_atr = market['daily_atr'][entries]
+        usable = np.isfinite(daily_atr) & (daily_atr > 0)
+        entries, daily_atr = entries[usable], daily_atr[usable]
+        if len(entries) == 0:
+            self.results[symbol] = (pair_classification, np.zeros((0, len(TARGETS)), bool))
+            return 0
+
+        # Target and stop distances per entry, as RiskCalculator sets them
+        risk = self.backtester.risk_calculator
+        multipliers = risk.get_atr_multipliers(pair_classification)
+        momentum = history['combined_momentum'].to_numpy()[entries]
+        stop = daily_atr * multipliers['stop']
+        elite = daily_atr * np.array([risk.momentum_target_multiplier(multipliers['target'], m) for m in momentum])
+        targets = np.stack([stop * 3, stop * 5, elite], axis=1)
+
+        # Forward windows [t + 1, t + horizon] as one [e, horizon] block
+        n = len(market['close'])
+        offsets = np.arange(1, self.horizon_bars + 1)
+        index = entries[:, None] + offsets[None, :]
+        inside = index < n
+        index = np.minimum(index, n - 1)
+
+        sign = history['setup_type'].to_numpy()[entries].astype(float)[:, None]
+        entry_price = market['close'][entries][:, None]
+        favourable = np.where(sign > 0, market['high'][index] - entry_price, entry_price - market['low'][index])
+        adverse = np.where(sign > 0, entry_price - market['low'][index], market['high'][index] - entry_price)
+        favourable = np.where(inside, favourable, -np.inf)
+        adverse = np.where(inside, adverse, -np.inf)
+
+        # First bar reaching the stop / each target (horizon = never)
+        stopped = adverse >= stop[:, None]
+        first_stop = np.where(stopped.any(axis=1), stopped.argmax(axis=1), self.horizon_bars)
+        reached = favourable[:, None, :] >= targets[:, :, None]
+        first_target = np.where(reached.any(axis=2), reached.argmax(axis=2), self.horizon_bars)
+        hits = first_target < first_stop[:, None]
+
+        # Outcome known: the stop was hit, or the whole window is in the data
+        resolved = (first_stop < self.horizon_bars) | inside[:, -1]
+        self.results[symbol] = (pair_classification, hits[resolved])
+        return int(resolved.sum())
+
+    def build(self) -> Dict:
+        """
+        Summarize the measured entries
+
+        Returns:
+            Tables dictionary: {'created', 'horizon_days', 'symbols': {symbol:
+            row}, 'classes': {pair type: row}} where a row is {'samples',
+            'r3', 'r5', 'elite'} with hit rates in %
+        """
+        def row(hits: np.ndarray) -> Dict:
+            samples = len(hits)
+            result = {'samples': samples}
+            for j, name in enumerate(TARGETS):
+                result[name] = round(float(hits[:, j].mean() * 100), 1) if samples else None
+            return result
+
+        symbols, classes = {}, {}
+        for symbol, (pair_type, hits) in self.results.items():
+            symbols[symbol] = dict(row(hits), pair_type=pair_type)
+            classes.setdefault(pair_type, []).append(hits)
+
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'horizon_days': self.horizon_days,
+            'symbols': symbols,
+            'classes': {name: row(np.concatenate(parts)) for name, parts in classes.items()},
+        }
+
+    def save(self, path: str) -> Path:
+        """
+        Build and write the tables as JSON
+
+        Returns:
+            Path written
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.build(), f, indent=1)
+        logger.info(f"Target hit tables written to {path}")
+        return path
+
+
+class TargetHitTables:
+    """Cached target hit rates (reloaded when the file is refreshed)"""
+
+    # Seconds between checks of the file for a newer version
+    RELOAD_CHECK_SECONDS = 3600
+
+    def __init__(self, path: Optional[str], min_samples: int = 20, refresh_days: int = 7):
+        """
+        Initialize target hit tables
+
+        Args:
+            path: JSON file written by TargetCalibration.save()
+            min_samples: Entries a symbol/pair type needs before its rates are used
+            refresh_days: Age after which the tables are due for a rebuild
+        """
+        self.path = Path(path) if path else None
+        self.min_samples = min_samples
+        self.refresh_days = refresh_days
+        self.created = None
+        self.symbols = {}
+        self.classes = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self._reload()
+
+    def _reload(self):
+        """Read the file if it changed since the last read"""
+        self._last_check = time.monotonic()
+        if self.path is None or not self.path.exists():
+            return
+
+        mtime = self.path.stat().st_mtime
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path) as f:
+                tables = json.load(f)
+            self.created = datetime.fromisoformat(tables['created'])
+            self.symbols = tables.get('symbols', {})
+            self.classes = tables.get('classes', {})
+            self._mtime = mtime
+            logger.info(f"Loaded target hit tables from {self.path} ({tables['created']})")
+            if self.is_due():
+                logger.warning(f"Target hit tables are older than {self.refresh_days} days "
+                               f"(python research.py calibrate-targets)")
+        except Exception as e:
+            logger.error(f"Error loading target hit tables {self.path}: {e}")
+
+    def is_due(self, now: Optional[datetime] = None) -> bool:
+        """True if the tables are missing or older than refresh_days"""
+        if self.created is None:
+            return True
+        return (now or datetime.now()) - self.created >= timedelta(days=self.refresh_days)
+
+    def lookup(self, symbol: str, pair_type: str) -> Optional[Dict]:
+        """
+        Hit rates for a symbol, falling back to its pair type
+
+        Returns:
+            Dictionary {'r3', 'r5', 'elite', 'samples', 'source'} with rates
+            in %, or None without enough samples
+        """
+        if time.monotonic() - self._last_check >= self.RELOAD_CHECK_SECONDS:
+            self._reload()
+
+        for source, row in (('symbol', self.symbols.get(symbol)), ('pair_type', self.classes.get(pair_type))):
+            if row is not None and row.get('samples', 0) >= self.min_samples:
+                return {'r3': row['r3'], 'r5': row['r5'], 'elite': row['elite'],
+                        'samples': row['samples'], 'source': source}
+        return None
@@ -0,0 +1,235 @@
+"""
+Per-Bar Feature Cache
+Shares computed indicator series between all analyzers
+"""
+
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureCache:
+    """
+    LRU cache of indicator features keyed by
+    (symbol, timeframe, last-bar timestamp and OHLCV, dtype, feature, params)
+
+    DataFrames returned by DataFetcher carry their symbol, timeframe and
+    last bar in ``df.attrs``. Any analyzer that receives such a frame can
+    read a feature through the cache; frames without that metadata (e.g.
+    hand-built test data) are computed directly and never cached.
+    """
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024, enabled: bool = True):
+        """
+        Initialize feature cache
+
+        Args:
+            max_entries: Maximum number of cached features
+            max_bytes: Approximate memory budget for cached values
+            enabled: Set False to bypass the cache entirely
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_entries: int = None, max_bytes: int = None, enabled: bool = None):
+        """Update cache limits (existing entries are trimmed to fit)"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if enabled is not None:
+                self.enabled = enabled
+            self._evict()
+
+    @staticmethod
+    def stamp(df: pd.DataFrame, symbol: str, timeframe: str) -> pd.DataFrame:
+        """
+        Attach cache metadata to a freshly fetched DataFrame
+
+        Args:
+            df: OHLCV DataFrame with time and close columns
+            symbol: Trading symbol
+            timeframe: Timeframe ("M15", "H1", "H4", "D1", "W1")
+
+        Returns:
+            The same DataFrame (modified in place)
+        """
+        if df is None or len(df) == 0:
+            return df
+
+        last_time = df['time'].iloc[-1] if 'time' in df.columns else df.index[-1]
+        df.attrs['symbol'] = symbol
+        df.attrs['timeframe'] = timeframe
+        df.attrs['last_bar_time'] = last_time
+        # The forming bar keeps its timestamp while its prices and volume
+        # move; a new high/low or more volume can leave the close unchanged
+        df.attrs['last_close'] = float(df['close'].iloc[-1])
+        for column in ('high', 'low', 'volume'):
+            if column in df.columns:
+                df.attrs[f'last_{column}'] = float(df[column].iloc[-1])
+        return df
+
+    def key_for(self, data, feature: str, params: Tuple = ()) -> Optional[Tuple]:
+        """
+        Build cache key for a DataFrame/Series
+
+        Returns:
+            Key tuple, or None if the data carries no cache metadata
+        """
+        attrs = getattr(data, 'attrs', None)
+        if not attrs or 'symbol' not in attrs or len(data) == 0:
+            return None
+
+        # Length and last index guard against slices (tail/iloc) that
+        # inherit the parent's attrs; dtype keeps float32 and float64
+        # copies of the same bars apart
+        return (
+            attrs['symbol'],
+            attrs.get('timeframe'),
+            attrs.get('last_bar_time'),
+            attrs.get('last_close'),
+            attrs.get('last_high'),
+            attrs.get('last_low'),
+            attrs.get('last_volume'),
+            len(data),
+            data.index[-1],
+            self._data_dtype(data),
+            feature,
+            params,
+        )
+
+    @staticmethod
+    def _data_dtype(data) -> str:
+        """Precision of the bars behind a DataFrame/Series"""
+        if isinstance(data, pd.DataFrame):
+            return str(data['close'].dtype) if 'close' in data.columns else ''
+        return str(getattr(data, 'dtype', ''))
+
+    def get_or_compute(self, data, feature: str, params: Tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Return cached feature or compute and store it
+
+        Args:
+            data: DataFrame/Series the feature is derived from
+            feature: Feature name (e.g. "atr", "ema")
+            params: Hashable tuple of feature parameters
+            compute: Zero-argument callable producing the feature
+
+        Returns:
+            Feature value (treat as read-only)
+        """
+        if not self.enabled:
+            return compute()
+
+        key = self.key_for(data, feature, params)
+        if key is None:
+            return compute()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value under an explicit key"""
+        size = self._estimate_nbytes(value)
+
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                self._total_bytes -= self._sizes.pop(key)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until within limits (lock held)"""
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._total_bytes > self.max_bytes):
+            key, _ = self._entries.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def _estimate_nbytes(self, value: Any) -> int:
+        """Approximate memory footprint of a cached value"""
+        if isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+            return int(value.memory_usage(index=False, deep=False)
+                       if isinstance(value, pd.Series) else value.memory_usage(deep=False).sum())
+        if isinstance(value, np.ndarray):
+            return int(value.nbytes)
+        if isinstance(value, (tuple, list)):
+            return sum(self._estimate_nbytes(v) for v in value) + 64
+        if isinstance(value, dict):
+            return sum(self._estimate_nbytes(v) for v in value.values()) + 64
+        return 64
+
+    def clear(self):
+        """Remove all cached features"""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with entries, bytes, hits, misses, evictions
+        """
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits / total * 100) if total > 0 else 0.0,
+        }
+
+
+# Shared instance used by every analyzer
+feature_cache = FeatureCache()
+
+
+def configure_feature_cache(config: Dict) -> FeatureCache:
+    """
+    Apply cache settings from the configuration dictionary
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        The shared FeatureCache
+    """
+    feature_cache.configure(
+        max_entries=config.get('FEATURE_CACHE_MAX_ENTRIES', 2048),
+        max_bytes=int(config.get('FEATURE_CACHE_MAX_MB', 64) * 1024 * 1024),
+        enabled=config.get('FEATURE_CACHE_ENABLED', True),
+    )
+    return feature_cache
@@ -0,0 +1,159 @@
+"""
+Indicator Backends
+Pluggable implementations of RSI, MACD, ADX/DI, ATR, Bollinger and Stochastic
+
+Two backends exist:
+    NUMPY - indicators/kernels.py (always available, matches the original
+            pandas formulas: SMA-based RSI/ATR/ADX)
+    TALIB - TA-Lib C kernels (Wilder smoothing, TA-Lib warm-up rules)
+
+The backend is selected once at startup with INDICATOR_BACKEND
+("AUTO" picks TA-Lib when it can be imported). See
+mdfolder/INDICATOR_BACKENDS.md for the numeric differences.
+"""
+
+import logging
+import numpy as np
+from typing import Optional, Tuple
+from indicators import kernels
+
+logger = logging.getLogger(__name__)
+
+try:
+    import talib
+    TALIB_AVAILABLE = True
+except ImportError:
+    talib = None
+    TALIB_AVAILABLE = False
+
+
+class NumpyBackend:
+    """Internal NumPy kernels (accept [n] series or [n, k] panels)"""
+
+    name = "NUMPY"
+    smoothing = "sma"  # RSI/ATR/ADX averaging used by streaming states
+
+    def rsi(self, close: np.ndarray, period: int = 14) -> np.ndarray:
+        return kernels.rsi(close, period)
+
+    def macd(self, close: np.ndarray, fast: int = 12, slow: int = 26,
+             signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return kernels.macd(close, fast, slow, signal)
+
+    def adx(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14,
+            tr: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return kernels.adx(high, low, close, period, tr=tr)
+
+    def atr(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14,
+            tr: Optional[np.ndarray] = None) -> np.ndarray:
+        if tr is None:
+            tr = kernels.true_range(high, low, close)
+        return kernels.rolling_mean(tr, period)
+
+    def bollinger(self, close: np.ndarray, period: int = 20,
+                  std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return kernels.bollinger_bands(close, period, std)
+
+    def stochastic(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                   k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        return kernels.stochastic(high, low, close, k_period, d_period)
+
+
+class TalibBackend(NumpyBackend):
+    """
+    TA-Lib C kernels (inputs are converted to contiguous float64)
+
+    TA-Lib is 1D only, so [n, k] panel inputs are evaluated column by column.
+    Leading NaNs (shorter histories in a panel) are skipped by TA-Lib itself.
+    """
+
+    name = "TALIB"
+    smoothing = "wilder"
+
+    def __init__(self):
+        if not TALIB_AVAILABLE:
+            raise ImportError("TA-Lib is not installed")
+
+    @staticmethod
+    def _f64(x) -> np.ndarray:
+        return np.ascontiguousarray(x, dtype=np.float64)
+
+    @classmethod
+    def _columns(cls, func, *arrays):
+        """Apply a 1D TA-Lib call to 1D inputs or to each column of 2D inputs"""
+        arrays = [np.asarray(a) for a in arrays]
+        if arrays[0].ndim == 1:
+            return func(*(cls._f64(a) for a in arrays))
+
+        results = [func(*(cls._f64(a[:, j]) for a in arrays)) for j in range(arrays[0].shape[1])]
+        if results and isinstance(results[0], tuple):
+            return tuple(np.column_stack(parts) for parts in zip(*results))
+        return np.column_stack(results) if results else np.empty(arrays[0].shape)
+
+    def rsi(self, close, period=14):
+        return self._columns(lambda c: talib.RSI(c, timeperiod=period), close)
+
+    def macd(self, close, fast=12, slow=26, signal=9):
+        return self._columns(
+            lambda c: talib.MACD(c, fastperiod=fast, slowperiod=slow, signalperiod=signal), close
+        )
+
+    def adx(self, high, low, close, period=14, tr=None):
+        return self._columns(
+            lambda h, l, c: (
+                talib.PLUS_DI(h, l, c, timeperiod=period),
+                talib.MINUS_DI(h, l, c, timeperiod=period),
+                talib.ADX(h, l, c, timeperiod=period),
+            ),
+            high, low, close
+        )
+
+    def atr(self, high, low, close, period=14, tr=None):
+        return self._columns(lambda h, l, c: talib.ATR(h, l, c, timeperiod=period), high, low, close)
+
+    def bollinger(self, close, period=20, std=2.0):
+        return self._columns(
+            lambda c: talib.BBANDS(c, timeperiod=period, nbdevup=std, nbdevdn=std, matype=0), close
+        )
+
+    def stochastic(self, high, low, close, k_period=14, d_period=3):
+        # STOCHF = raw %K and SMA %D, the same definition as calculate_stochastic
+        return self._columns(
+            lambda h, l, c: talib.STOCHF(h, l, c, fastk_period=k_period,
+                                         fastd_period=d_period, fastd_matype=0),
+            high, low, close
+        )
+
+
+_active_backend = NumpyBackend()
+
+
+def select_backend(name: str = "AUTO"):
+    """
+    Select the process-wide indicator backend
+
+    Args:
+        name: "AUTO", "TALIB" or "NUMPY"
+
+    Returns:
+        The active backend
+    """
+    global _active_backend
+
+    name = (name or "AUTO").upper()
+    if name in ("AUTO", "TALIB") and TALIB_AVAILABLE:
+        backend = TalibBackend()
+    else:
+        if name == "TALIB":
+            logger.warning("TA-Lib requested but not installed - using NumPy kernels")
+        backend = NumpyBackend()
+
+    if backend.name != _active_backend.name:
+        logger.info(f"Indicator backend: {backend.name}")
+    _active_backend = backend
+    return backend
+
+
+def get_backend():
+    """Return the active indicator backend"""
+    return _active_backend
@@ -0,0 +1,677 @@
+"""
+Indicator Kernels
+Pure-NumPy indicator math on float32/float64 arrays
+
+All kernels work along axis 0 (time), so they accept a single series
+(shape [n]) or a panel of series (shape [n, symbols]) alike. Results keep
+the input precision (float32 stays float32); running sums are accumulated
+in float64. Every kernel takes an optional preallocated ``out`` array.
+
+Semantics match the pandas implementations in indicators/pandas_reference.py:
+warm-up rows are NaN, SMA-based RSI/ATR/ADX, ewm(adjust=False) EMAs.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+FLOAT_TYPES = (np.float32, np.float64)
+
+
+def as_float_array(x, dtype=None) -> np.ndarray:
+    """
+    Convert input to a float32/float64 ndarray without copying when possible
+
+    Args:
+        x: Array-like (ndarray, pandas Series/DataFrame, list)
+        dtype: Force a dtype (default: keep float32/float64, else float64)
+    """
+    arr = np.asarray(x)
+    if dtype is not None:
+        return arr.astype(dtype, copy=False)
+    if arr.dtype.type not in FLOAT_TYPES:
+        return arr.astype(np.float64)
+    return arr
+
+
+def _result_dtype(*arrays) -> np.dtype:
+    """float32 only if every input is float32"""
+    if all(a.dtype == np.float32 for a in arrays):
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+def _prepare_out(out: Optional[np.ndarray], shape, dtype) -> np.ndarray:
+    """Validate or allocate an output array"""
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    return out
+
+
+def rolling_mean(x, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Simple moving average (NaN until the window is full or while it holds a NaN)
+
+    Args:
+        x: Input array [n] or [n, k]
+        window: Window length
+        out: Optional preallocated output
+    """
+    x = as_float_array(x)
+    out = _prepare_out(out, x.shape, x.dtype)
+    n = x.shape[0]
+    if window <= 0:
+        raise ValueError("window must be positive")
+    if n < window:
+        out[:] = np.nan
+        return out
+
+    finite = np.isfinite(x)
+    all_finite = bool(finite.all())
+
+    csum = np.empty((n + 1,) + x.shape[1:], dtype=np.float64)
+    csum[0] = 0.0
+    np.cumsum(x if all_finite else np.where(finite, x, 0.0), axis=0, dtype=np.float64, out=csum[1:])
+
+    out[:window - 1] = np.nan
+    np.subtract(csum[window:], csum[:-window], out=out[window - 1:], casting='same_kind')
+    out[window - 1:] /= window
+
+    if not all_finite:
+        bad = np.empty((n + 1,) + x.shape[1:], dtype=np.int64)
+        bad[0] = 0
+        np.cumsum(~finite, axis=0, out=bad[1:])
+        out[window - 1:][(bad[window:] - bad[:-window]) > 0] = np.nan
+    return out
+
+
+def rolling_sum(x, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rolling sum (same NaN rules as rolling_mean)"""
+    out = rolling_mean(x, window, out=out)
+    out *= window
+    return out
+
+
+def _window_reduce(x: np.ndarray, window: int, ufunc, out: np.ndarray) -> np.ndarray:
+    """
+    Apply a binary ufunc across each trailing window
+
+    Loops over the window offsets (window vector passes of length n) instead
+    of materialising an [n, window] array, which keeps temporaries at O(n).
+    """
+    n = x.shape[0]
+    out[:min(window - 1, n)] = np.nan
+    if n >= window:
+        acc = out[window - 1:]
+        acc[...] = x[:n - window + 1]
+        for offset in range(1, window):
+            ufunc(acc, x[offset:n - window + 1 + offset], out=acc)
+    return out
+
+
+def rolling_std(x, window: int, ddof: int = 1, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rolling standard deviation (ddof=1 matches pandas rolling().std())
+
+    Two-pass per window: squared deviations from the rolling mean are summed
+    directly rather than taken from running sums of squares, which lose
+    precision on long price series.
+    """
+    x = as_float_array(x)
+    out = _prepare_out(out, x.shape, x.dtype)
+    n = x.shape[0]
+    out[:min(window - 1, n)] = np.nan
+    if n >= window:
+        mean = rolling_mean(x, window)[window - 1:]
+        acc = np.zeros(mean.shape, dtype=np.float64)
+        for offset in range(window):
+            dev = x[offset:n - window + 1 + offset] - mean
+            acc += dev * dev
+        np.sqrt(acc / (window - ddof), out=out[window - 1:], casting='unsafe')
+    return out
+
+
+def rolling_max(x, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rolling maximum (NaN until the window is full)"""
+    x = as_float_array(x)
+    return _window_reduce(x, window, np.maximum, _prepare_out(out, x.shape, x.dtype))
+
+
+def rolling_min(x, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rolling minimum (NaN until the window is full)"""
+    x = as_float_array(x)
+    return _window_reduce(x, window, np.minimum, _prepare_out(out, x.shape, x.dtype))
+
+
+def ema(x, span: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Exponential moving average, equivalent to ewm(span=span, adjust=False)
+
+    The recursion y[t] = a*x[t] + (1-a)*y[t-1] is solved in closed form over
+    blocks short enough for (1-a)^-k to stay finite, so each block is a
+    handful of vectorized operations. Leading NaNs (e.g. symbols with a
+    shorter history in a panel) are skipped per column.
+
+    Args:
+        x: Input array [n] or [n, k]
+        span: EMA span
+        out: Optional preallocated output
+    """
+    x = as_float_array(x)
+    out = _prepare_out(out, x.shape, x.dtype)
+    n = x.shape[0]
+    if n == 0:
+        return out
+
+    alpha = 2.0 / (span + 1.0)
+    beta = 1.0 - alpha
+
+    # Leading NaNs: hold the first valid value so the EMA starts there
+    first_valid = None
+    work = x
+    if not np.isfinite(x[0]).all():
+        finite = np.isfinite(x)
+        first_valid = np.argmax(finite, axis=0)
+        has_data = finite.any(axis=0)
+        seed = np.take_along_axis(x, np.atleast_1d(first_valid)[None, ...], axis=0)[0] \
+            if x.ndim > 1 else x[first_valid]
+        leading = np.arange(n).reshape((n,) + (1,) * (x.ndim - 1)) < first_valid
+        work = np.where(leading, seed, x)
+        first_valid = np.where(has_data, first_valid, n)
+
+    if beta == 0.0:
+        out[:] = work
+    else:
+        block = max(1, int(150 * np.log(10) / -np.log(beta)))
+        steps = np.arange(min(block, n), dtype=np.float64)
+        decay = beta ** steps                 # beta^k
+        growth = 1.0 / decay                  # beta^-k
+        shape = (-1,) + (1,) * (x.ndim - 1)
+        decay = decay.reshape(shape)
+        growth = growth.reshape(shape)
+
+        prev = np.asarray(work[0], dtype=np.float64)
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            length = stop - start
+            acc = np.cumsum(work[start:stop] * growth[:length], axis=0, dtype=np.float64)
+            acc *= alpha
+            acc += beta * prev
+            acc *= decay[:length]
+            out[start:stop] = acc
+            prev = acc[-1]
+
+    if first_valid is not None:
+        leading = np.arange(n).reshape((n,) + (1,) * (x.ndim - 1)) < first_valid
+        out[leading] = np.nan
+    return out
+
+
+def true_range(high, low, close, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    True Range: max(high-low, |high-prev_close|, |low-prev_close|)
+
+    The first bar has no previous close and uses high-low.
+    """
+    high = as_float_array(high)
+    low = as_float_array(low)
+    close = as_float_array(close)
+    out = _prepare_out(out, high.shape, _result_dtype(high, low, close))
+
+    np.subtract(high, low, out=out, casting='same_kind')
+    if high.shape[0] > 1:
+        prev_close = close[:-1]
+        np.fmax(out[1:], np.abs(high[1:] - prev_close), out=out[1:], casting='same_kind')
+        np.fmax(out[1:], np.abs(low[1:] - prev_close), out=out[1:], casting='same_kind')
+    return out
+
+
+def atr(high, low, close, period: int = 14, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Average True Range (simple moving average of True Range)"""
+    tr = true_range(high, low, close)
+    return rolling_mean(tr, period, out=out)
+
+
+def rsi(close, period: int = 14, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Relative Strength Index using rolling means of gains and losses
+
+    Matches MomentumAnalyzer.calculate_rsi (not Wilder smoothing).
+    """
+    close = as_float_array(close)
+    out = _prepare_out(out, close.shape, close.dtype)
+
+    delta = np.zeros(close.shape, dtype=close.dtype)
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+    with np.errstate(invalid='ignore'):
+        gain = np.where(delta > 0, delta, 0.0).astype(close.dtype, copy=False)
+        loss = np.where(delta < 0, -delta, 0.0).astype(close.dtype, copy=False)
+
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period, out=loss)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(avg_gain, avg_loss, out=out)
+        out += 1.0
+        np.divide(100.0, out, out=out)
+        np.subtract(100.0, out, out=out)
+    return out
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9,
+         out: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD
+
+    Returns:
+        Tuple of (macd_line, signal_line, histogram)
+    """
+    close = as_float_array(close)
+    if out is None:
+        out = (None, None, None)
+    line = _prepare_out(out[0], close.shape, close.dtype)
+    signal_line = _prepare_out(out[1], close.shape, close.dtype)
+    hist = _prepare_out(out[2], close.shape, close.dtype)
+
+    ema(close, fast, out=line)
+    slow_ema = ema(close, slow, out=hist)
+    line -= slow_ema
+    ema(line, signal, out=signal_line)
+    np.subtract(line, signal_line, out=hist)
+    return line, signal_line, hist
+
+
+def directional_movement(high, low) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    +DM and -DM (first bar is 0)
+
+    Returns:
+        Tuple of (plus_dm, minus_dm)
+    """
+    high = as_float_array(high)
+    low = as_float_array(low)
+    dtype = _result_dtype(high, low)
+
+    plus_dm = np.zeros(high.shape, dtype=dtype)
+    minus_dm = np.zeros(high.shape, dtype=dtype)
+    if high.shape[0] > 1:
+        up_move = high[1:] - high[:-1]
+        down_move = low[:-1] - low[1:]
+        with np.errstate(invalid='ignore'):
+            np.copyto(plus_dm[1:], up_move, where=(up_move > down_move) & (up_move > 0), casting='same_kind')
+            np.copyto(minus_dm[1:], down_move, where=(down_move > up_move) & (down_move > 0), casting='same_kind')
+    return plus_dm, minus_dm
+
+
+def adx(high, low, close, period: int = 14, tr: Optional[np.ndarray] = None,
+        out: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    +DI, -DI and ADX with simple moving averages (matches calculate_adx)
+
+    Args:
+        tr: Precomputed True Range (optional)
+
+    Returns:
+        Tuple of (di_plus, di_minus, adx) series
+    """
+    high = as_float_array(high)
+    low = as_float_array(low)
+    close = as_float_array(close)
+    dtype = _result_dtype(high, low, close)
+    if out is None:
+        out = (None, None, None)
+    di_plus = _prepare_out(out[0], high.shape, dtype)
+    di_minus = _prepare_out(out[1], high.shape, dtype)
+    adx_out = _prepare_out(out[2], high.shape, dtype)
+
+    if tr is None:
+        tr = true_range(high, low, close)
+    average_tr = rolling_mean(tr, period)
+
+    plus_dm, minus_dm = directional_movement(high, low)
+    rolling_mean(plus_dm, period, out=di_plus)
+    rolling_mean(minus_dm, period, out=di_minus)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_plus /= average_tr
+        di_plus *= 100.0
+        di_minus /= average_tr
+        di_minus *= 100.0
+
+        # DX reuses the +DM buffer
+        dx = np.subtract(di_plus, di_minus, out=plus_dm)
+        np.abs(dx, out=dx)
+        dx *= 100.0
+        dx /= (di_plus + di_minus)
+
+    rolling_mean(dx, period, out=adx_out)
+    return di_plus, di_minus, adx_out
+
+
+def roc(close, period: int = 10, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rate of Change in percent"""
+    close = as_float_array(close)
+    out = _prepare_out(out, close.shape, close.dtype)
+    out[:period] = np.nan
+    if close.shape[0] > period:
+        past = close[:-period]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.subtract(close[period:], past, out=out[period:])
+            out[period:] /= past
+            out[period:] *= 100.0
+    return out
+
+
+def obv(close, volume, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """On-Balance Volume (cumulative signed volume)"""
+    close = as_float_array(close)
+    volume = as_float_array(volume)
+    dtype = _result_dtype(close, volume)
+    out = _prepare_out(out, close.shape, dtype)
+
+    direction = np.zeros(close.shape, dtype=np.float64)
+    if close.shape[0] > 1:
+        np.sign(close[1:] - close[:-1], out=direction[1:], casting='same_kind')
+        np.nan_to_num(direction, copy=False)
+    direction *= np.nan_to_num(volume)
+    np.cumsum(direction, axis=0, out=direction)
+    out[:] = direction
+    return out
+
+
+def bollinger_bands(close, period: int = 20, std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bollinger Bands (sample standard deviation, like pandas)
+
+    Returns:
+        Tuple of (upper_band, middle_band, lower_band)
+    """
+    close = as_float_array(close)
+    middle = rolling_mean(close, period)
+    width = rolling_std(close, period)
+    width *= std
+    upper = middle + width
+    lower = np.subtract(middle, width, out=width)
+    return upper, middle, lower
+
+
+def stochastic(high, low, close, k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stochastic Oscillator (fast %K and its SMA %D)
+
+    Returns:
+        Tuple of (%K, %D)
+    """
+    high = as_float_array(high)
+    low = as_float_array(low)
+    close = as_float_array(close)
+
+    lowest_low = rolling_min(low, k_period)
+    highest_high = rolling_max(high, k_period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.subtract(close, lowest_low)
+        highest_high -= lowest_low
+        k /= highest_high
+        k *= 100.0
+    d = rolling_mean(k, d_period)
+    return k, d
+
+
+def run_length(mask, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Consecutive True count ending at each bar (0 where mask is False)
+
+    The index of the most recent False is carried forward with
+    maximum.accumulate, so the count is the distance to it.
+
+    Args:
+        mask: Boolean array [n] or [n, k]
+        out: Optional preallocated int64 output
+    """
+    mask = np.asarray(mask, dtype=bool)
+    out = _prepare_out(out, mask.shape, np.int64)
+    n = mask.shape[0]
+    if n == 0:
+        return out
+
+    index = np.arange(n, dtype=np.int64).reshape((n,) + (1,) * (mask.ndim - 1))
+    last_false = np.where(mask, np.int64(-1), index)
+    np.maximum.accumulate(last_false, axis=0, out=last_false)
+    np.subtract(index, last_false, out=out)
+    return out
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PARAMETER GRIDS
+# One shared pass over the series for many window lengths; results are
+# stacked as [parameter, time].
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _grid_windows(windows) -> np.ndarray:
+    """Validate window lengths for a grid"""
+    windows = np.atleast_1d(np.asarray(windows, dtype=np.int64))
+    if windows.ndim != 1 or (windows <= 0).any():
+        raise ValueError("windows must be a 1D array of positive lengths")
+    return windows
+
+
+def rolling_mean_grid(x, windows) -> np.ndarray:
+    """
+    Simple moving averages for many windows from one cumulative sum
+
+    Args:
+        x: Input series [n]
+        windows: Window lengths [w]
+
+    Returns:
+        Array [w, n] (same NaN rules as rolling_mean)
+    """
+    x = as_float_array(x)
+    windows = _grid_windows(windows)
+    n = x.shape[0]
+    out = np.full((len(windows), n), np.nan, dtype=x.dtype)
+
+    finite = np.isfinite(x)
+    csum = np.zeros(n + 1, dtype=np.float64)
+    np.cumsum(np.where(finite, x, 0.0), dtype=np.float64, out=csum[1:])
+    bad = None
+    if not finite.all():
+        bad = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(~finite, out=bad[1:])
+
+    for row, window in enumerate(windows):
+        if window > n:
+            continue
+        values = (csum[window:] - csum[:-window]) / window
+        if bad is not None:
+            values[(bad[window:] - bad[:-window]) > 0] = np.nan
+        out[row, window - 1:] = values
+    return out
+
+
+# Minimum block length for the block-local sums behind rolling_std_grid
+STD_GRID_BLOCK = 1024
+
+# Windows up to this length use the exact two-pass rolling_std: short windows
+# can be nearly flat, where sqrt() magnifies the sum-of-squares rounding
+STD_GRID_EXACT_WINDOW = 8
+
+
+def rolling_std_grid(x, windows, ddof: int = 1) -> np.ndarray:
+    """
+    Rolling standard deviations for many windows from shared cumulative sums
+
+    Sums of (x - block mean) and its square restart every block, so they stay
+    small and the variance keeps ~1e-12 of the squared price level. A window
+    spans at most two blocks; the older part is moved to the newer block's
+    mean before the parts are added. Windows up to STD_GRID_EXACT_WINDOW bars
+    use rolling_std.
+
+    Args:
+        x: Input series [n]
+        windows: Window lengths [w]
+        ddof: Delta degrees of freedom (1 = sample std, like pandas)
+
+    Returns:
+        Array [w, n]
+    """
+    x = as_float_array(x)
+    windows = _grid_windows(windows)
+    n = x.shape[0]
+    out = np.full((len(windows), n), np.nan, dtype=x.dtype)
+    if n == 0:
+        return out
+
+    block = max(STD_GRID_BLOCK, 1 << (int(windows.max()) - 1).bit_length())
+    blocks = -(-n // block)
+    padded = np.zeros(blocks * block, dtype=np.float64)
+    padded[:n] = x
+    finite = np.zeros(blocks * block, dtype=bool)
+    finite[:n] = np.isfinite(x)
+    padded[~finite] = 0.0
+
+    # Per-block means, then block-local cumulative sums of the centred values
+    counts = finite.reshape(blocks, block).sum(axis=1)
+    centres = padded.reshape(blocks, block).sum(axis=1) / np.maximum(counts, 1)
+    centred = np.where(finite, padded - np.repeat(centres, block), 0.0).reshape(blocks, block)
+    c1 = np.cumsum(centred, axis=1)
+    c2 = np.cumsum(centred * centred, axis=1)
+    t1, t2 = c1[:, -1], c2[:, -1]
+    c1, c2 = c1.ravel()[:n], c2.ravel()[:n]
+
+    bad = None
+    if not finite[:n].all():
+        bad = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(~finite[:n], out=bad[1:])
+
+    for row, window in enumerate(windows):
+        if window > n or window <= ddof:
+            continue
+        if window <= STD_GRID_EXACT_WINDOW:
+            rolling_std(x, int(window), ddof=ddof, out=out[row])
+            continue
+        end = np.arange(window - 1, n)
+        start = end - window + 1
+        end_block = end // block
+        start_block = start // block
+        at_block_start = start % block == 0
+        before1 = np.where(at_block_start, 0.0, c1[start - 1])
+        before2 = np.where(at_block_start, 0.0, c2[start - 1])
+
+        # Window inside one block
+        total = c1[end] - before1
+        squares = c2[end] - before2
+
+        # Window across two blocks: older part re-centred on the newer block's mean
+        split = start_block != end_block
+        if split.any():
+            older = start_block[split]
+            shift = centres[older] - centres[end_block[split]]
+            count = (older + 1) * block - start[split]
+            part1 = t1[older] - before1[split]
+            part2 = t2[older] - before2[split]
+            part2 = part2 + 2.0 * shift * part1 + count * shift * shift
+            part1 = part1 + count * shift
+            total[split] = part1 + c1[end[split]]
+            squares[split] = part2 + c2[end[split]]
+
+        variance = (squares - total * total / window) / (window - ddof)
+        np.maximum(variance, 0.0, out=variance)
+        values = np.sqrt(variance)
+        if bad is not None:
+            values[(bad[window:] - bad[:-window]) > 0] = np.nan
+        out[row, window - 1:] = values
+    return out
+
+
+def _sparse_table(x: np.ndarray, ufunc, max_span: int) -> list:
+    """
+    Trailing power-of-two reductions: level j at bar i reduces bars
+    [i - 2^j + 1, i] (valid from i = 2^j - 1 on), up to 2^j <= max_span
+    """
+    levels = [x]
+    span = 1
+    while span * 2 <= min(max_span, max(x.shape[0], 1)):
+        prev = levels[-1]
+        level = prev.copy()
+        ufunc(prev[span:], prev[:-span], out=level[span:])
+        levels.append(level)
+        span *= 2
+    return levels
+
+
+def _rolling_extreme_grid(x, windows, ufunc) -> np.ndarray:
+    """
+    Rolling max/min for many windows from one sparse table
+
+    Level j holds the extreme of the trailing 2^j bars; any window w is the
+    extreme of two overlapping power-of-two windows, so each extra window
+    costs one vector operation.
+    """
+    x = as_float_array(x)
+    windows = _grid_windows(windows)
+    n = x.shape[0]
+    out = np.full((len(windows), n), np.nan, dtype=x.dtype)
+    levels = _sparse_table(x, ufunc, int(windows.max()))
+
+    for row, window in enumerate(windows):
+        if window > n:
+            continue
+        j = int(window).bit_length() - 1
+        level = levels[j]
+        size = 1 << j
+        # Extreme of [i - window + 1, i - window + size] and [i - size + 1, i]
+        ufunc(level[window - 1:], level[size - 1:n - window + size], out=out[row, window - 1:])
+    return out
+
+
+def rolling_max_grid(x, windows) -> np.ndarray:
+    """Rolling maxima for many windows [w, n] (NaN until each window is full)"""
+    return _rolling_extreme_grid(x, windows, np.maximum)
+
+
+def rolling_min_grid(x, windows) -> np.ndarray:
+    """Rolling minima for many windows [w, n] (NaN until each window is full)"""
+    return _rolling_extreme_grid(x, windows, np.minimum)
+
+
+def run_length_within(x, lower, upper) -> np.ndarray:
+    """
+    Consecutive bars ending at each bar t with lower[t] <= x <= upper[t]
+
+    Unlike run_length on a per-bar mask, every earlier bar is judged against
+    bar t's bounds, i.e. the count a live check at bar t would report
+    ("how long has price been inside today's zone"). Found by binary lifting
+    over sparse tables of rolling min/max, O(n log n) for the whole series.
+
+    Args:
+        x: Input series [n]
+        lower, upper: Bounds per bar [n] (or scalars); NaN bounds give 0
+
+    Returns:
+        int64 array [n]
+    """
+    x = as_float_array(x)
+    n = x.shape[0]
+    lower = np.broadcast_to(np.asarray(lower, dtype=np.float64), (n,))
+    upper = np.broadcast_to(np.asarray(upper, dtype=np.float64), (n,))
+    count = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return count
+
+    lows = _sparse_table(x, np.minimum, n)
+    highs = _sparse_table(x, np.maximum, n)
+    bars = np.arange(n)
+
+    # Grow each run by the largest power-of-two block still inside the bounds
+    with np.errstate(invalid='ignore'):
+        for j in range(len(lows) - 1, -1, -1):
+            size = 1 << j
+            end = bars - count             # last bar not yet in the run
+            fits = end + 1 >= size
+            idx = np.where(fits, end, 0)
+            inside = fits & (lows[j][idx] >= lower) & (highs[j][idx] <= upper)
+            count += np.where(inside, size, 0)
+    return count
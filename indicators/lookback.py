@@ -0,0 +1,84 @@
+"""
+Lookback Registry
+Bars of history each analyzer needs per timeframe, used to size data requests
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Declaration key that applies to every timeframe
+ALL_TIMEFRAMES = "*"
+
+
+class LookbackRegistry:
+    """
+    Collects per-timeframe lookback declarations from analyzers
+
+    Each analyzer declares under its own name, so re-declaring (e.g. after a
+    config change) replaces the previous values. A requirement of None means
+    "as much history as allowed" (e.g. full-series EMAs) and resolves to the cap.
+    """
+
+    def __init__(self):
+        self._declarations = {}  # {name: {timeframe: bars or None}}
+        self._lock = threading.Lock()
+
+    def declare(self, name: str, requirements: Dict[str, Optional[int]]):
+        """
+        Declare the bars an analyzer needs
+
+        Args:
+            name: Analyzer name (e.g. "murrey", "momentum")
+            requirements: Dictionary {timeframe: bars}; "*" applies to all timeframes
+        """
+        with self._lock:
+            self._declarations[name] = dict(requirements)
+        logger.debug(f"Lookback declared by {name}: {requirements}")
+
+    def required_bars(self, timeframe: str, cap: int) -> int:
+        """
+        Minimum bars to fetch for a timeframe
+
+        Args:
+            timeframe: Timeframe ("M15", "H1", "H4", "D1", "W1")
+            cap: Upper limit (LOOKBACK_BARS); also used when nothing is declared
+
+        Returns:
+            Largest declared requirement, limited to cap
+        """
+        needed = []
+        with self._lock:
+            for requirements in self._declarations.values():
+                for tf in (timeframe, ALL_TIMEFRAMES):
+                    if tf in requirements:
+                        needed.append(requirements[tf])
+
+        if not needed or any(bars is None for bars in needed):
+            return cap
+        return min(cap, max(needed))
+
+    def bar_budget(self, timeframes: Iterable[str], cap: int) -> Dict[str, int]:
+        """
+        Bars to fetch for each timeframe
+
+        Returns:
+            Dictionary {timeframe: bars}
+        """
+        return {tf: self.required_bars(tf, cap) for tf in timeframes}
+
+    def declarations(self) -> Dict[str, Dict[str, Optional[int]]]:
+        """Copy of all declarations (for diagnostics)"""
+        with self._lock:
+            return {name: dict(req) for name, req in self._declarations.items()}
+
+    def clear(self):
+        """Remove all declarations"""
+        with self._lock:
+            self._declarations.clear()
+
+
+# Shared registry used by the analyzers and DataFetcher
+lookback_registry = LookbackRegistry()
@@ -6,7 +6,14 @@ Analyzes Weekly, Daily, 4H, 1H momentum and alignment
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
+from indicators import kernels
+from indicators.feature_cache import feature_cache
+from indicators.indicator_backend import get_backend
+from indicators.technical_indicators import TechnicalIndicators
+from indicators.streaming_indicators import MomentumState
+from indicators.tail_evaluation import momentum_tail_plan, error_bounds
+from indicators.timeframes import utc_times
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +21,58 @@ logger = logging.getLogger(__name__)
 class MomentumAnalyzer:
     """Analyze momentum across multiple timeframes"""
     
-    def __init__(self):
-        """Initialize momentum analyzer"""
-        pass
+    # Weights of each timeframe's strength in the combined momentum
+    TIMEFRAME_WEIGHTS = {
+        'W1': 0.40,  # Weekly: 40%
+        'D1': 0.30,  # Daily: 30%
+        'H4': 0.20,  # 4-Hour: 20%
+        'H1': 0.10,  # 1-Hour: 10%
+    }
+    
+    # Timeframes that must agree for HTF alignment
+    HTF_TIMEFRAMES = ('W1', 'D1', 'H4')
+    
+    def __init__(self, live_mode: bool = False, tail_tolerance: float = None):
+        """
+        Initialize momentum analyzer
+        
+        Args:
+            live_mode: Advance streaming indicator states bar by bar instead
+                       of recomputing full series on every call
+            tail_tolerance: Evaluate indicators over the last few hundred bars
+                            only, with EMA/MACD error <= tolerance x close range
+                            (None = full series, exact)
+        """
+        self.live_mode = live_mode
+        self.tail_tolerance = tail_tolerance
+        self._states = {}  # {(symbol, timeframe): MomentumState}
+    
+    def tail_plan(self) -> Dict:
+        """
+        Warm-up window for tail evaluation with the active backend
+        
+        Returns:
+            Dictionary with 'bars' and per-output error 'factors', or None
+            when tail evaluation is off
+        """
+        if not self.tail_tolerance:
+            return None
+        return momentum_tail_plan(self.tail_tolerance, get_backend().smoothing)
+    
+    def required_bars(self) -> Optional[int]:
+        """
+        Bars of history needed per timeframe
+        
+        Returns:
+            Tail length in tail mode (which then makes the result exact),
+            otherwise None: full-series EMAs use all history available
+        """
+        plan = self.tail_plan()
+        return max(50, plan['bars']) if plan else None
     
     def calculate_ema(self, series: pd.Series, period: int) -> pd.Series:
         """Calculate Exponential Moving Average"""
-        return series.ewm(span=period, adjust=False).mean()
+        return pd.Series(kernels.ema(series.to_numpy(), period), index=series.index)
     
     def calculate_macd(self, close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """
@@ -29,66 +81,43 @@ class MomentumAnalyzer:
         Returns:
             Tuple of (macd_line, signal_line, histogram)
         """
-        ema_fast = self.calculate_ema(close, fast)
-        ema_slow = self.calculate_ema(close, slow)
-        macd_line = ema_fast - ema_slow
-        signal_line = self.calculate_ema(macd_line, signal)
-        histogram = macd_line - signal_line
-        return macd_line, signal_line, histogram
+        macd_line, signal_line, histogram = get_backend().macd(close.to_numpy(), fast, slow, signal)
+        return (
+            pd.Series(macd_line, index=close.index),
+            pd.Series(signal_line, index=close.index),
+            pd.Series(histogram, index=close.index)
+        )
     
     def calculate_rsi(self, close: pd.Series, period: int = 14) -> pd.Series:
         """Calculate Relative Strength Index"""
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return pd.Series(get_backend().rsi(close.to_numpy(), period), index=close.index)
     
-    def calculate_adx(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> Tuple[float, float, float]:
+    def calculate_adx(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14,
+                      tr: pd.Series = None) -> Tuple[float, float, float]:
         """
         Calculate ADX (Average Directional Index)
         
+        Args:
+            tr: Precomputed True Range (optional, e.g. from the feature cache)
+        
         Returns:
             Tuple of (di_plus, di_minus, adx)
         """
-        # True Range
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
-        
-        # Directional Movement
-        up_move = high - high.shift()
-        down_move = low.shift() - low
-        
-        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
-        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
-        
-        plus_dm_series = pd.Series(plus_dm, index=high.index).rolling(window=period).mean()
-        minus_dm_series = pd.Series(minus_dm, index=high.index).rolling(window=period).mean()
-        
-        # Directional Indicators
-        di_plus = 100 * (plus_dm_series / atr)
-        di_minus = 100 * (minus_dm_series / atr)
-        
-        # ADX
-        dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus)
-        adx = dx.rolling(window=period).mean()
+        di_plus, di_minus, adx = get_backend().adx(
+            high.to_numpy(), low.to_numpy(), close.to_numpy(), period,
+            tr=tr.to_numpy() if tr is not None else None
+        )
         
         # Return last values
         return (
-            di_plus.iloc[-1] if len(di_plus) > 0 else 0,
-            di_minus.iloc[-1] if len(di_minus) > 0 else 0,
-            adx.iloc[-1] if len(adx) > 0 else 0
+            di_plus[-1] if len(di_plus) > 0 else 0,
+            di_minus[-1] if len(di_minus) > 0 else 0,
+            adx[-1] if len(adx) > 0 else 0
         )
     
     def calculate_roc(self, close: pd.Series, period: int = 10) -> pd.Series:
         """Calculate Rate of Change"""
-        roc = ((close - close.shift(period)) / close.shift(period)) * 100
-        return roc
+        return pd.Series(kernels.roc(close.to_numpy(), period), index=close.index)
     
     def analyze_timeframe(self, df: pd.DataFrame) -> Dict:
         """
@@ -105,85 +134,198 @@ class MomentumAnalyzer:
                 logger.warning("Insufficient data for momentum analysis")
                 return self._empty_analysis()
             
-            close = df['close']
-            high = df['high']
-            low = df['low']
-            
-            # Calculate indicators
-            ema_8 = self.calculate_ema(close, 8)
-            ema_21 = self.calculate_ema(close, 21)
-            macd_line, signal_line, macd_hist = self.calculate_macd(close)
-            rsi = self.calculate_rsi(close)
-            di_plus, di_minus, adx = self.calculate_adx(high, low, close)
-            roc = self.calculate_roc(close)
-            
-            # Get current values
-            current_close = close.iloc[-1]
-            current_ema_8 = ema_8.iloc[-1]
-            current_ema_21 = ema_21.iloc[-1]
-            current_macd = macd_line.iloc[-1]
-            current_signal = signal_line.iloc[-1]
-            current_macd_hist = macd_hist.iloc[-1]
-            current_rsi = rsi.iloc[-1]
-            current_roc = roc.iloc[-1]
+            if self.live_mode and 'symbol' in df.attrs:
+                return self._score_momentum(self._update_live_state(df).values())
             
-            # Determine trend direction
-            ema_rising = current_ema_8 > ema_8.iloc[-2] and current_ema_8 > current_ema_21
-            ema_falling = current_ema_8 < ema_8.iloc[-2] and current_ema_8 < current_ema_21
+            plan = self.tail_plan()
+            if plan:
+                # Plain arrays: at a few hundred bars pandas overhead would dominate
+                tail = plan['bars']
+                close = df['close'].to_numpy(dtype=float)
+                current = self._latest_values(
+                    df['high'].to_numpy(dtype=float)[-tail:],
+                    df['low'].to_numpy(dtype=float)[-tail:],
+                    close[-tail:]
+                )
+                analysis = self._score_momentum(current)
+                analysis['error_bound'] = error_bounds(plan, float(close.min()), float(close.max()), len(df))
+                return analysis
             
-            macd_bullish = current_macd > 0 and current_macd_hist > 0
-            macd_bearish = current_macd < 0 and current_macd_hist < 0
-            
-            rsi_bullish = 50 < current_rsi < 75
-            rsi_bearish = 25 < current_rsi < 50
-            
-            roc_bullish = current_roc > 0
-            roc_bearish = current_roc < 0
-            
-            # Direction: 1=bullish, -1=bearish, 0=neutral
-            direction = 0
-            if ema_rising and macd_bullish:
-                direction = 1
-            elif ema_falling and macd_bearish:
-                direction = -1
-            
-            # Calculate strength score (0-100)
-            strength = 0.0
-            if direction == 1:  # Bullish
-                strength += 25 if ema_rising else 0
-                strength += 25 if macd_bullish else 0
-                strength += 25 if rsi_bullish else 0
-                strength += 25 if roc_bullish else 0
-            elif direction == -1:  # Bearish
-                strength += 25 if ema_falling else 0
-                strength += 25 if macd_bearish else 0
-                strength += 25 if rsi_bearish else 0
-                strength += 25 if roc_bearish else 0
-            
-            # Boost for strong ADX trend
-            if adx > 25:
-                strength *= 1.2
-                strength = min(strength, 100)
-            
-            return {
-                'direction': direction,  # 1, 0, -1
-                'strength': strength,  # 0-100
-                'ema_8': current_ema_8,
-                'ema_21': current_ema_21,
-                'macd_line': current_macd,
-                'macd_signal': current_signal,
-                'macd_hist': current_macd_hist,
-                'rsi': current_rsi,
-                'adx': adx,
-                'di_plus': di_plus,
-                'di_minus': di_minus,
-                'roc': current_roc,
-            }
+            return self._score_momentum(self._calculate_current_values(df))
             
         except Exception as e:
             logger.error(f"Error analyzing momentum: {e}")
             return self._empty_analysis()
     
+    def _calculate_current_values(self, df: pd.DataFrame) -> Dict:
+        """Compute full indicator series and return the latest values"""
+        close = df['close']
+        high = df['high']
+        low = df['low']
+        
+        # Calculate indicators (shared through the feature cache)
+        backend = get_backend().name
+        ema_8 = feature_cache.get_or_compute(df, 'ema', ('close', 8), lambda: self.calculate_ema(close, 8))
+        ema_21 = feature_cache.get_or_compute(df, 'ema', ('close', 21), lambda: self.calculate_ema(close, 21))
+        macd_line, signal_line, macd_hist = feature_cache.get_or_compute(
+            df, 'macd', (12, 26, 9, backend), lambda: self.calculate_macd(close)
+        )
+        rsi = feature_cache.get_or_compute(df, 'rsi', ('close', 14, backend), lambda: self.calculate_rsi(close))
+        di_plus, di_minus, adx = feature_cache.get_or_compute(
+            df, 'adx', (14, backend),
+            lambda: self.calculate_adx(high, low, close, tr=TechnicalIndicators.calculate_true_range(df))
+        )
+        roc = feature_cache.get_or_compute(df, 'roc', ('close', 10), lambda: self.calculate_roc(close))
+        
+        return {
+            'ema_8': ema_8.iloc[-1],
+            'ema_8_prev': ema_8.iloc[-2],
+            'ema_21': ema_21.iloc[-1],
+            'macd_line': macd_line.iloc[-1],
+            'macd_signal': signal_line.iloc[-1],
+            'macd_hist': macd_hist.iloc[-1],
+            'rsi': rsi.iloc[-1],
+            'adx': adx,
+            'di_plus': di_plus,
+            'di_minus': di_minus,
+            'roc': roc.iloc[-1],
+        }
+    
+    def _latest_values(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Dict:
+        """
+        Latest indicator values straight from arrays (no cache, no Series)
+        
+        Args:
+            high, low, close: [bars] arrays, or [bars x symbols] panels
+        
+        Returns:
+            Dictionary of latest values (scalars, or one value per symbol)
+        """
+        backend = get_backend()
+        
+        ema_8 = kernels.ema(close, 8)
+        ema_21 = kernels.ema(close, 21)
+        macd_line, macd_signal, macd_hist = backend.macd(close, 12, 26, 9)
+        rsi = backend.rsi(close, 14)
+        di_plus, di_minus, adx = backend.adx(high, low, close, 14)
+        roc = kernels.roc(close, 10)
+        
+        return {
+            'ema_8': ema_8[-1],
+            'ema_8_prev': ema_8[-2],
+            'ema_21': ema_21[-1],
+            'macd_line': macd_line[-1],
+            'macd_signal': macd_signal[-1],
+            'macd_hist': macd_hist[-1],
+            'rsi': rsi[-1],
+            'adx': adx[-1],
+            'di_plus': di_plus[-1],
+            'di_minus': di_minus[-1],
+            'roc': roc[-1],
+        }
+    
+    def _update_live_state(self, df: pd.DataFrame) -> MomentumState:
+        """
+        Bring the streaming state for this symbol/timeframe up to date
+        
+        Only bars at or after the state's last bar are applied, so a normal
+        cycle costs O(new bars) regardless of how much history df holds.
+        """
+        key = (df.attrs['symbol'], df.attrs.get('timeframe'))
+        state = self._states.get(key)
+        
+        try:
+            # UTC-naive so tz-aware (Yahoo) and naive (MT5) bars compare alike
+            times = utc_times(df['time'])
+            start = 0
+            if state is not None and state.last_time is not None:
+                last_time = np.datetime64(state.last_time, 'ns')
+                start = int(np.searchsorted(times, last_time, side='left'))
+                if start >= len(times) or times[start] != last_time:
+                    # History gap (or data older than our state) - rebuild
+                    state = None
+                    start = 0
+            
+            if state is None:
+                state = MomentumState(method=get_backend().smoothing)
+                self._states[key] = state
+            
+            high = df['high'].to_numpy(dtype=float)
+            low = df['low'].to_numpy(dtype=float)
+            close = df['close'].to_numpy(dtype=float)
+            for i in range(start, len(times)):
+                state.on_bar(times[i], high[i], low[i], close[i])
+        except Exception:
+            # A half-applied state would poison every later cycle
+            self._states.pop(key, None)
+            raise
+        
+        return state
+    
+    def _score_momentum(self, current: Dict) -> Dict:
+        """Turn the latest indicator values into direction and strength"""
+        current_ema_8 = current['ema_8']
+        current_ema_21 = current['ema_21']
+        current_macd = current['macd_line']
+        current_signal = current['macd_signal']
+        current_macd_hist = current['macd_hist']
+        current_rsi = current['rsi']
+        current_roc = current['roc']
+        adx = current['adx']
+        
+        # Determine trend direction
+        ema_rising = current_ema_8 > current['ema_8_prev'] and current_ema_8 > current_ema_21
+        ema_falling = current_ema_8 < current['ema_8_prev'] and current_ema_8 < current_ema_21
+        
+        macd_bullish = current_macd > 0 and current_macd_hist > 0
+        macd_bearish = current_macd < 0 and current_macd_hist < 0
+        
+        rsi_bullish = 50 < current_rsi < 75
+        rsi_bearish = 25 < current_rsi < 50
+        
+        roc_bullish = current_roc > 0
+        roc_bearish = current_roc < 0
+        
+        # Direction: 1=bullish, -1=bearish, 0=neutral
+        direction = 0
+        if ema_rising and macd_bullish:
+            direction = 1
+        elif ema_falling and macd_bearish:
+            direction = -1
+        
+        # Calculate strength score (0-100)
+        strength = 0.0
+        if direction == 1:  # Bullish
+            strength += 25 if ema_rising else 0
+            strength += 25 if macd_bullish else 0
+            strength += 25 if rsi_bullish else 0
+            strength += 25 if roc_bullish else 0
+        elif direction == -1:  # Bearish
+            strength += 25 if ema_falling else 0
+            strength += 25 if macd_bearish else 0
+            strength += 25 if rsi_bearish else 0
+            strength += 25 if roc_bearish else 0
+        
+        # Boost for strong ADX trend
+        if adx > 25:
+            strength *= 1.2
+            strength = min(strength, 100)
+        
+        return {
+            'direction': direction,  # 1, 0, -1
+            'strength': strength,  # 0-100
+            'ema_8': current_ema_8,
+            'ema_21': current_ema_21,
+            'macd_line': current_macd,
+            'macd_signal': current_signal,
+            'macd_hist': current_macd_hist,
+            'rsi': current_rsi,
+            'adx': adx,
+            'di_plus': current['di_plus'],
+            'di_minus': current['di_minus'],
+            'roc': current_roc,
+        }
+    
     def _empty_analysis(self) -> Dict:
         """Return empty analysis if data insufficient"""
         return {
@@ -219,55 +361,261 @@ class MomentumAnalyzer:
             for tf, df in data_dict.items():
                 results[tf] = self.analyze_timeframe(df)
             
-            # Calculate combined momentum (weighted)
-            weights = {
-                'W1': 0.40,  # Weekly: 40%
-                'D1': 0.30,  # Daily: 30%
-                'H4': 0.20,  # 4-Hour: 20%
-                'H1': 0.10,  # 1-Hour: 10%
-            }
-            
-            combined_momentum = 0.0
-            for tf, weight in weights.items():
-                if tf in results:
-                    combined_momentum += results[tf]['strength'] * weight
+            results['combined'] = self._combine_timeframes(results)
             
-            # Check HTF alignment
-            directions = []
-            for tf in ['W1', 'D1', 'H4']:
-                if tf in results:
-                    directions.append(results[tf]['direction'])
+            return results
             
-            htf_aligned_bullish = all(d == 1 for d in directions) if directions else False
-            htf_aligned_bearish = all(d == -1 for d in directions) if directions else False
-            htf_aligned = htf_aligned_bullish or htf_aligned_bearish
+        except Exception as e:
+            logger.error(f"Error in multi-timeframe analysis: {e}")
+            return {}
+
+    def analyze_panel(self, universe: Dict[str, Dict[str, pd.DataFrame]]) -> Dict[str, Dict]:
+        """
+        Analyze momentum for many symbols at once
+        
+        Every timeframe is stacked into [bars x symbols] arrays and each
+        indicator runs once over the whole panel, so the cost grows with the
+        array size rather than with the number of Python calls.
+        
+        Args:
+            universe: Dictionary {symbol: {timeframe: DataFrame}}
+        
+        Returns:
+            Dictionary {symbol: analyze_multi_timeframe() result}
+        """
+        try:
+            timeframes = []
+            for data_dict in universe.values():
+                for tf in data_dict:
+                    if tf not in timeframes:
+                        timeframes.append(tf)
             
-            # Calculate HTF factor (weighted alignment strength)
-            htf_factor = 0.0
-            if htf_aligned_bullish or htf_aligned_bearish:
-                htf_factor = 1.0  # Perfect alignment
-            else:
-                # Partial alignment
-                bullish_count = sum(1 for d in directions if d == 1)
-                bearish_count = sum(1 for d in directions if d == -1)
-                
-                if bullish_count >= 2 or bearish_count >= 2:
-                    htf_factor = 0.65  # 2 out of 3 aligned
-                elif bullish_count >= 1 or bearish_count >= 1:
-                    htf_factor = 0.40  # 1 out of 3 aligned
-                else:
-                    htf_factor = 0.20  # Neutral
+            per_timeframe = {}
+            for tf in timeframes:
+                frames = {symbol: data_dict[tf] for symbol, data_dict in universe.items() if tf in data_dict}
+                per_timeframe[tf] = self._analyze_panel_timeframe(frames)
             
-            results['combined'] = {
-                'momentum': combined_momentum,
-                'htf_aligned': htf_aligned,
-                'htf_aligned_bullish': htf_aligned_bullish,
-                'htf_aligned_bearish': htf_aligned_bearish,
-                'htf_factor': htf_factor,
-            }
+            results = {}
+            for symbol, data_dict in universe.items():
+                symbol_results = {tf: per_timeframe[tf][symbol] for tf in data_dict}
+                symbol_results['combined'] = self._combine_timeframes(symbol_results)
+                results[symbol] = symbol_results
             
             return results
             
         except Exception as e:
-            logger.error(f"Error in multi-timeframe analysis: {e}")
+            logger.error(f"Error in panel momentum analysis: {e}")
             return {}
+    
+    @staticmethod
+    def _stack_panel(frames: Dict[str, pd.DataFrame], columns: Tuple[str, ...],
+                     rows: int = None) -> Dict[str, np.ndarray]:
+        """
+        Stack one timeframe of many symbols into [bars x symbols] arrays
+        
+        Columns are right-aligned on their own last bar and shorter histories
+        are NaN-padded at the top. Indicators only look back along a symbol's
+        own bars, so each column gives exactly the single-symbol result even
+        when sessions (and therefore timestamps) differ between symbols.
+        
+        Args:
+            rows: Keep only the last `rows` bars (default: longest history)
+        """
+        longest = max(len(df) for df in frames.values())
+        rows = min(rows, longest) if rows else longest
+        panel = {col: np.full((rows, len(frames)), np.nan) for col in columns}
+        for j, df in enumerate(frames.values()):
+            tail = min(rows, len(df))
+            for col in columns:
+                panel[col][rows - tail:, j] = df[col].to_numpy(dtype=float)[len(df) - tail:]
+        return panel
+    
+    def _analyze_panel_timeframe(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """Analyze one timeframe for every symbol in a single vectorized pass"""
+        results = {}
+        usable = {}
+        for symbol, df in frames.items():
+            if df is None or len(df) < 50:
+                logger.warning(f"Insufficient data for momentum analysis: {symbol}")
+                results[symbol] = self._empty_analysis()
+            else:
+                usable[symbol] = df
+        
+        if not usable:
+            return results
+        
+        plan = self.tail_plan()
+        panel = self._stack_panel(usable, ('high', 'low', 'close'), rows=plan['bars'] if plan else None)
+        high, low, close = panel['high'], panel['low'], panel['close']
+        latest = self._latest_values(high, low, close)
+        
+        for j, symbol in enumerate(usable):
+            current = {name: values[j] for name, values in latest.items()}
+            results[symbol] = self._score_momentum(current)
+            
+            if plan:
+                close = usable[symbol]['close'].to_numpy()
+                results[symbol]['error_bound'] = error_bounds(
+                    plan, float(close.min()), float(close.max()), len(close)
+                )
+        
+        return results
+    
+    def _combine_timeframes(self, results: Dict[str, Dict]) -> Dict:
+        """
+        Combine per-timeframe analyses into weighted momentum and HTF alignment
+        
+        Args:
+            results: Dictionary {timeframe: analyze_timeframe() result}
+        
+        Returns:
+            Dictionary stored under results['combined']
+        """
+        # Calculate combined momentum (weighted)
+        combined_momentum = 0.0
+        for tf, weight in self.TIMEFRAME_WEIGHTS.items():
+            if tf in results:
+                combined_momentum += results[tf]['strength'] * weight
+        
+        # Check HTF alignment
+        directions = []
+        for tf in self.HTF_TIMEFRAMES:
+            if tf in results:
+                directions.append(results[tf]['direction'])
+        
+        htf_aligned_bullish = all(d == 1 for d in directions) if directions else False
+        htf_aligned_bearish = all(d == -1 for d in directions) if directions else False
+        htf_aligned = htf_aligned_bullish or htf_aligned_bearish
+        
+        # Calculate HTF factor (weighted alignment strength)
+        htf_factor = 0.0
+        if htf_aligned_bullish or htf_aligned_bearish:
+            htf_factor = 1.0  # Perfect alignment
+        else:
+            # Partial alignment
+            bullish_count = sum(1 for d in directions if d == 1)
+            bearish_count = sum(1 for d in directions if d == -1)
+            
+            if bullish_count >= 2 or bearish_count >= 2:
+                htf_factor = 0.65  # 2 out of 3 aligned
+            elif bullish_count >= 1 or bearish_count >= 1:
+                htf_factor = 0.40  # 1 out of 3 aligned
+            else:
+                htf_factor = 0.20  # Neutral
+        
+        return {
+            'momentum': combined_momentum,
+            'htf_aligned': htf_aligned,
+            'htf_aligned_bullish': htf_aligned_bullish,
+            'htf_aligned_bearish': htf_aligned_bearish,
+            'htf_factor': htf_factor,
+        }
+
+    
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PER-BAR SERIES (history and backtests)
+    # ═══════════════════════════════════════════════════════════════════════════
+    
+    def momentum_series(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Direction and strength as of every bar
+        
+        Row t equals analyze_timeframe(df.iloc[:t + 1]) with full-series
+        indicators (all of them are causal, so one pass serves every bar).
+        
+        Args:
+            df: DataFrame with OHLCV data
+            
+        Returns:
+            DataFrame with 'direction' (1, 0, -1) and 'strength' (0-100);
+            the first 49 bars are empty (direction 0, strength 0)
+        """
+        backend = get_backend()
+        return feature_cache.get_or_compute(
+            df, 'momentum_series', (backend.name,), lambda: self._calculate_momentum_series(df)
+        )
+    
+    def _calculate_momentum_series(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Compute the momentum series without the cache"""
+        backend = get_backend()
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
+        
+        ema_8 = kernels.ema(close, 8)
+        ema_8_prev = np.r_[np.nan, ema_8[:-1]]
+        ema_21 = kernels.ema(close, 21)
+        macd_line, _, macd_hist = backend.macd(close, 12, 26, 9)
+        rsi = backend.rsi(close, 14)
+        _, _, adx = backend.adx(high, low, close, 14)
+        roc = kernels.roc(close, 10)
+        
+        with np.errstate(invalid='ignore'):
+            ema_rising = (ema_8 > ema_8_prev) & (ema_8 > ema_21)
+            ema_falling = (ema_8 < ema_8_prev) & (ema_8 < ema_21)
+            macd_bullish = (macd_line > 0) & (macd_hist > 0)
+            macd_bearish = (macd_line < 0) & (macd_hist < 0)
+            rsi_bullish = (rsi > 50) & (rsi < 75)
+            rsi_bearish = (rsi > 25) & (rsi < 50)
+            
+            bullish = ema_rising & macd_bullish
+            bearish = ~bullish & ema_falling & macd_bearish
+            
+            # Same 25-point components as _score_momentum
+            strength = np.where(bullish, 50.0 + 25 * rsi_bullish + 25 * (roc > 0), 0.0)
+            strength = np.where(bearish, 50.0 + 25 * rsi_bearish + 25 * (roc < 0), strength)
+            strength = np.where(adx > 25, np.minimum(strength * 1.2, 100), strength)
+        
+        direction = np.where(bullish, 1, np.where(bearish, -1, 0)).astype(np.int8)
+        
+        # analyze_timeframe() needs 50 bars
+        warmup = min(49, len(df))
+        direction[:warmup] = 0
+        strength[:warmup] = 0.0
+        
+        return pd.DataFrame({'direction': direction, 'strength': strength}, index=df.index)
+    
+    def combine_series(self, series: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Vectorized _combine_timeframes over aligned per-bar series
+        
+        Args:
+            series: Dictionary {timeframe: DataFrame with 'direction' and
+                    'strength'}, all on the same (base timeframe) index
+            
+        Returns:
+            DataFrame with 'momentum', 'htf_aligned', 'htf_aligned_bullish',
+            'htf_aligned_bearish' and 'htf_factor'
+        """
+        index = next(iter(series.values())).index
+        n = len(index)
+        
+        combined_momentum = np.zeros(n)
+        for tf, weight in self.TIMEFRAME_WEIGHTS.items():
+            if tf in series:
+                combined_momentum += series[tf]['strength'].to_numpy(dtype=float) * weight
+        
+        htf = [series[tf]['direction'].to_numpy() for tf in self.HTF_TIMEFRAMES if tf in series]
+        if htf:
+            directions = np.vstack(htf)
+            bullish_count = (directions == 1).sum(axis=0)
+            bearish_count = (directions == -1).sum(axis=0)
+        else:
+            bullish_count = bearish_count = np.zeros(n, dtype=int)
+        
+        aligned_bullish = (bullish_count == len(htf)) & (len(htf) > 0)
+        aligned_bearish = (bearish_count == len(htf)) & (len(htf) > 0)
+        aligned = aligned_bullish | aligned_bearish
+        
+        # Partial alignment: 2 of 3 -> 0.65, 1 of 3 -> 0.40, neutral -> 0.20
+        partial = np.maximum(bullish_count, bearish_count)
+        htf_factor = np.where(partial >= 2, 0.65, np.where(partial >= 1, 0.40, 0.20))
+        htf_factor = np.where(aligned, 1.0, htf_factor)
+        
+        return pd.DataFrame({
+            'momentum': combined_momentum,
+            'htf_aligned': aligned,
+            'htf_aligned_bullish': aligned_bullish,
+            'htf_aligned_bearish': aligned_bearish,
+            'htf_factor': htf_factor,
+        }, index=index)
@@ -7,6 +7,7 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Tuple, Dict
+from indicators import kernels
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,10 @@ class MurreyMath:
         self.multiplier = multiplier
         self.ignore_wicks = ignore_wicks
     
+    def required_bars(self) -> int:
+        """Bars of history needed for the frame (frame_size x multiplier)"""
+        return int(self.frame_size * self.multiplier)
+    
     def calculate_levels(self, df: pd.DataFrame) -> Dict[str, float]:
         """
         Calculate all Murrey Math levels from OHLC data
@@ -128,6 +133,91 @@ class MurreyMath:
             logger.error(f"Error calculating Murrey Math levels: {e}")
             return {}
     
+    def rolling_levels(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Murrey Math levels as of every bar
+        
+        Row t equals calculate_levels(df.iloc[:t + 1]); the algorithm runs
+        on whole arrays (rolling frame high/low, then the same octave
+        arithmetic with np.where for the branches).
+        
+        Args:
+            df: DataFrame with columns: open, high, low, close
+            
+        Returns:
+            DataFrame with the calculate_levels() keys as columns (NaN where
+            the levels are undefined)
+        """
+        lookback = int(self.frame_size * self.multiplier)
+        
+        if self.ignore_wicks:
+            high_prices = np.maximum(df['open'].to_numpy(dtype=float), df['close'].to_numpy(dtype=float))
+            low_prices = np.minimum(df['open'].to_numpy(dtype=float), df['close'].to_numpy(dtype=float))
+        else:
+            high_prices = df['high'].to_numpy(dtype=float)
+            low_prices = df['low'].to_numpy(dtype=float)
+        
+        # Frame extremes (shorter histories use every bar, like tail())
+        v_high = kernels.rolling_max(high_prices, lookback)
+        v_low = kernels.rolling_min(low_prices, lookback)
+        head = min(lookback - 1, len(df))
+        v_high[:head] = np.maximum.accumulate(high_prices[:head])
+        v_low[:head] = np.minimum.accumulate(low_prices[:head])
+        v_dist = v_high - v_low
+        
+        with np.errstate(all='ignore'):
+            shift = v_low < 0
+            tmp_high = np.where(shift, 0 - v_low, v_high)
+            tmp_low = np.where(shift, 0 - v_low - v_dist, v_low)
+            
+            log_ten = np.log(10)
+            log_8 = np.log(8)
+            log_2 = np.log(2)
+            
+            octave = np.log(0.4 * tmp_high) / log_ten
+            sf_var = octave - np.floor(octave)
+            SR = np.where(
+                tmp_high > 25,
+                np.where(sf_var > 0,
+                         np.exp(log_ten * (np.floor(octave) + 1)),
+                         np.exp(log_ten * np.floor(octave))),
+                100 * np.exp(log_8 * np.floor(np.log(0.005 * tmp_high) / log_8))
+            )
+            
+            n_var1 = np.log(SR / (tmp_high - tmp_low)) / log_8
+            n_var2 = n_var1 - np.floor(n_var1)
+            N = np.where(n_var1 <= 0, 0.0, np.where(n_var2 == 0, np.floor(n_var1), np.floor(n_var1) + 1))
+            
+            SI = SR * np.exp(-N * log_8)
+            M = np.floor(1.0 / log_2 * np.log((tmp_high - tmp_low) / SI) + 0.0000001)
+            I = np.round((tmp_high + tmp_low) * 0.5 / (SI * np.exp((M - 1) * log_2)))
+            
+            Bot = (I - 1) * SI * np.exp((M - 1) * log_2)
+            Top = (I + 1) * SI * np.exp((M - 1) * log_2)
+            
+            # Shifted frame where the range pokes out of the octave
+            do_shift = (tmp_high - Top > 0.25 * (Top - Bot)) | (Bot - tmp_low > 0.25 * (Top - Bot))
+            MM = np.where(M < 2, M + 1, 0.0)
+            NN = np.where(M < 2, N, N - 1)
+            final_SI = SR * np.exp(-NN * log_8)
+            final_I = np.round((tmp_high + tmp_low) * 0.5 / (final_SI * np.exp((MM - 1) * log_2)))
+            final_Bot = np.where(do_shift, (final_I - 1) * final_SI * np.exp((MM - 1) * log_2), Bot)
+            final_Top = np.where(do_shift, (final_I + 1) * final_SI * np.exp((MM - 1) * log_2), Top)
+            
+            inc = (final_Top - final_Bot) / 8
+            abs_top = np.where(shift, -(final_Bot - 3 * inc), final_Top + 3 * inc)
+        
+        # calculate_levels() fails (returns {}) when the frame is degenerate
+        valid = np.isfinite(I) & np.isfinite(final_I) & np.isfinite(inc) & np.isfinite(abs_top)
+        inc = np.where(valid, inc, np.nan)
+        abs_top = np.where(valid, abs_top, np.nan)
+        
+        names = ['plus_3_8', 'plus_2_8', 'plus_1_8', '8_8', '7_8', '6_8', '5_8', '4_8',
+                 '3_8', '2_8', '1_8', '0_8', 'minus_1_8', 'minus_2_8', 'minus_3_8']
+        levels = {name: abs_top - k * inc if k else abs_top for k, name in enumerate(names)}
+        levels['increment'] = inc
+        return pd.DataFrame(levels, index=df.index)
+    
     def get_current_position(self, current_price: float, levels: Dict[str, float]) -> Tuple[str, float]:
         """
         Determine which Murrey level price is closest to
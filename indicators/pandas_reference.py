@@ -0,0 +1,149 @@
+"""
+Pandas Reference Indicators
+Original pandas implementations kept as the numerical reference for
+indicators/kernels.py (used by benchmark_indicators.py)
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Tuple
+
+
+def calculate_ema(series: pd.Series, period: int) -> pd.Series:
+    """Calculate Exponential Moving Average"""
+    return series.ewm(span=period, adjust=False).mean()
+
+
+def calculate_true_range(df: pd.DataFrame) -> pd.Series:
+    """Calculate True Range"""
+    high = df['high']
+    low = df['low']
+    close = df['close']
+    
+    # True Range components
+    tr1 = high - low
+    tr2 = abs(high - close.shift())
+    tr3 = abs(low - close.shift())
+    
+    # True Range = max of three components
+    return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+
+
+def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    """Calculate Average True Range series"""
+    return calculate_true_range(df).rolling(window=period).mean()
+
+
+def calculate_macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Calculate MACD
+    
+    Returns:
+        Tuple of (macd_line, signal_line, histogram)
+    """
+    ema_fast = calculate_ema(close, fast)
+    ema_slow = calculate_ema(close, slow)
+    macd_line = ema_fast - ema_slow
+    signal_line = calculate_ema(macd_line, signal)
+    histogram = macd_line - signal_line
+    return macd_line, signal_line, histogram
+
+
+def calculate_rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """Calculate Relative Strength Index"""
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+
+def calculate_adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Calculate ADX (Average Directional Index)
+    
+    Returns:
+        Tuple of (di_plus, di_minus, adx) series
+    """
+    # True Range
+    tr1 = high - low
+    tr2 = abs(high - close.shift())
+    tr3 = abs(low - close.shift())
+    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    atr = tr.rolling(window=period).mean()
+    
+    # Directional Movement
+    up_move = high - high.shift()
+    down_move = low.shift() - low
+    
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+    
+    plus_dm_series = pd.Series(plus_dm, index=high.index).rolling(window=period).mean()
+    minus_dm_series = pd.Series(minus_dm, index=high.index).rolling(window=period).mean()
+    
+    # Directional Indicators
+    di_plus = 100 * (plus_dm_series / atr)
+    di_minus = 100 * (minus_dm_series / atr)
+    
+    # ADX
+    dx = 100 * abs(di_plus - di_minus) / (di_plus + di_minus)
+    adx = dx.rolling(window=period).mean()
+    
+    return di_plus, di_minus, adx
+
+
+def calculate_roc(close: pd.Series, period: int = 10) -> pd.Series:
+    """Calculate Rate of Change"""
+    return ((close - close.shift(period)) / close.shift(period)) * 100
+
+
+def calculate_obv(df: pd.DataFrame) -> pd.Series:
+    """Calculate On-Balance Volume (OBV)"""
+    close = df['close']
+    volume = df['volume']
+    
+    # Calculate price direction
+    direction = np.where(close > close.shift(1), 1, np.where(close < close.shift(1), -1, 0))
+    
+    # Calculate OBV
+    obv = (direction * volume).cumsum()
+    
+    return pd.Series(obv, index=df.index)
+
+
+def calculate_bollinger_bands(close: pd.Series, period: int = 20, std: float = 2.0) -> tuple:
+    """
+    Calculate Bollinger Bands
+    
+    Returns:
+        Tuple of (upper_band, middle_band, lower_band)
+    """
+    middle = close.rolling(window=period).mean()
+    std_dev = close.rolling(window=period).std()
+    upper = middle + (std_dev * std)
+    lower = middle - (std_dev * std)
+    return upper, middle, lower
+
+
+def calculate_stochastic(df: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> tuple:
+    """
+    Calculate Stochastic Oscillator
+    
+    Returns:
+        Tuple of (%K, %D)
+    """
+    high = df['high']
+    low = df['low']
+    close = df['close']
+    
+    # %K = (Close - Lowest Low) / (Highest High - Lowest Low) * 100
+    lowest_low = low.rolling(window=k_period).min()
+    highest_high = high.rolling(window=k_period).max()
+    
+    k = 100 * (close - lowest_low) / (highest_high - lowest_low)
+    d = k.rolling(window=d_period).mean()
+    
+    return k, d
@@ -7,6 +7,7 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, Optional
+from indicators import kernels
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,10 @@ class SpringDetector:
         self.volume_spike_threshold = volume_spike_threshold
         self.max_snapback_bars = max_snapback_bars
     
+    def required_bars(self) -> int:
+        """Bars of history needed (20-bar volume average)"""
+        return 20
+    
     def detect_spring(self, df: pd.DataFrame, reference_level: float, increment: float, 
                       setup_type: int, time_at_level: int) -> Dict:
         """
@@ -220,6 +225,67 @@ class SpringDetector:
                 'bars_since': bars_since_spike
             }
     
+    def spring_series(self, df: pd.DataFrame, reference_level, increment, setup_type,
+                      time_at_level) -> pd.DataFrame:
+        """
+        detect_spring() as of every bar
+        
+        Args:
+            df: DataFrame with OHLCV data
+            reference_level: Per-bar 0/8 or 8/8 level
+            increment: Per-bar Murrey increment
+            setup_type: Per-bar setup (1 long, -1 short, 0 none)
+            time_at_level: Per-bar bars accumulating at level
+            
+        Returns:
+            DataFrame with 'state' (STATE_*) and 'score'
+        """
+        n = len(df)
+        reference_level = np.broadcast_to(np.asarray(reference_level, dtype=float), (n,))
+        increment = np.broadcast_to(np.asarray(increment, dtype=float), (n,))
+        setup_type = np.broadcast_to(np.asarray(setup_type), (n,))
+        time_at_level = np.broadcast_to(np.asarray(time_at_level), (n,))
+        
+        close = df['close'].to_numpy(dtype=float)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
+        vol_avg = kernels.rolling_mean(volume, 20)
+        
+        long_setup = setup_type == 1
+        threshold = np.where(long_setup, reference_level - (increment * 0.5), reference_level + (increment * 0.5))
+        
+        # First of the last 3 bars that broke the threshold on a volume spike
+        bars_since = np.full(n, -1)
+        with np.errstate(invalid='ignore'):
+            for lag in (0, 1, 2):
+                past = np.arange(n) - lag
+                ok = past >= 0
+                idx = np.maximum(past, 0)
+                broke = np.where(long_setup, low[idx] < threshold, high[idx] > threshold)
+                hit = ok & broke & (volume[idx] > vol_avg * self.volume_spike_threshold)
+                # Older bars are checked first, so a larger lag wins
+                bars_since = np.where(hit, lag, bars_since)
+            
+            recovered = np.where(long_setup, close > reference_level, close < reference_level) & (volume < vol_avg)
+        
+        triggered = bars_since >= 0
+        in_time = bars_since <= self.max_snapback_bars
+        state = np.where(triggered & in_time & recovered, self.STATE_COMPLETE,
+                         np.where(triggered & in_time, self.STATE_POTENTIAL,
+                                  np.where(triggered, self.STATE_FAILED, self.STATE_NONE)))
+        score = np.select(
+            [state == self.STATE_COMPLETE, state == self.STATE_POTENTIAL, state == self.STATE_FAILED],
+            [100.0, 60.0, 0.0], default=40.0
+        )
+        
+        # detect_spring() needs 20 bars, 6 bars at level and a setup
+        inactive = (np.arange(n) < 19) | (time_at_level < 6) | (setup_type == 0)
+        state = np.where(inactive, self.STATE_NONE, state).astype(np.int8)
+        score = np.where(inactive, 40.0, score)
+        
+        return pd.DataFrame({'state': state, 'score': score}, index=df.index)
+    
     def _empty_spring(self) -> Dict:
         """Return empty spring analysis"""
         return {
@@ -0,0 +1,365 @@
+"""
+Streaming Indicators
+O(1)-per-bar indicator state objects for live scanning
+"""
+
+import math
+import logging
+from collections import deque
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+
+class StreamingIndicator:
+    """
+    Base class for incremental indicators
+
+    Every indicator advances with ``update()`` in constant time. ``snapshot()``
+    captures the complete state so the forming bar can be revised later with
+    ``restore()`` followed by another ``update()``.
+    """
+
+    def snapshot(self) -> Dict:
+        """Capture the current state"""
+        state = {}
+        for name, value in self.__dict__.items():
+            if isinstance(value, deque):
+                state[name] = deque(value, maxlen=value.maxlen)
+            elif isinstance(value, StreamingIndicator):
+                state[name] = value.snapshot()
+            else:
+                state[name] = value
+        return state
+
+    def restore(self, state: Dict):
+        """Restore a state captured by snapshot()"""
+        for name, value in state.items():
+            current = self.__dict__.get(name)
+            if isinstance(current, StreamingIndicator):
+                current.restore(value)
+            elif isinstance(value, deque):
+                self.__dict__[name] = deque(value, maxlen=value.maxlen)
+            else:
+                self.__dict__[name] = value
+
+
+class RollingMean(StreamingIndicator):
+    """Simple moving average over a fixed window (matches pandas rolling().mean())"""
+
+    # Re-sum the window periodically so the running sum cannot drift
+    RESUM_INTERVAL = 1000
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.nan_count = 0
+        self.updates = 0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if len(self.window) == self.period:
+            old = self.window[0]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+
+        self.window.append(x)
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self.total += x
+
+        self.updates += 1
+        if self.updates % self.RESUM_INTERVAL == 0:
+            self.total = sum(v for v in self.window if not math.isnan(v))
+
+        if len(self.window) < self.period or self.nan_count > 0:
+            self.value = NAN
+        else:
+            self.value = self.total / self.period
+        return self.value
+
+
+class WilderMean(StreamingIndicator):
+    """Wilder smoothing (RMA): SMA seed, then (prev * (n-1) + x) / n"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.seed_total = 0.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value
+
+        self.count += 1
+        if self.count < self.period:
+            self.seed_total += x
+        elif self.count == self.period:
+            self.value = (self.seed_total + x) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + x) / self.period
+        return self.value
+
+
+def _smoother(period: int, method: str) -> StreamingIndicator:
+    """Create the moving average used by RSI/ATR/ADX"""
+    if method == 'wilder':
+        return WilderMean(period)
+    return RollingMean(period)
+
+
+class StreamingEMA(StreamingIndicator):
+    """Exponential moving average (matches ewm(span, adjust=False))"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class StreamingMACD(StreamingIndicator):
+    """MACD line, signal line and histogram"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.ema_fast = StreamingEMA(fast)
+        self.ema_slow = StreamingEMA(slow)
+        self.ema_signal = StreamingEMA(signal)
+        self.macd = NAN
+        self.signal = NAN
+        self.histogram = NAN
+
+    def update(self, close: float) -> float:
+        self.macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        self.signal = self.ema_signal.update(self.macd)
+        self.histogram = self.macd - self.signal
+        return self.macd
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    Relative Strength Index
+
+    method='wilder' uses Wilder smoothing; method='sma' reproduces
+    MomentumAnalyzer.calculate_rsi (rolling means of gains/losses).
+    """
+
+    def __init__(self, period: int = 14, method: str = 'wilder'):
+        self.period = period
+        self.method = method
+        self.gain = _smoother(period, method)
+        self.loss = _smoother(period, method)
+        self.prev_close = NAN
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        delta = close - self.prev_close
+        if math.isnan(delta):
+            # First bar: pandas where() maps the NaN delta to zero
+            gain, loss = 0.0, 0.0
+        else:
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+
+        if self.method == 'wilder' and math.isnan(self.prev_close):
+            # Wilder's seed starts from the first real change
+            pass
+        else:
+            self.gain.update(gain)
+            self.loss.update(loss)
+        self.prev_close = close
+
+        avg_gain, avg_loss = self.gain.value, self.loss.value
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            self.value = NAN
+        elif avg_loss == 0:
+            self.value = 100.0 if avg_gain > 0 else NAN
+        else:
+            self.value = 100 - (100 / (1 + avg_gain / avg_loss))
+        return self.value
+
+
+class StreamingATR(StreamingIndicator):
+    """Average True Range (method='sma' matches TechnicalIndicators.calculate_atr)"""
+
+    def __init__(self, period: int = 14, method: str = 'sma'):
+        self.period = period
+        self.average = _smoother(period, method)
+        self.prev_close = NAN
+        self.true_range = NAN
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if math.isnan(self.prev_close):
+            self.true_range = high - low
+        else:
+            self.true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.value = self.average.update(self.true_range)
+        return self.value
+
+
+class StreamingADX(StreamingIndicator):
+    """+DI, -DI and ADX (method='sma' matches MomentumAnalyzer.calculate_adx)"""
+
+    def __init__(self, period: int = 14, method: str = 'sma'):
+        self.period = period
+        self.atr = StreamingATR(period, method)
+        self.plus_dm = _smoother(period, method)
+        self.minus_dm = _smoother(period, method)
+        self.dx = _smoother(period, method)
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.di_plus = NAN
+        self.di_minus = NAN
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+        self.prev_high = high
+        self.prev_low = low
+
+        atr = self.atr.update(high, low, close)
+        plus_avg = self.plus_dm.update(plus_dm)
+        minus_avg = self.minus_dm.update(minus_dm)
+
+        if math.isnan(atr) or atr == 0:
+            self.di_plus = self.di_minus = NAN
+        else:
+            self.di_plus = 100 * plus_avg / atr
+            self.di_minus = 100 * minus_avg / atr
+
+        di_sum = self.di_plus + self.di_minus
+        if math.isnan(di_sum) or di_sum == 0:
+            dx = NAN
+        else:
+            dx = 100 * abs(self.di_plus - self.di_minus) / di_sum
+        self.value = self.dx.update(dx)
+        return self.value
+
+
+class StreamingROC(StreamingIndicator):
+    """Rate of Change in percent"""
+
+    def __init__(self, period: int = 10):
+        self.period = period
+        self.history = deque(maxlen=period + 1)
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        self.history.append(close)
+        if len(self.history) <= self.period:
+            self.value = NAN
+        else:
+            past = self.history[0]
+            self.value = (close - past) / past * 100 if past != 0 else NAN
+        return self.value
+
+
+class StreamingOBV(StreamingIndicator):
+    """On-Balance Volume"""
+
+    def __init__(self):
+        self.prev_close = NAN
+        self.value = 0.0
+
+    def update(self, close: float, volume: float) -> float:
+        if close > self.prev_close:
+            self.value += volume
+        elif close < self.prev_close:
+            self.value -= volume
+        self.prev_close = close
+        return self.value
+
+
+class MomentumState(StreamingIndicator):
+    """
+    All indicators needed by MomentumAnalyzer for one symbol/timeframe
+
+    Bars are fed with ``on_bar()``. A bar with the same timestamp as the last
+    one is treated as a revision of the forming bar: the state is rolled back
+    to before that bar and the new values are applied.
+    """
+
+    def __init__(self, method: str = 'sma'):
+        """
+        Args:
+            method: RSI/ADX averaging, 'sma' (NumPy backend) or 'wilder' (TA-Lib)
+        """
+        self.ema_8 = StreamingEMA(8)
+        self.ema_21 = StreamingEMA(21)
+        self.macd = StreamingMACD(12, 26, 9)
+        self.rsi = StreamingRSI(14, method=method)
+        self.adx = StreamingADX(14, method=method)
+        self.roc = StreamingROC(10)
+        self.bars = 0
+        self.ema_8_prev = NAN
+        self.last_time = None
+        self._pre_bar = None
+
+    def on_bar(self, time, high: float, low: float, close: float):
+        """
+        Apply a new or revised bar
+
+        Args:
+            time: Bar timestamp
+            high, low, close: Bar prices
+        """
+        if self.last_time is not None and time == self.last_time:
+            # Forming bar revised - roll back before re-applying it
+            self.restore(self._pre_bar)
+        else:
+            self._pre_bar = self.snapshot()
+
+        self.ema_8_prev = self.ema_8.value
+        self.ema_8.update(close)
+        self.ema_21.update(close)
+        self.macd.update(close)
+        self.rsi.update(close)
+        self.adx.update(high, low, close)
+        self.roc.update(close)
+        self.bars += 1
+        self.last_time = time
+
+    def snapshot(self) -> Dict:
+        """Capture state (excluding the rollback point itself)"""
+        state = super().snapshot()
+        state.pop('_pre_bar', None)
+        return state
+
+    def values(self) -> Dict:
+        """
+        Current indicator values in the format used by MomentumAnalyzer
+
+        Returns:
+            Dictionary of latest values
+        """
+        return {
+            'bars': self.bars,
+            'ema_8': self.ema_8.value,
+            'ema_8_prev': self.ema_8_prev,
+            'ema_21': self.ema_21.value,
+            'macd_line': self.macd.macd,
+            'macd_signal': self.macd.signal,
+            'macd_hist': self.macd.histogram,
+            'rsi': self.rsi.value,
+            'adx': self.adx.value,
+            'di_plus': self.adx.di_plus,
+            'di_minus': self.adx.di_minus,
+            'roc': self.roc.value,
+        }
@@ -0,0 +1,107 @@
+"""
+Swing Points
+Fractal swing highs and lows with configurable left/right windows
+
+A bar is a swing low when it is below (or equal to, unless strict) every
+bar in the `left` bars before it and the `right` bars after it; swing
+highs mirror this. The last `right` bars can never be confirmed. Both
+sides are reduced over strided window views, so one call is a few
+vectorized passes over the series.
+"""
+
+import numpy as np
+import pandas as pd
+import logging
+from typing import Optional
+from indicators import kernels
+from indicators.feature_cache import feature_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _swing_mask(values, left: int, right: int, strict: bool, lows: bool) -> np.ndarray:
+    """Boolean mask of swing lows (lows=True) or swing highs"""
+    if left < 0 or right < 0:
+        raise ValueError("left and right must be non-negative")
+
+    x = kernels.as_float_array(values)
+    n = x.shape[0]
+    mask = np.zeros(n, dtype=bool)
+    if n < left + right + 1:
+        return mask
+
+    windows = np.lib.stride_tricks.sliding_window_view
+    reduce = np.min if lows else np.max
+    centre = x[left:n - right]
+
+    # NaN neighbours (or a NaN centre) fail every comparison, as in a bar-by-bar check
+    with np.errstate(invalid='ignore'):
+        swing = np.ones(centre.shape, dtype=bool)
+        for side, width in (('left', left), ('right', right)):
+            if width == 0:
+                continue
+            source = x[:n - right - 1] if side == 'left' else x[left + 1:]
+            extreme = reduce(windows(source, width), axis=-1)
+            if lows:
+                swing &= (centre < extreme) if strict else (centre <= extreme)
+            else:
+                swing &= (centre > extreme) if strict else (centre >= extreme)
+
+    mask[left:n - right] = swing
+    return mask
+
+
+def swing_lows(values, left: int = 1, right: int = 1, strict: bool = False) -> np.ndarray:
+    """
+    Swing lows of a series
+
+    Args:
+        values: Price series/array
+        left: Bars before the swing that must not be lower
+        right: Bars after the swing that must not be lower
+        strict: Require strictly lower than every neighbour
+
+    Returns:
+        Boolean array, True at swing lows
+    """
+    return _swing_mask(values, left, right, strict, lows=True)
+
+
+def swing_highs(values, left: int = 1, right: int = 1, strict: bool = False) -> np.ndarray:
+    """
+    Swing highs of a series
+
+    Args:
+        values: Price series/array
+        left: Bars before the swing that must not be higher
+        right: Bars after the swing that must not be higher
+        strict: Require strictly higher than every neighbour
+
+    Returns:
+        Boolean array, True at swing highs
+    """
+    return _swing_mask(values, left, right, strict, lows=False)
+
+
+def find_swings(df: pd.DataFrame, kind: str = 'low', column: Optional[str] = None,
+                left: int = 1, right: int = 1, strict: bool = False) -> np.ndarray:
+    """
+    Swing mask for a DataFrame column, shared through the feature cache
+
+    Args:
+        df: DataFrame with OHLCV data
+        kind: 'low' or 'high'
+        column: Column to use (default 'close')
+        left, right, strict: See swing_lows()/swing_highs()
+
+    Returns:
+        Boolean array, True at swing points (treat as read-only)
+    """
+    if kind not in ('low', 'high'):
+        raise ValueError("kind must be 'low' or 'high'")
+    column = column or 'close'
+
+    return feature_cache.get_or_compute(
+        df, f'swing_{kind}s', (column, left, right, strict),
+        lambda: _swing_mask(df[column].to_numpy(), left, right, strict, lows=(kind == 'low'))
+    )
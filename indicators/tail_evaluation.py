@@ -0,0 +1,154 @@
+"""
+Tail Evaluation
+Warm-up windows and truncation error bounds for indicators when only the
+latest values are needed
+
+Restarting an EMA m bars before the end seeds it with the close at that
+bar instead of the true EMA. The seed error shrinks by (1 - alpha) every
+bar. Its starting size is at most the close range, because every EMA of
+closes stays inside [min close, max close]. The SMA-based RSI, ADX/DI and
+ROC are exact once the tail covers their windows.
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict
+
+# Bars after which the SMA-based indicators are exact:
+# RSI(14) needs 15 closes, ADX(14) 2*14 bars, ROC(10) 11 closes
+EXACT_WINDOW_BARS = 28
+
+# Upper limit for the warm-up search
+MAX_TAIL_BARS = 100000
+
+# Floating-point allowance added to the truncation bound, because the two
+# evaluations round differently: relative to the price level for EMAs, and
+# per bar of history for the running-sum rolling means behind RSI/ADX
+ROUNDING_ALLOWANCE = 1e-12
+
+PRICE_OUTPUTS = ('ema_8', 'ema_21', 'macd_line', 'macd_signal', 'macd_hist')
+OSCILLATOR_OUTPUTS = ('rsi', 'adx', 'di_plus', 'di_minus')
+
+
+def ema_decay(span: int) -> float:
+    """Per-bar decay (1 - alpha) of ewm(span, adjust=False)"""
+    return 1.0 - 2.0 / (span + 1.0)
+
+
+def ema_warmup_bars(span: int, tolerance: float) -> int:
+    """
+    Bars of history needed for an EMA to converge within tolerance
+
+    Args:
+        span: EMA span
+        tolerance: Allowed error as a fraction of the initial seed error
+
+    Returns:
+        Smallest n with (1 - alpha)^n <= tolerance
+    """
+    return max(1, math.ceil(math.log(tolerance) / math.log(ema_decay(span))))
+
+
+def _momentum_factors(bars: int, smoothing: str) -> Dict[str, float]:
+    """
+    Worst-case error of each output after evaluating the last `bars` bars
+
+    Price outputs are fractions of the close range; oscillators are
+    fractions of their 0-100 scale.
+    """
+    last = bars - 1
+    b8, b12, b21, b26 = (ema_decay(s) for s in (8, 12, 21, 26))
+    b9 = ema_decay(9)
+    a9 = 1.0 - b9
+
+    # Signal EMA of the MACD line: the truncated line starts at 0 while the
+    # true signal lies within +/- range, then the line's own seed error feeds in
+    signal = 1.0
+    for t in range(1, bars):
+        signal = b9 * signal + a9 * (b12 ** t + b26 ** t)
+
+    line = b12 ** last + b26 ** last
+    factors = {
+        'ema_8': b8 ** last,
+        'ema_8_prev': b8 ** max(last - 1, 0),
+        'ema_21': b21 ** last,
+        'macd_line': line,
+        'macd_signal': signal,
+        'macd_hist': line + signal,
+    }
+
+    if smoothing == 'wilder':
+        # Wilder averages (alpha = 1/14) after their 14-bar seed; ADX smooths
+        # the already-smoothed DI, so its impulse response is t * w^t
+        w = 13.0 / 14.0
+        single = max(bars - 15, 0)
+        double = max(bars - EXACT_WINDOW_BARS, 0)
+        factors['rsi'] = w ** single
+        factors['di_plus'] = factors['di_minus'] = w ** single
+        factors['adx'] = max(1, double) * w ** double
+    else:
+        for name in OSCILLATOR_OUTPUTS:
+            factors[name] = 0.0 if bars >= EXACT_WINDOW_BARS else 1.0
+
+    return factors
+
+
+@lru_cache(maxsize=32)
+def momentum_tail_plan(tolerance: float, smoothing: str = 'sma') -> Dict:
+    """
+    Smallest tail that keeps every MomentumAnalyzer output within tolerance
+
+    Args:
+        tolerance: Allowed error as a fraction of the close range (EMA/MACD)
+                   or of the 0-100 oscillator scale (RSI/ADX with Wilder smoothing)
+        smoothing: Backend smoothing, 'sma' or 'wilder'
+
+    Returns:
+        Dictionary with 'bars' and per-output 'factors'
+    """
+    if not 0 < tolerance < 1:
+        raise ValueError("tolerance must be between 0 and 1")
+
+    # Start from the slowest single EMA and grow until the cascades fit too
+    bars = max(EXACT_WINDOW_BARS, ema_warmup_bars(26, tolerance) + 1)
+    while bars < MAX_TAIL_BARS:
+        factors = _momentum_factors(bars, smoothing)
+        if max(factors.values()) <= tolerance:
+            break
+        bars = int(bars * 1.05) + 1
+
+    # Tighten to the smallest bar count that still meets the tolerance
+    low = max(EXACT_WINDOW_BARS, ema_warmup_bars(26, tolerance) + 1)
+    while low < bars:
+        mid = (low + bars) // 2
+        if max(_momentum_factors(mid, smoothing).values()) <= tolerance:
+            bars = mid
+        else:
+            low = mid + 1
+
+    return {'bars': bars, 'factors': _momentum_factors(bars, smoothing)}
+
+
+def error_bounds(plan: Dict, close_min: float, close_max: float, available_bars: int) -> Dict[str, float]:
+    """
+    Absolute error bound for each output of a tail evaluation
+
+    Args:
+        plan: Result of momentum_tail_plan()
+        close_min, close_max: Close range over the full history
+        available_bars: Bars in the full history (a tail covering all of it is exact)
+
+    Returns:
+        Dictionary {output: max absolute deviation from the full-series value}
+    """
+    exact = available_bars <= plan['bars']
+    price_range = close_max - close_min
+    rounding = ROUNDING_ALLOWANCE * max(abs(close_min), abs(close_max))
+
+    bounds = {}
+    for name in PRICE_OUTPUTS:
+        bounds[name] = 0.0 if exact else plan['factors'][name] * price_range + rounding
+    for name in OSCILLATOR_OUTPUTS:
+        rounding = ROUNDING_ALLOWANCE * 100.0 * available_bars
+        bounds[name] = 0.0 if exact else plan['factors'][name] * 100.0 + rounding
+    return bounds
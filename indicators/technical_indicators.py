@@ -6,6 +6,9 @@ Additional technical indicators not covered in other modules
 import pandas as pd
 import numpy as np
 import logging
+from indicators import kernels
+from indicators.feature_cache import feature_cache
+from indicators.indicator_backend import get_backend
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +16,45 @@ logger = logging.getLogger(__name__)
 class TechnicalIndicators:
     """Calculate various technical indicators"""
     
+    @staticmethod
+    def calculate_true_range(df: pd.DataFrame) -> pd.Series:
+        """
+        Calculate True Range (shared by ATR and ADX)
+        
+        Args:
+            df: DataFrame with high, low, close columns
+            
+        Returns:
+            Series with True Range values
+        """
+        def compute():
+            tr = kernels.true_range(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy())
+            return pd.Series(tr, index=df.index)
+        
+        return feature_cache.get_or_compute(df, 'true_range', (), compute)
+    
+    @staticmethod
+    def calculate_atr_series(df: pd.DataFrame, period: int = 14) -> pd.Series:
+        """
+        Calculate Average True Range series
+        
+        Args:
+            df: DataFrame with high, low, close columns
+            period: ATR period (default 14)
+            
+        Returns:
+            Series with ATR values
+        """
+        def compute():
+            tr = TechnicalIndicators.calculate_true_range(df)
+            # ATR = moving average of TR
+            atr = get_backend().atr(
+                df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), period, tr=tr.to_numpy()
+            )
+            return pd.Series(atr, index=df.index)
+        
+        return feature_cache.get_or_compute(df, 'atr', (period, get_backend().name), compute)
+    
     @staticmethod
     def calculate_atr(df: pd.DataFrame, period: int = 14) -> float:
         """
@@ -26,20 +68,7 @@ class TechnicalIndicators:
             Current ATR value
         """
         try:
-            high = df['high']
-            low = df['low']
-            close = df['close']
-            
-            # True Range components
-            tr1 = high - low
-            tr2 = abs(high - close.shift())
-            tr3 = abs(low - close.shift())
-            
-            # True Range = max of three components
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            
-            # ATR = moving average of TR
-            atr = tr.rolling(window=period).mean()
+            atr = TechnicalIndicators.calculate_atr_series(df, period)
             
             return atr.iloc[-1] if len(atr) > 0 else 0.0
             
@@ -47,15 +76,25 @@ class TechnicalIndicators:
             logger.error(f"Error calculating ATR: {e}")
             return 0.0
     
+    @staticmethod
+    def atr_required_bars(period: int = 14):
+        """
+        Bars of history for an exact latest ATR
+        
+        Returns:
+            period + 1 with SMA smoothing, None (all available) with Wilder smoothing
+        """
+        return period + 1 if get_backend().smoothing == 'sma' else None
+    
     @staticmethod
     def calculate_sma(series: pd.Series, period: int) -> pd.Series:
         """Calculate Simple Moving Average"""
-        return series.rolling(window=period).mean()
+        return pd.Series(kernels.rolling_mean(series.to_numpy(), period), index=series.index)
     
     @staticmethod
     def calculate_ema(series: pd.Series, period: int) -> pd.Series:
         """Calculate Exponential Moving Average"""
-        return series.ewm(span=period, adjust=False).mean()
+        return pd.Series(kernels.ema(series.to_numpy(), period), index=series.index)
     
     @staticmethod
     def calculate_bollinger_bands(close: pd.Series, period: int = 20, std: float = 2.0) -> tuple:
@@ -65,11 +104,12 @@ class TechnicalIndicators:
         Returns:
             Tuple of (upper_band, middle_band, lower_band)
         """
-        middle = close.rolling(window=period).mean()
-        std_dev = close.rolling(window=period).std()
-        upper = middle + (std_dev * std)
-        lower = middle - (std_dev * std)
-        return upper, middle, lower
+        upper, middle, lower = get_backend().bollinger(close.to_numpy(), period, std)
+        return (
+            pd.Series(upper, index=close.index),
+            pd.Series(middle, index=close.index),
+            pd.Series(lower, index=close.index)
+        )
     
     @staticmethod
     def calculate_stochastic(df: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> tuple:
@@ -79,19 +119,113 @@ class TechnicalIndicators:
         Returns:
             Tuple of (%K, %D)
         """
-        high = df['high']
-        low = df['low']
-        close = df['close']
-        
         # %K = (Close - Lowest Low) / (Highest High - Lowest Low) * 100
-        lowest_low = low.rolling(window=k_period).min()
-        highest_high = high.rolling(window=k_period).max()
-        
-        k = 100 * (close - lowest_low) / (highest_high - lowest_low)
-        d = k.rolling(window=d_period).mean()
+        k, d = get_backend().stochastic(
+            df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), k_period, d_period
+        )
         
+        return pd.Series(k, index=df.index), pd.Series(d, index=df.index)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PARAMETER GRIDS (for tuning: one call per grid instead of per parameter set)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def calculate_atr_grid(df: pd.DataFrame, periods) -> np.ndarray:
+        """
+        Calculate ATR for many periods at once
+
+        Args:
+            df: DataFrame with high, low, close columns
+            periods: ATR periods [p]
+
+        Returns:
+            Array [p, n] - row i is calculate_atr_series(df, periods[i])
+        """
+        periods = np.atleast_1d(np.asarray(periods, dtype=np.int64))
+        backend = get_backend()
+        tr = TechnicalIndicators.calculate_true_range(df).to_numpy()
+
+        if backend.name != 'NUMPY':
+            high, low, close = (df[c].to_numpy() for c in ('high', 'low', 'close'))
+            return np.stack([backend.atr(high, low, close, int(p), tr=tr) for p in periods])
+
+        # One cumulative sum of True Range serves every period
+        return kernels.rolling_mean_grid(tr, periods)
+
+    @staticmethod
+    def calculate_bollinger_grid(close: pd.Series, periods, stds) -> tuple:
+        """
+        Calculate Bollinger Bands for every (period, std) combination
+
+        Args:
+            close: Close prices
+            periods: Periods [p]
+            stds: Standard deviation multipliers [s]
+
+        Returns:
+            Tuple of (upper [p, s, n], middle [p, n], lower [p, s, n])
+        """
+        periods = np.atleast_1d(np.asarray(periods, dtype=np.int64))
+        stds = np.atleast_1d(np.asarray(stds, dtype=np.float64))
+        backend = get_backend()
+        values = close.to_numpy()
+
+        if backend.name != 'NUMPY':
+            middle, width = [], []
+            for period in periods:
+                # Bands are linear in std, so one call per period recovers the width
+                upper, mid, _ = backend.bollinger(values, int(period), 1.0)
+                middle.append(mid)
+                width.append(upper - mid)
+            middle, width = np.stack(middle), np.stack(width)
+        else:
+            # Shared cumulative sums of close and close^2 serve every period
+            middle = kernels.rolling_mean_grid(values, periods)
+            width = kernels.rolling_std_grid(values, periods)
+
+        offset = width[:, None, :] * stds[None, :, None]
+        upper = middle[:, None, :] + offset
+        lower = middle[:, None, :] - offset
+        return upper, middle, lower
+
+    @staticmethod
+    def calculate_stochastic_grid(df: pd.DataFrame, k_periods, d_periods) -> tuple:
+        """
+        Calculate Stochastic for every (k_period, d_period) combination
+
+        Args:
+            df: DataFrame with high, low, close columns
+            k_periods: %K periods [k]
+            d_periods: %D periods [d]
+
+        Returns:
+            Tuple of (%K [k, n], %D [k, d, n])
+        """
+        k_periods = np.atleast_1d(np.asarray(k_periods, dtype=np.int64))
+        d_periods = np.atleast_1d(np.asarray(d_periods, dtype=np.int64))
+        backend = get_backend()
+        high, low, close = (df[c].to_numpy() for c in ('high', 'low', 'close'))
+
+        if backend.name != 'NUMPY':
+            k_rows, d_rows = [], []
+            for k_period in k_periods:
+                rows = [backend.stochastic(high, low, close, int(k_period), int(d)) for d in d_periods]
+                k_rows.append(rows[0][0])
+                d_rows.append(np.stack([d for _, d in rows]))
+            return np.stack(k_rows), np.stack(d_rows)
+
+        # One sparse table per side gives the highest high/lowest low of every period
+        lowest_low = kernels.rolling_min_grid(low, k_periods)
+        highest_high = kernels.rolling_max_grid(high, k_periods)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = (kernels.as_float_array(close)[None, :] - lowest_low) / (highest_high - lowest_low) * 100.0
+
+        # Each %K row shares one cumulative sum across the %D periods
+        d = np.stack([kernels.rolling_mean_grid(row, d_periods) for row in k])
         return k, d
-    
+
     @staticmethod
     def calculate_momentum(close: pd.Series, period: int = 10) -> pd.Series:
         """Calculate Momentum indicator"""
@@ -0,0 +1,102 @@
+"""
+Timeframe Alignment
+Maps higher-timeframe bars onto a lower timeframe without lookahead
+"""
+
+import numpy as np
+import pandas as pd
+
+# Bar length of each timeframe
+TIMEFRAME_DURATIONS = {
+    'M15': pd.Timedelta(minutes=15),
+    'H1': pd.Timedelta(hours=1),
+    'H4': pd.Timedelta(hours=4),
+    'D1': pd.Timedelta(days=1),
+    'W1': pd.Timedelta(weeks=1),
+}
+
+
+def bar_duration(timeframe: str) -> pd.Timedelta:
+    """Length of one bar ("M15", "H1", "H4", "D1", "W1")"""
+    if timeframe not in TIMEFRAME_DURATIONS:
+        raise ValueError(f"Unknown timeframe: {timeframe}")
+    return TIMEFRAME_DURATIONS[timeframe]
+
+
+def utc_times(times) -> np.ndarray:
+    """
+    Bar times as UTC-naive datetime64[ns]
+
+    MT5 bars are naive while the Yahoo fallback returns tz-aware times;
+    converting both to naive UTC keeps comparisons between them valid.
+
+    Args:
+        times: Bar times (Series, Index, array or list)
+
+    Returns:
+        datetime64[ns] array
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(times))
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.to_numpy(dtype='datetime64[ns]')
+
+
+def completed_bar_index(base_times, base_timeframe: str, other_times, other_timeframe: str) -> np.ndarray:
+    """
+    Last bar of another timeframe that had closed when each base bar closed
+
+    Bar times are open times, so a D1 bar stamped 2024-01-02 00:00 is only
+    known from 2024-01-03 00:00 on. A still-forming higher-timeframe bar is
+    never used, which keeps historical series free of lookahead.
+
+    Args:
+        base_times: Open times of the base bars (e.g. H1)
+        base_timeframe: Base timeframe
+        other_times: Open times of the other timeframe (sorted)
+        other_timeframe: Other timeframe (e.g. D1)
+
+    Returns:
+        int64 array with one index into other_times per base bar (-1 = none yet)
+    """
+    base_close = np.asarray(pd.to_datetime(base_times), dtype='datetime64[ns]') + \
+        np.timedelta64(bar_duration(base_timeframe))
+    other_close = np.asarray(pd.to_datetime(other_times), dtype='datetime64[ns]') + \
+        np.timedelta64(bar_duration(other_timeframe))
+    return np.searchsorted(other_close, base_close, side='right').astype(np.int64) - 1
+
+
+def align_values(values, index: np.ndarray, fill=np.nan) -> np.ndarray:
+    """
+    Take values at aligned indices (fill where no bar had closed yet)
+
+    Args:
+        values: Per-bar values of the other timeframe
+        index: Result of completed_bar_index()
+        fill: Value for index -1
+
+    Returns:
+        Array with one value per base bar
+    """
+    values = np.asarray(values)
+    if len(values) == 0:
+        return np.full(len(index), fill, dtype=np.result_type(values.dtype, np.asarray(fill).dtype))
+    taken = values[np.maximum(index, 0)]
+    return np.where(index >= 0, taken, fill)
+
+
+def closed_bar_count(times, timeframe: str, now=None) -> int:
+    """
+    Number of leading bars whose period had ended by now
+
+    Args:
+        times: Open times of the bars (sorted)
+        timeframe: Timeframe of the bars
+        now: Reference time (default: current UTC time)
+
+    Returns:
+        Count of closed bars; the rest (normally the last bar) is still forming
+    """
+    now = pd.Timestamp.now(tz='UTC').tz_localize(None) if now is None else pd.Timestamp(now)
+    close = np.asarray(pd.to_datetime(times), dtype='datetime64[ns]') + np.timedelta64(bar_duration(timeframe))
+    return int(np.searchsorted(close, np.datetime64(now, 'ns'), side='right'))
@@ -6,6 +6,9 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, Tuple
+from indicators import kernels
+from indicators.feature_cache import feature_cache
+from indicators.swing_points import find_swings
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +25,15 @@ class VolumeAnalyzer:
         """
         self.volume_spike_threshold = volume_spike_threshold
     
+    def required_bars(self, lookback: int = 10) -> int:
+        """
+        Bars of history needed by analyze_volume_pattern and detect_obv_divergence
+        
+        Args:
+            lookback: Volume pattern lookback
+        """
+        return max(lookback + 20, 50)
+    
     def calculate_obv(self, df: pd.DataFrame) -> pd.Series:
         """
         Calculate On-Balance Volume (OBV)
@@ -32,15 +44,11 @@ class VolumeAnalyzer:
         Returns:
             Series with OBV values
         """
-        close = df['close']
-        volume = df['volume']
-        
-        # Calculate price direction
-        direction = np.where(close > close.shift(1), 1, np.where(close < close.shift(1), -1, 0))
-        
-        # Calculate OBV
-        obv = (direction * volume).cumsum()
-        
+        return feature_cache.get_or_compute(df, 'obv', (), lambda: self._calculate_obv(df))
+    
+    def _calculate_obv(self, df: pd.DataFrame) -> pd.Series:
+        """Compute OBV without the cache"""
+        obv = kernels.obv(df['close'].to_numpy(), df['volume'].to_numpy())
         return pd.Series(obv, index=df.index)
     
     def analyze_volume_pattern(self, df: pd.DataFrame, lookback: int = 10) -> Dict:
@@ -160,30 +168,22 @@ class VolumeAnalyzer:
             if len(df) < 50:
                 return self._empty_divergence()
             
-            close = df['close']
-            obv = self.calculate_obv(df)
+            close = df['close'].to_numpy()
+            obv = self.calculate_obv(df).to_numpy()
+            
+            # Swing points in the last 20 bars (the final bar is unconfirmed)
+            recent = slice(max(len(df) - 20, 0), len(df))
             
             # Find price lows/highs near reference level
             if setup_type == 1:  # Long setup - look for bullish divergence
-                # Find recent lows
-                lows = []
-                obv_at_lows = []
-                
-                for i in range(len(df) - 20, len(df)):
-                    if i >= 1 and i < len(df) - 1:
-                        c = close.iloc[i]
-                        if c < reference_level * 1.01:  # Near 0/8
-                            # Check if local low
-                            if close.iloc[i] <= close.iloc[i-1] and close.iloc[i] <= close.iloc[i+1]:
-                                lows.append(c)
-                                obv_at_lows.append(obv.iloc[i])
+                # Find recent lows near 0/8
+                near_level = close[recent] < reference_level * 1.01
+                lows = np.flatnonzero(find_swings(df, 'low')[recent] & near_level) + recent.start
                 
                 # Check for bullish divergence
                 if len(lows) >= 2:
-                    price_low_1 = lows[-2]
-                    price_low_2 = lows[-1]
-                    obv_low_1 = obv_at_lows[-2]
-                    obv_low_2 = obv_at_lows[-1]
+                    price_low_1, price_low_2 = close[lows[-2]], close[lows[-1]]
+                    obv_low_1, obv_low_2 = obv[lows[-2]], obv[lows[-1]]
                     
                     # Bullish divergence: Price makes lower low, OBV makes higher low
                     if price_low_2 <= price_low_1 and obv_low_2 > obv_low_1:
@@ -202,25 +202,14 @@ class VolumeAnalyzer:
                         }
             
             elif setup_type == -1:  # Short setup - look for bearish divergence
-                # Find recent highs
-                highs = []
-                obv_at_highs = []
-                
-                for i in range(len(df) - 20, len(df)):
-                    if i >= 1 and i < len(df) - 1:
-                        c = close.iloc[i]
-                        if c > reference_level * 0.99:  # Near 8/8
-                            # Check if local high
-                            if close.iloc[i] >= close.iloc[i-1] and close.iloc[i] >= close.iloc[i+1]:
-                                highs.append(c)
-                                obv_at_highs.append(obv.iloc[i])
+                # Find recent highs near 8/8
+                near_level = close[recent] > reference_level * 0.99
+                highs = np.flatnonzero(find_swings(df, 'high')[recent] & near_level) + recent.start
                 
                 # Check for bearish divergence
                 if len(highs) >= 2:
-                    price_high_1 = highs[-2]
-                    price_high_2 = highs[-1]
-                    obv_high_1 = obv_at_highs[-2]
-                    obv_high_2 = obv_at_highs[-1]
+                    price_high_1, price_high_2 = close[highs[-2]], close[highs[-1]]
+                    obv_high_1, obv_high_2 = obv[highs[-2]], obv[highs[-1]]
                     
                     # Bearish divergence: Price makes higher high, OBV makes lower high
                     if price_high_2 >= price_high_1 and obv_high_2 < obv_high_1:
@@ -239,7 +228,7 @@ class VolumeAnalyzer:
                         }
             
             # No clear divergence - use OBV slope
-            obv_slope = obv.iloc[-1] - obv.iloc[-10]
+            obv_slope = obv[-1] - obv[-10]
             
             if setup_type == 1 and obv_slope > 0:
                 return {
@@ -275,3 +264,135 @@ class VolumeAnalyzer:
             'type': 'unknown',
             'description': 'Insufficient data'
         }
+
+    
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PER-BAR SERIES (history and backtests)
+    # ═══════════════════════════════════════════════════════════════════════════
+    
+    def volume_pattern_series(self, df: pd.DataFrame, lookback: int = 10) -> pd.DataFrame:
+        """
+        analyze_volume_pattern() as of every bar, from rolling sums
+        
+        Args:
+            df: DataFrame with OHLCV data
+            lookback: Number of bars to analyze
+            
+        Returns:
+            DataFrame with 'score' and 'volume_spike_detected' (score 50 and
+            no spike before lookback + 20 bars, like the empty analysis)
+        """
+        close = df['close'].to_numpy(dtype=float)
+        open_price = df['open'].to_numpy(dtype=float)
+        volume = df['volume'].to_numpy(dtype=float)
+        
+        up = close > open_price
+        down = close < open_price
+        up_count = kernels.rolling_sum(up.astype(float), lookback)
+        down_count = kernels.rolling_sum(down.astype(float), lookback)
+        up_vol_sum = kernels.rolling_sum(np.where(up, volume, 0.0), lookback)
+        down_vol_sum = kernels.rolling_sum(np.where(down, volume, 0.0), lookback)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_up_vol = np.where(up_count > 0, up_vol_sum / up_count, 0.0)
+            avg_down_vol = np.where(down_count > 0, down_vol_sum / down_count, 0.0)
+        
+        vol_avg = kernels.rolling_mean(volume, 20)
+        volume_spike = kernels.rolling_max(volume, lookback) > vol_avg * self.volume_spike_threshold
+        
+        # Second half of the window against the first half
+        half = lookback // 2
+        vol_second_half = kernels.rolling_mean(volume, lookback - half)
+        vol_first_half = np.full(len(df), np.nan)
+        vol_first_half[lookback - half:] = kernels.rolling_mean(volume, half)[:len(df) - (lookback - half)]
+        volume_declining = vol_second_half < vol_first_half
+        
+        dominant = (avg_up_vol > avg_down_vol * 1.2) | (avg_down_vol > avg_up_vol * 1.2)
+        score = 30.0 * dominant + 30.0 * volume_declining + 40.0 * volume_spike
+        
+        warmup = min(lookback + 19, len(df))
+        score[:warmup] = 50.0
+        volume_spike[:warmup] = False
+        
+        return pd.DataFrame({'score': score, 'volume_spike_detected': volume_spike}, index=df.index)
+    
+    def obv_divergence_series(self, df: pd.DataFrame, setup_type, reference_level) -> pd.DataFrame:
+        """
+        detect_obv_divergence() as of every bar
+        
+        Swing points need the next bar, so bar t only uses swings up to
+        t - 1, exactly what a live check at bar t can see.
+        
+        Args:
+            df: DataFrame with OHLCV data
+            setup_type: Per-bar setup (1 long, -1 short, 0 none)
+            reference_level: Per-bar 0/8 or 8/8 level
+            
+        Returns:
+            DataFrame with 'divergence' (1, 0, -1) and 'score'
+        """
+        n = len(df)
+        setup_type = np.broadcast_to(np.asarray(setup_type), (n,))
+        reference_level = np.broadcast_to(np.asarray(reference_level, dtype=float), (n,))
+        divergence = np.zeros(n, dtype=np.int8)
+        score = np.full(n, 50.0)
+        if n < 50:
+            return pd.DataFrame({'divergence': divergence, 'score': score}, index=df.index)
+        
+        close = df['close'].to_numpy(dtype=float)
+        obv = self.calculate_obv(df).to_numpy(dtype=float)
+        
+        # Candidate swing bars t-19 .. t-1 for every bar t >= 19
+        span = 19
+        windows = np.lib.stride_tricks.sliding_window_view
+        bars = np.arange(span, n)
+        closes = windows(close[:-1], span)            # row r: bars r .. r + 18, i.e. t = r + 19
+        obvs = windows(obv[:-1], span)
+        
+        for direction, kind in ((1, 'low'), (-1, 'high')):
+            rows = np.flatnonzero(setup_type[bars] == direction)
+            if len(rows) == 0:
+                continue
+            t = bars[rows]
+            swing = windows(find_swings(df, kind)[:-1], span)[rows]
+            
+            with np.errstate(invalid='ignore'):
+                if direction == 1:
+                    near_level = closes[rows] < (reference_level[t] * 1.01)[:, None]
+                else:
+                    near_level = closes[rows] > (reference_level[t] * 0.99)[:, None]
+            candidates = swing & near_level
+            
+            # Last and second-to-last candidate in each window
+            count = candidates.sum(axis=1)
+            last = span - 1 - np.argmax(candidates[:, ::-1], axis=1)
+            before = candidates.copy()
+            before[np.arange(len(rows)), last] = False
+            second = span - 1 - np.argmax(before[:, ::-1], axis=1)
+            
+            pick = np.arange(len(rows))
+            price_1, price_2 = closes[rows][pick, second], closes[rows][pick, last]
+            obv_1, obv_2 = obvs[rows][pick, second], obvs[rows][pick, last]
+            
+            if direction == 1:
+                extended = price_2 <= price_1   # Lower (or equal) low
+                confirmed = obv_2 > obv_1       # OBV higher low -> bullish divergence
+            else:
+                extended = price_2 >= price_1   # Higher (or equal) high
+                confirmed = obv_2 < obv_1       # OBV lower high -> bearish divergence
+            
+            pattern = (count >= 2) & extended
+            with_setup = pattern & confirmed
+            against_setup = pattern & ~confirmed
+            
+            # No clear divergence - use OBV slope
+            slope = obv[t] - obv[t - 9]
+            rising = slope > 0 if direction == 1 else slope < 0
+            
+            divergence[t] = np.where(with_setup, direction, np.where(against_setup, -direction, 0))
+            score[t] = np.where(with_setup, 100.0, np.where(against_setup, 0.0, np.where(rising, 75.0, 50.0)))
+        
+        # detect_obv_divergence() needs 50 bars
+        divergence[:49] = 0
+        score[:49] = 50.0
+        return pd.DataFrame({'divergence': divergence, 'score': score}, index=df.index)
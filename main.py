@@ -30,6 +30,8 @@ from alerts.email_notifier import EmailNotifier
 from alerts.telegram_notifier import TelegramNotifier
 from alerts.desktop_notifier import DesktopNotifier
 from alerts.sound_player import SoundPlayer
+from engine.stage_timer import stage_timer
+from engine.entry_timer import EntryTimer
 
 
 # Setup logging
@@ -102,6 +104,7 @@ class MarketScanner:
         self.logger.info("Initializing components...")
         
         self.scanner = Scanner(config_dict)
+        self.entry_timer = EntryTimer(config_dict)
         self.alert_manager = AlertManager(config_dict)
         self.html_generator = HTMLGenerator(config_dict)
         
@@ -126,12 +129,14 @@ class MarketScanner:
             
             # Step 1: Scan all pairs
             scan_results = self.scanner.scan_all_pairs()
+            stage_timer.end_cycle()
             
             if not scan_results:
                 self.logger.warning("No valid scan results")
                 return
             
             self.logger.info(f"✅ Scanned {len(scan_results)} pairs")
+            self._apply_eta(scan_results)
             
             # Step 2: Check for alerts
             alerts = self.alert_manager.check_alerts(scan_results)
@@ -168,6 +173,18 @@ class MarketScanner:
         except Exception as e:
             self.logger.error(f"Error in scan cycle: {e}", exc_info=True)
     
+    def _apply_eta(self, scan_results: list):
+        """Set each result's timing from the calibrated ETA tables (per pair type)"""
+        for result in scan_results:
+            probability = result['probability']
+            if probability.get('setup_type', 0) == 0:
+                continue
+            result['timing'] = self.entry_timer.estimate_time_to_entry(
+                probability['probability'],
+                probability.get('time_at_level', 0),
+                pair_classification=result.get('classification'),
+            )
+    
     def _send_alerts(self, alerts: dict, alert_messages: dict):
         """Send alerts through all configured channels"""
         
@@ -353,6 +370,12 @@ def main():
         # Risk Management
         'ACCOUNT_SIZE': ACCOUNT_SIZE,
         'RISK_PER_TRADE': RISK_PER_TRADE,
+        'CONTRACT_SPECS_PATH': CONTRACT_SPECS_PATH,
+        'CONTRACT_SPECS_REFRESH_DAYS': CONTRACT_SPECS_REFRESH_DAYS,
+        'PORTFOLIO_CORRELATION_TIMEFRAME': PORTFOLIO_CORRELATION_TIMEFRAME,
+        'PORTFOLIO_CORRELATION_WINDOW': PORTFOLIO_CORRELATION_WINDOW,
+        'PORTFOLIO_CORRELATION_THRESHOLD': PORTFOLIO_CORRELATION_THRESHOLD,
+        'PORTFOLIO_MAX_CLUSTER_RISK_R': PORTFOLIO_MAX_CLUSTER_RISK_R,
         'ATR_MULTIPLIERS': ATR_MULTIPLIERS,
         'MOVE_TO_BE_AT_R': MOVE_TO_BE_AT_R,
         'START_TRAIL_AT_R': START_TRAIL_AT_R,
@@ -367,6 +390,7 @@ def main():
         # Classification
         'CLASSIFICATION_METHOD': CLASSIFICATION_METHOD,
         'AUTO_CLASSIFICATION_THRESHOLDS': AUTO_CLASSIFICATION_THRESHOLDS,
+        'CLASSIFICATION_CACHE_PATH': CLASSIFICATION_CACHE_PATH,
         
         # Alerts
         'EMAIL_ENABLED': EMAIL_ENABLED,
@@ -387,8 +411,31 @@ def main():
         'MURREY_FRAME': MURREY_FRAME,
         'MURREY_MULTIPLIER': MURREY_MULTIPLIER,
         'MURREY_IGNORE_WICKS': MURREY_IGNORE_WICKS,
+        'ZONE_WIDTH_MULTIPLIER': ZONE_WIDTH_MULTIPLIER,
+        'PREFILTER_ENABLED': PREFILTER_ENABLED,
+        'PREFILTER_ZONE_MARGIN': PREFILTER_ZONE_MARGIN,
         'VOLUME_SPIKE_THRESHOLD': VOLUME_SPIKE_THRESHOLD,
         'SPRING_MAX_BARS': 3,
+        'FEATURE_CACHE_ENABLED': FEATURE_CACHE_ENABLED,
+        'FEATURE_CACHE_MAX_ENTRIES': FEATURE_CACHE_MAX_ENTRIES,
+        'FEATURE_CACHE_MAX_MB': FEATURE_CACHE_MAX_MB,
+        'STAGE_TIMING_ENABLED': STAGE_TIMING_ENABLED,
+        'STAGE_METRICS_PATH': STAGE_METRICS_PATH,
+        'STREAMING_INDICATORS_ENABLED': STREAMING_INDICATORS_ENABLED,
+        'INDICATOR_BACKEND': INDICATOR_BACKEND,
+        'MOMENTUM_TAIL_TOLERANCE': MOMENTUM_TAIL_TOLERANCE,
+        'COMPUTE_DTYPE': COMPUTE_DTYPE,
+        'BAR_STORE_PATH': BAR_STORE_PATH,
+        'BACKTEST_EXIT_TARGET': BACKTEST_EXIT_TARGET,
+        'ETA_CALIBRATION_PATH': ETA_CALIBRATION_PATH,
+        'ETA_MIN_SAMPLES': ETA_MIN_SAMPLES,
+        'TARGET_HIT_TABLES_PATH': TARGET_HIT_TABLES_PATH,
+        'TARGET_HIT_REFRESH_DAYS': TARGET_HIT_REFRESH_DAYS,
+        'TARGET_HIT_MIN_SAMPLES': TARGET_HIT_MIN_SAMPLES,
+        'TARGET_HIT_HORIZON_DAYS': TARGET_HIT_HORIZON_DAYS,
+        'MONTE_CARLO_PATHS': MONTE_CARLO_PATHS,
+        'MONTE_CARLO_TRADES': MONTE_CARLO_TRADES,
+        'MONTE_CARLO_RUIN_PCT': MONTE_CARLO_RUIN_PCT,
         
         # Logging
         'LOG_LEVEL': LOG_LEVEL,
@@ -0,0 +1,472 @@
+"""
+Research Tools
+Offline jobs that run on recorded bars (see data/bar_store.py)
+
+Usage:
+    python research.py record                       # save bars for ALL_PAIRS
+    python research.py validate-float32             # float32 vs float64 scores
+    python research.py validate-float32 --points 200 --tolerance 0.25
+    python research.py backtest                     # BIG BANG entries, R statistics
+    python research.py backtest --trades trades.csv
+    python research.py optimize --samples 10000      # ranked parameter sweep
+    python research.py calibrate-eta                # ETA tables for EntryTimer
+    python research.py calibrate-targets --if-due   # target hit rates (weekly)
+    python research.py monte-carlo --trades trades.csv --risk 0.5 1 2
+"""
+
+import sys
+import logging
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from data.bar_store import BarStore
+from indicators.feature_cache import FeatureCache
+from engine.probability_engine import ProbabilityEngine
+from engine.entry_timer import EntryTimer
+from engine.backtester import Backtester
+from engine.optimizer import Optimizer
+from engine.eta_calibration import EtaCalibration, EtaTables
+from engine.target_calibration import TargetCalibration, TargetHitTables
+from engine.monte_carlo import MonteCarlo
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAMES = ["W1", "D1", "H4", "H1", "M15"]
+
+
+def load_config() -> dict:
+    """Settings from config/config.py as a config dictionary"""
+    import config.config as settings
+    return {name: getattr(settings, name) for name in dir(settings) if name.isupper()}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RECORD
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_record(args, config: dict) -> int:
+    """Fetch every configured pair and save it to the bar store"""
+    from data.data_fetcher import DataFetcher
+
+    store = BarStore(args.data or config.get('BAR_STORE_PATH', 'data/bars'))
+    fetcher = DataFetcher(dict(config, COMPUTE_DTYPE='float64'))
+    bars = args.bars or config.get('LOOKBACK_BARS', 1000)
+
+    try:
+        for symbol in config.get('ALL_PAIRS', []):
+            data = fetcher.get_multi_timeframe_data(symbol, TIMEFRAMES, bars=bars)
+            for tf, df in data.items():
+                store.save(df, symbol, tf)
+            print(f"   {symbol:<10} {', '.join(f'{tf}:{len(df)}' for tf, df in data.items())}")
+    finally:
+        fetcher.disconnect()
+
+    print(f"\n✅ Bars recorded to {store.root}")
+    return 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FLOAT32 VALIDATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _slice_until(data: dict, cutoff) -> dict:
+    """Bars up to and including cutoff on every timeframe, re-stamped"""
+    result = {}
+    for tf, df in data.items():
+        part = df[df['time'] <= cutoff]
+        if len(part) > 0:
+            result[tf] = FeatureCache.stamp(part.reset_index(drop=True), df.attrs['symbol'], tf)
+    return result
+
+
+def _score(engine: ProbabilityEngine, timer: EntryTimer, symbol: str, data: dict,
+           classification: str) -> tuple:
+    """Probability, setup type and status category for one evaluation"""
+    htf = {tf: df for tf, df in data.items() if tf != 'M15'}
+    momentum = engine.momentum_analyzer.analyze_multi_timeframe(htf)
+    result = engine.calculate_probability(symbol, data, classification, momentum)
+    probability = float(result['probability'])
+    status = timer.get_status(probability, bool(result.get('m15_confirmed', False)))['status']
+    return probability, int(result['setup_type']), status
+
+
+def _near_threshold(probability: float, thresholds, tolerance: float) -> bool:
+    """True if a probability lies within tolerance of a category boundary"""
+    return any(abs(probability - t) <= tolerance for t in thresholds)
+
+
+def run_validate_float32(args, config: dict) -> int:
+    """
+    Score recorded bars in float64 and float32 and compare
+
+    Each symbol is evaluated at the last --points H1 bars (walking forward
+    through its history). Passes when probabilities agree within
+    --tolerance and every category difference sits within --tolerance of
+    a category boundary.
+    """
+    root = args.data or config.get('BAR_STORE_PATH', 'data/bars')
+    stores = {name: BarStore(root, dtype=name) for name in ('float64', 'float32')}
+    symbols = args.symbols or stores['float64'].symbols()
+    if not symbols:
+        print(f"❌ No recorded bars in {root} (run: python research.py record)")
+        return 1
+
+    # Live streaming states are per symbol and would mix the two precisions
+    engine_config = dict(config, STREAMING_INDICATORS_ENABLED=False)
+    engines = {name: ProbabilityEngine(engine_config) for name in stores}
+    timer = EntryTimer(config)
+    thresholds = (20, 40, 65, timer.prob_get_ready, timer.prob_almost_ready, timer.prob_big_bang)
+
+    evaluations = setups = setup_flips = borderline = category_flips = 0
+    deltas = []
+    for symbol in symbols:
+        data = {name: store.load_symbol(symbol, TIMEFRAMES) for name, store in stores.items()}
+        h1 = data['float64'].get('H1')
+        if h1 is None or len(h1) < 100:
+            print(f"   ⚠️  {symbol}: not enough H1 bars, skipped")
+            continue
+
+        classification = _classification(symbol, config)
+        cutoffs = h1['time'].iloc[max(100, len(h1) - args.points):]
+        symbol_worst = 0.0
+        for cutoff in cutoffs:
+            scores = {
+                name: _score(engines[name], timer, symbol, _slice_until(frames, cutoff), classification)
+                for name, frames in data.items()
+            }
+            (p64, setup64, status64), (p32, setup32, status32) = scores['float64'], scores['float32']
+            evaluations += 1
+            setups += setup64 != 0
+
+            if setup64 != setup32:
+                setup_flips += 1
+                continue
+
+            delta = abs(p64 - p32)
+            deltas.append(delta)
+            symbol_worst = max(symbol_worst, delta)
+            if status64 != status32:
+                if _near_threshold(p64, thresholds, args.tolerance):
+                    borderline += 1
+                else:
+                    category_flips += 1
+
+        print(f"   {symbol:<10} {len(cutoffs):>5} evaluations, max |Δp| {symbol_worst:.2e}")
+
+    deltas = np.asarray(deltas) if deltas else np.zeros(1)
+    ok = deltas.max() <= args.tolerance and category_flips == 0 and setup_flips == 0
+
+    print(f"\nEvaluations:           {evaluations} ({setups} with a setup)")
+    print(f"Probability |Δp|:      max {deltas.max():.2e}, mean {deltas.mean():.2e} (tolerance {args.tolerance})")
+    print(f"Setup type flips:      {setup_flips}")
+    print(f"Category flips:        {category_flips} (+{borderline} within tolerance of a boundary)")
+    print("\n" + ("✅ float32 matches float64" if ok else "❌ float32 differs from float64 - keep COMPUTE_DTYPE = \"float64\""))
+    return 0 if ok else 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BACKTEST
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_backtest(args, config: dict) -> int:
+    """Simulate BIG BANG entries on recorded bars and print R statistics per pair type"""
+    root = args.data or config.get('BAR_STORE_PATH', 'data/bars')
+    store = BarStore(root, dtype=config.get('COMPUTE_DTYPE', 'float64'))
+    symbols = args.symbols or store.symbols()
+    if not symbols:
+        print(f"❌ No recorded bars in {root} (run: python research.py record)")
+        return 1
+
+    backtest_config = dict(config, STREAMING_INDICATORS_ENABLED=False)
+    if args.target:
+        backtest_config['BACKTEST_EXIT_TARGET'] = None if args.target == 'none' else args.target
+    backtester = Backtester(backtest_config)
+
+    trades, years = [], 0.0
+    for symbol in symbols:
+        # One symbol in memory at a time
+        data = store.load_symbol(symbol, TIMEFRAMES)
+        if 'H1' not in data or 'D1' not in data:
+            print(f"   ⚠️  {symbol}: H1 and D1 bars required, skipped")
+            continue
+        span = data['H1']['time'].iloc[-1] - data['H1']['time'].iloc[0]
+        years += span.days / 365.25
+
+        result = backtester.run(symbol, data, _classification(symbol, config))
+        total_r = result['r_multiple'].sum() if len(result) else 0.0
+        print(f"   {symbol:<10} {len(result):>4} trades, {total_r:+8.1f}R")
+        if len(result):
+            trades.append(result)
+
+    trades = pd.concat(trades, ignore_index=True) if trades else pd.DataFrame(columns=Backtester.TRADE_COLUMNS)
+    print(f"\n{len(trades)} trades over {years:.1f} symbol-years")
+    if len(trades) == 0:
+        return 0
+
+    stats = Backtester.statistics(trades)
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.2f}'.format):
+        print(stats)
+
+    if args.trades:
+        trades.to_csv(args.trades, index=False)
+        print(f"\n✅ Trades written to {args.trades}")
+    return 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# OPTIMIZE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_optimize(args, config: dict) -> int:
+    """Sweep scoring parameters on recorded bars and print the ranked report"""
+    root = args.data or config.get('BAR_STORE_PATH', 'data/bars')
+    store = BarStore(root, dtype=config.get('COMPUTE_DTYPE', 'float64'))
+    symbols = args.symbols or store.symbols()
+    if not symbols:
+        print(f"❌ No recorded bars in {root} (run: python research.py record)")
+        return 1
+
+    space = None
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+
+    optimizer = Optimizer(dict(config, STREAMING_INDICATORS_ENABLED=False), space)
+    combinations = optimizer.combinations(args.samples, seed=args.seed)
+    print(f"Search space: {', '.join(f'{k}={v}' for k, v in optimizer.space.items())}")
+
+    # Features once per symbol (one symbol's bars in memory at a time)
+    for symbol in symbols:
+        candidates = optimizer.precompute(symbol, store.load_symbol(symbol, TIMEFRAMES), _classification(symbol, config))
+        print(f"   {symbol:<10} {candidates:>6} candidate entries")
+
+    workers = args.workers or config.get('MAX_WORKERS', 4)
+    print(f"\nEvaluating {len(combinations)} combinations on {workers} worker(s)...")
+    report = optimizer.run(combinations, workers=workers, metric=args.metric, min_trades=args.min_trades)
+
+    # Weights as scored (rescaled to the current weight sum)
+    parameters = [f'norm_{name}' if name.startswith('weight_') else name for name in optimizer.space]
+    columns = ['rank'] + parameters + ['trades', 'win_rate', 'avg_r', 'total_r',
+                                       'profit_factor', 'max_drawdown_r', 'sqn']
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.2f}'.format):
+        print(report[columns].head(args.top).to_string(index=False))
+        baseline = report[report['baseline']]
+        if len(baseline):
+            print("\nCurrent settings:")
+            print(baseline[columns].to_string(index=False))
+
+    if args.report:
+        report.to_csv(args.report, index=False)
+        print(f"\n✅ Report written to {args.report}")
+    return 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ETA CALIBRATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_calibrate_eta(args, config: dict) -> int:
+    """Measure bars-to-entry per probability band and write the EntryTimer tables"""
+    root = args.data or config.get('BAR_STORE_PATH', 'data/bars')
+    store = BarStore(root, dtype=config.get('COMPUTE_DTYPE', 'float64'))
+    symbols = args.symbols or store.symbols()
+    if not symbols:
+        print(f"❌ No recorded bars in {root} (run: python research.py record)")
+        return 1
+
+    engine = ProbabilityEngine(dict(config, STREAMING_INDICATORS_ENABLED=False))
+    calibration = EtaCalibration(prob_big_bang=config.get('PROB_BIG_BANG', 80))
+    for symbol in symbols:
+        data = store.load_symbol(symbol, TIMEFRAMES)
+        if 'H1' not in data:
+            print(f"   ⚠️  {symbol}: no H1 bars, skipped")
+            continue
+        samples = calibration.add_history(engine.probability_history(data), _classification(symbol, config))
+        print(f"   {symbol:<10} {samples:>6} samples")
+
+    path = args.output or config.get('ETA_CALIBRATION_PATH', 'data/eta_calibration.json')
+    calibration.save(path)
+
+    tables = EtaTables(calibration.build(), min_samples=config.get('ETA_MIN_SAMPLES', 30))
+    print(f"\n{'Band':<10}" + ''.join(f"{name:>22}" for name in tables.classes))
+    for band in range(calibration.n_bands):
+        low = band * calibration.band_width
+        if low >= calibration.prob_big_bang:
+            break
+        cells = []
+        for table in tables.classes.values():
+            if table['reached'][band] > 0:
+                cells.append(f"{table['median_bars'][band]:>6.0f} bars {table['reached'][band] / table['samples'][band] * 100:>3.0f}% "
+                             f"n={int(table['samples'][band]):<5}")
+            else:
+                cells.append(f"{'-':>22}")
+        print(f"{low:>3}-{low + calibration.band_width:<6}" + ''.join(f"{c:>22}" for c in cells))
+
+    print(f"\n✅ ETA calibration written to {path}")
+    return 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TARGET HIT CALIBRATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_calibrate_targets(args, config: dict) -> int:
+    """Measure +3R/+5R/elite hit rates and write the RiskCalculator tables"""
+    path = args.output or config.get('TARGET_HIT_TABLES_PATH', 'data/target_hit_tables.json')
+    refresh_days = config.get('TARGET_HIT_REFRESH_DAYS', 7)
+    current = TargetHitTables(path, refresh_days=refresh_days)
+    if args.if_due and not current.is_due():
+        print(f"✅ {path} is from {current.created:%Y-%m-%d %H:%M} - next refresh after {refresh_days} days")
+        return 0
+
+    root = args.data or config.get('BAR_STORE_PATH', 'data/bars')
+    store = BarStore(root, dtype=config.get('COMPUTE_DTYPE', 'float64'))
+    symbols = args.symbols or store.symbols()
+    if not symbols:
+        print(f"❌ No recorded bars in {root} (run: python research.py record)")
+        return 1
+
+    calibration = TargetCalibration(dict(config, STREAMING_INDICATORS_ENABLED=False))
+    for symbol in symbols:
+        entries = calibration.add_symbol(symbol, store.load_symbol(symbol, TIMEFRAMES), _classification(symbol, config))
+        print(f"   {symbol:<10} {entries:>5} entries")
+
+    calibration.save(path)
+    tables = calibration.build()
+    print(f"\n{'Pair type':<12}{'Entries':>8}{'+3R':>8}{'+5R':>8}{'Elite':>8}")
+    for name, row in sorted(tables['classes'].items()):
+        rates = ''.join(f"{row[t]:>7.1f}%" if row[t] is not None else f"{'-':>8}" for t in ('r3', 'r5', 'elite'))
+        print(f"{name:<12}{row['samples']:>8}{rates}")
+
+    print(f"\n✅ Target hit tables written to {path}")
+    return 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MONTE CARLO
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def run_monte_carlo(args, config: dict) -> int:
+    """Simulate equity paths per pair type and print drawdown / ruin statistics"""
+    simulator = MonteCarlo(config, paths=args.paths, trades_per_path=args.horizon, seed=args.seed)
+    if args.ruin is not None:
+        simulator.ruin_pct = args.ruin
+
+    if args.trades:
+        trades = pd.read_csv(args.trades)
+        distributions = simulator.distributions_from_trades(trades)
+        source = f"{len(trades)} backtest trades from {args.trades}"
+    else:
+        path = args.tables or config.get('TARGET_HIT_TABLES_PATH', 'data/target_hit_tables.json')
+        if not Path(path).exists():
+            print(f"❌ {path} not found (run: python research.py calibrate-targets, "
+                  f"or pass --trades from python research.py backtest --trades)")
+            return 1
+        with open(path) as f:
+            distributions = simulator.distributions_from_hit_rates(json.load(f), args.target)
+        target = args.target or config.get('BACKTEST_EXIT_TARGET') or 'elite'
+        source = f"{target} target hit rates from {path}"
+
+    if not distributions:
+        print("❌ No R-multiples to simulate")
+        return 1
+
+    print(f"Monte Carlo: {simulator.paths} paths x {simulator.trades_per_path} trades, {source}")
+    print(f"Account {simulator.account_size}, ruin = {simulator.ruin_pct:.0f}% loss\n")
+    report = simulator.run(distributions, args.risk)
+
+    columns = ['pair_type', 'samples', 'risk_percent', 'expectancy_r', 'final_p50',
+               'max_dd_p50', 'max_dd_p95', 'max_dd_p99', 'risk_of_ruin',
+               'underwater_p50', 'underwater_p90', 'unrecovered']
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:.2f}'.format):
+        print(report[columns].to_string(index=False))
+
+    if args.report:
+        report.to_csv(args.report, index=False)
+        print(f"\n✅ Report written to {args.report}")
+    return 0
+
+
+def _classification(symbol: str, config: dict) -> str:
+    """Manual classification of a symbol (MIXED if unlisted)"""
+    for name in ('TRENDING', 'RANGING', 'MIXED'):
+        if symbol in config.get(f'{name}_PAIRS', []):
+            return name
+    return 'MIXED'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline research tools on recorded bars')
+    parser.add_argument('--data', help='Bar store directory (default BAR_STORE_PATH)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record = subparsers.add_parser('record', help='Fetch and save bars for ALL_PAIRS')
+    record.add_argument('--bars', type=int, help='Bars per timeframe (default LOOKBACK_BARS)')
+
+    validate = subparsers.add_parser('validate-float32', help='Compare float32 and float64 scoring')
+    validate.add_argument('--symbols', nargs='+', help='Symbols to check (default: all recorded)')
+    validate.add_argument('--points', type=int, default=50, help='H1 bars evaluated per symbol')
+    validate.add_argument('--tolerance', type=float, default=0.5, help='Allowed probability difference (points)')
+
+    backtest = subparsers.add_parser('backtest', help='Simulate BIG BANG entries with the risk rules')
+    backtest.add_argument('--symbols', nargs='+', help='Symbols to test (default: all recorded)')
+    backtest.add_argument('--target', choices=['r3', 'r5', 'elite', 'none'],
+                          help='Take-profit target (default BACKTEST_EXIT_TARGET, none = trail only)')
+    backtest.add_argument('--trades', help='Write the trade list to this CSV file')
+
+    optimize = subparsers.add_parser('optimize', help='Rank probability weights and thresholds by backtest')
+    optimize.add_argument('--symbols', nargs='+', help='Symbols to use (default: all recorded)')
+    optimize.add_argument('--space', help='JSON file {parameter: [values]} (default Optimizer.DEFAULT_SPACE)')
+    optimize.add_argument('--samples', type=int, help='Random search size (default: full grid)')
+    optimize.add_argument('--seed', type=int, default=0, help='Random search seed')
+    optimize.add_argument('--workers', type=int, help='Worker processes (default MAX_WORKERS)')
+    optimize.add_argument('--metric', choices=Optimizer.METRICS, default='sqn', help='Ranking metric')
+    optimize.add_argument('--min-trades', type=int, default=30, help='Rank combinations with fewer trades last')
+    optimize.add_argument('--top', type=int, default=20, help='Rows of the report to print')
+    optimize.add_argument('--report', help='Write the full report to this CSV file')
+
+    calibrate = subparsers.add_parser('calibrate-eta', help='Build the EntryTimer ETA tables')
+    calibrate.add_argument('--symbols', nargs='+', help='Symbols to use (default: all recorded)')
+    calibrate.add_argument('--output', help='Tables file (default ETA_CALIBRATION_PATH)')
+
+    targets = subparsers.add_parser('calibrate-targets', help='Build the RiskCalculator target hit tables')
+    targets.add_argument('--symbols', nargs='+', help='Symbols to use (default: all recorded)')
+    targets.add_argument('--output', help='Tables file (default TARGET_HIT_TABLES_PATH)')
+    targets.add_argument('--if-due', action='store_true', help='Only rebuild when older than TARGET_HIT_REFRESH_DAYS')
+
+    monte_carlo = subparsers.add_parser('monte-carlo', help='Drawdown and risk of ruin from an R distribution')
+    monte_carlo.add_argument('--trades', help='Trades CSV from backtest --trades (default: target hit tables)')
+    monte_carlo.add_argument('--tables', help='Target hit tables (default TARGET_HIT_TABLES_PATH)')
+    monte_carlo.add_argument('--target', choices=['r3', 'r5', 'elite'],
+                             help='Exit target for the hit tables (default BACKTEST_EXIT_TARGET)')
+    monte_carlo.add_argument('--risk', type=float, nargs='+', help='Risk per trade in %% (default RISK_PER_TRADE)')
+    monte_carlo.add_argument('--paths', type=int, help='Equity paths (default MONTE_CARLO_PATHS)')
+    monte_carlo.add_argument('--horizon', type=int, help='Trades per path (default MONTE_CARLO_TRADES)')
+    monte_carlo.add_argument('--ruin', type=float, help='Account loss %% counted as ruin (default MONTE_CARLO_RUIN_PCT)')
+    monte_carlo.add_argument('--seed', type=int, default=0, help='Random seed')
+    monte_carlo.add_argument('--report', help='Write the full report to this CSV file')
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(name)s: %(message)s')
+
+    config = load_config()
+    commands = {
+        'record': run_record,
+        'validate-float32': run_validate_float32,
+        'backtest': run_backtest,
+        'optimize': run_optimize,
+        'calibrate-eta': run_calibrate_eta,
+        'calibrate-targets': run_calibrate_targets,
+        'monte-carlo': run_monte_carlo,
+    }
+    return commands[args.command](args, config)
+
+
+if __name__ == "__main__":
+    sys.exit(main())